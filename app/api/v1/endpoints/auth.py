@@ -4,14 +4,23 @@ from sqlalchemy.orm import Session
 from aioredis.exceptions import RedisError
 
 from app.core.database import get_db_session
-from app.core.deps import get_current_user,oauth2_scheme
+from app.core.deps import get_client_ip, get_current_user, oauth2_scheme
 from app.core.response import response_manager
 from app.models.user import User
-from app.schemas.user import UserRegister, UserLogin, UserLoginResponse, UserBase, LogoutRequest
+from app.schemas.user import (
+    UserRegister,
+    UserLogin,
+    UserLoginResponse,
+    UserBase,
+    LogoutRequest,
+    RefreshTokenRequest,
+    RefreshTokenResponse
+)
 from app.schemas.response import SuccessResponse
 from app.services.auth import auth_service
 from app.crud.user import user as crud_user
 from app.core.security import revoke_all_tokens
+from app.core.rate_limit import login_rate_limiter
 from app.core.logger import get_logger
 from app.exceptions.base import ValidationError
 
@@ -42,23 +51,40 @@ async def register(
 async def login(
     *,
     db: Session = Depends(get_db_session),
+    client_host: str = Depends(get_client_ip),
     login_data: UserLogin
 ) -> SuccessResponse[UserLoginResponse]:
     """
     用户登录
+    - 按邮箱和IP限制登录尝试次数，超限返回429，认证成功的尝试不计入
     - 验证用户凭据
-    - 生成访问令牌
-    - 撤销之前的令牌
+    - 撤销之前的令牌并生成新的访问令牌
     """
-    # 使用auth_service处理登录逻辑
-    login_response = await auth_service.login(db, login_data)
+    # 限流检查在查询用户和验证密码之前执行，并同时占用一次额度
+    reservation = await login_rate_limiter.check(login_data.Email, client_host)
     
-    # 撤销之前的令牌
-    user = await auth_service.authenticate(db, login_data)
-    await revoke_all_tokens(user.Id)
+    # 认证、撤销旧令牌、存储新令牌均在auth_service.login中一次完成
+    login_response = await auth_service.login(db, login_data, client=client_host)
+    await login_rate_limiter.release(login_data.Email, client_host, reservation)
     
     return response_manager.success(data=login_response, message="登录成功")
 
+@router.post("/refresh", response_model=SuccessResponse[RefreshTokenResponse])
+async def refresh(
+    *,
+    db: Session = Depends(get_db_session),
+    client_host: str = Depends(get_client_ip),
+    refresh_data: RefreshTokenRequest
+) -> SuccessResponse[RefreshTokenResponse]:
+    """
+    刷新令牌
+    - 使用刷新令牌换取新的访问令牌和刷新令牌
+    - 每个刷新令牌只能使用一次，重复使用会撤销该用户的全部会话
+    """
+    refresh_response = await auth_service.refresh(db, refresh_data.refreshToken, client=client_host)
+    
+    return response_manager.success(data=refresh_response, message="令牌刷新成功")
+
 @router.post("/logout")
 async def logout(
     current_user: User = Depends(get_current_user)
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db_session
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_replica_db_session
 from app.core.response import response_manager
 from app.models.user import User
 from app.schemas.department import Department, DepartmentTree, DepartmentCreate, DepartmentStatusUpdate
@@ -17,7 +17,7 @@ logger = get_logger("department.api")
 
 @router.get("/tree", response_model=SuccessResponse[List[DepartmentTree]])
 async def get_department_tree(
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     # current_user: User = Depends(get_current_user)
 ) -> SuccessResponse[List[DepartmentTree]]:
     """
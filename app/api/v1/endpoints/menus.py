@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 import uuid
 
 from app.core.database import get_db_session
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_readonly_db_session, get_replica_db_session
 from app.core.response import response_manager
 from app.models.user import User
 from app.services.menu import menu_service
@@ -31,36 +31,37 @@ async def create_menu(
 
 @router.get("/", response_model=PaginationResponse[Menu])
 async def read_menus(
-    db: Session = Depends(get_db_session),
-    skip: int = Query(0, ge=0, description="跳过的记录数"),
+    db: Session = Depends(get_replica_db_session),
+    skip: int = Query(0, ge=0, description="跳过的记录数（传入cursor时忽略）"),
     limit: int = Query(100, ge=1, le=1000, description="返回的记录数"),
+    cursor: Optional[str] = Query(None, description="分页游标，取上一页返回的next_cursor"),
+    include_total: Optional[bool] = Query(None, description="是否统计总数，默认偏移分页统计、游标分页不统计"),
     hidden: Optional[bool] = Query(None, description="菜单显示状态筛选"),
     parent_id: Optional[int] = Query(None, description="父菜单ID筛选"),
     current_user: User = Depends(get_current_user)
 ):
     """
     获取菜单列表
-    """
-    # 获取菜单列表
-    menus = await menu_service.get_menus(db, skip=skip, limit=limit, hidden=hidden, parent_id=parent_id)
-    
-    # 获取总数
-    total = await menu_service.get_menu_count(db, hidden=hidden)
-    
-    # 计算页码
-    page = (skip // limit) + 1 if limit > 0 else 1
-    
-    return response_manager.paginated(
-        items=menus,
-        total=total,
-        page=page,
-        page_size=limit,
-        message="菜单列表查询成功"
+    - 传入cursor时使用键集分页，深分页不随页码变慢
+    - 总数与列表使用相同的筛选条件
+    """
+    if include_total is None:
+        include_total = not cursor
+    result = await menu_service.get_menu_page(
+        db,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        include_total=include_total,
+        hidden=hidden,
+        parent_id=parent_id
     )
+    
+    return response_manager.page(result, skip=skip, limit=limit, cursor=cursor, message="菜单列表查询成功")
 
 @router.get("/tree", response_model=SuccessResponse[List[MenuTree]])
 async def read_menu_tree(
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     show_hidden: bool = Query(False, description="是否显示隐藏菜单"),
     current_user: User = Depends(get_current_user)
 ):
@@ -72,7 +73,7 @@ async def read_menu_tree(
 
 @router.get("/next-id", response_model=SuccessResponse[dict])
 async def get_next_menu_id(
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_readonly_db_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -87,7 +88,7 @@ async def get_next_menu_id(
 @router.get("/{menu_id}", response_model=SuccessResponse[Menu])
 async def read_menu(
     menu_id: uuid.UUID,
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -139,14 +140,15 @@ async def toggle_menu_visibility(
 
 @router.get("/count/total", response_model=SuccessResponse[dict])
 async def get_menu_count(
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     hidden: Optional[bool] = Query(None, description="菜单显示状态筛选"),
+    parent_id: Optional[int] = Query(None, description="父菜单ID筛选"),
     current_user: User = Depends(get_current_user)
 ):
     """
     获取菜单总数
     """
-    count = await menu_service.get_menu_count(db, hidden=hidden)
+    count = await menu_service.get_menu_count(db, hidden=hidden, parent_id=parent_id)
     return response_manager.success(
         data={"total": count}, 
         message="菜单总数查询成功"
@@ -0,0 +1,138 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.deps import get_current_user, get_readonly_db_session
+from app.core.hashing import hashing_executor
+from app.core.db_executor import db_executor
+from app.core.pool_metrics import pool_monitors
+from app.core.principal import principal_cache
+from app.core.permissions import permission_registry
+from app.core.counters import counter_registry
+from app.core.security import jwt_cache, token_generation_cache
+from app.core.rate_limit import login_rate_limiter
+from app.core.response import response_manager
+from app.models.user import User
+from app.schemas.response import SuccessResponse
+from app.core.logger import get_logger
+
+logger = get_logger("metrics.api")
+router = APIRouter()
+
+@router.get("/hashing", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_hashing_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取密码哈希执行器指标
+    - 队列深度、运行中任务数
+    - 单次哈希耗时
+    """
+    return response_manager.success(data=hashing_executor.stats(), message="密码哈希指标查询成功")
+
+@router.get("/principal-cache", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_principal_cache_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取认证用户缓存指标
+    - 缓存条目数、命中与未命中次数
+    """
+    return response_manager.success(data=principal_cache.stats(), message="认证用户缓存指标查询成功")
+
+@router.get("/jwt-cache", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_jwt_cache_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取已验证令牌缓存指标
+    - 缓存条目数、命中与未命中次数
+    """
+    return response_manager.success(data=jwt_cache.stats(), message="令牌缓存指标查询成功")
+
+
+@router.get("/token-generation-cache", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_token_generation_cache_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取令牌最小有效代数缓存指标
+    - 命中率即不需要访问会话存储的令牌校验比例
+    """
+    return response_manager.success(data=token_generation_cache.stats(), message="令牌代数缓存指标查询成功")
+
+@router.get("/login-rate-limit", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_login_rate_limit_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取登录限流指标
+    - 检查次数、放行次数
+    - 按邮箱、按IP拒绝的次数
+    """
+    return response_manager.success(data=login_rate_limiter.stats(), message="登录限流指标查询成功")
+
+@router.get("/permissions", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_permission_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取权限注册表指标
+    - 角色数、菜单数、权限标识数
+    - 重建次数
+    """
+    return response_manager.success(data=permission_registry.stats(), message="权限注册表指标查询成功")
+
+@router.get("/database-executor", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_database_executor_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取数据库执行器指标（DATABASE_MODE=thread）
+    - 排队深度、运行中查询数
+    - 排队等待与执行耗时
+    """
+    return response_manager.success(data=db_executor.stats(), message="数据库执行器指标查询成功")
+
+@router.get("/database-pool", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_database_pool_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取数据库连接池指标（按引擎：primary、replica、async_primary、async_replica）
+    - 已签出、溢出连接数及峰值，签出时的并发分布
+    - 获取连接的等待时间分布与超时次数
+    - 新建连接耗时、pre_ping失败与连接失效次数
+    """
+    data = {name: monitor.stats() for name, monitor in pool_monitors.items()}
+    return response_manager.success(data=data, message="数据库连接池指标查询成功")
+
+@router.get("/database-pool/advice", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_database_pool_advice(
+    workers: int = Query(1, ge=1, description="部署的worker进程数，用于估算数据库总连接数"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    根据本进程观察到的并发给出连接池大小建议
+    - 建议值适用于每个worker进程，total_connections 为所有worker合计
+    """
+    data = {name: monitor.advise(workers=workers) for name, monitor in pool_monitors.items()}
+    return response_manager.success(data=data, message="连接池大小建议查询成功")
+
+@router.post("/database-pool/reset", response_model=SuccessResponse[None])
+async def reset_database_pool_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """清空连接池统计，调整配置后重新观察"""
+    for monitor in pool_monitors.values():
+        monitor.reset()
+    return response_manager.success(message="连接池统计已清空")
+
+@router.get("/counters", response_model=SuccessResponse[dict], dependencies=[Depends(get_readonly_db_session)])
+async def get_counter_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取计数器指标
+    - 各计数器是否已加载及当前总数
+    - 对账次数、累计修正的偏差
+    """
+    return response_manager.success(data=counter_registry.stats(), message="计数器指标查询成功")
@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 import uuid
 
 from app.core.database import get_db_session
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_replica_db_session
 from app.core.response import response_manager
 from app.models.user import User
 from app.services.role import role_service
@@ -31,35 +31,30 @@ async def create_role(
 
 @router.get("/", response_model=PaginationResponse[Role])
 async def read_roles(
-    db: Session = Depends(get_db_session),
-    skip: int = Query(0, ge=0, description="跳过的记录数"),
+    db: Session = Depends(get_replica_db_session),
+    skip: int = Query(0, ge=0, description="跳过的记录数（传入cursor时忽略）"),
     limit: int = Query(100, ge=1, le=1000, description="返回的记录数"),
+    cursor: Optional[str] = Query(None, description="分页游标，取上一页返回的next_cursor"),
+    include_total: Optional[bool] = Query(None, description="是否统计总数，默认偏移分页统计、游标分页不统计"),
     status: Optional[str] = Query(None, description="角色状态筛选"),
     current_user: User = Depends(get_current_user)
 ):
     """
     获取角色列表
+    - 传入cursor时使用键集分页，深分页不随页码变慢
     """
-    roles = await role_service.get_roles(db, skip=skip, limit=limit, status_filter=status)
-    
-    # 获取总数
-    total = await role_service.get_role_count(db, status_filter=status)
-    
-    # 计算页码
-    page = (skip // limit) + 1 if limit > 0 else 1
-    
-    return response_manager.paginated(
-        items=roles,
-        total=total,
-        page=page,
-        page_size=limit,
-        message="角色列表查询成功"
+    if include_total is None:
+        include_total = not cursor
+    result = await role_service.get_role_page(
+        db, limit=limit, skip=skip, cursor=cursor, include_total=include_total, status_filter=status
     )
+    
+    return response_manager.page(result, skip=skip, limit=limit, cursor=cursor, message="角色列表查询成功")
 
 @router.get("/{role_id}", response_model=SuccessResponse[Role])
 async def read_role(
     role_id: uuid.UUID,
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -71,7 +66,7 @@ async def read_role(
 @router.get("/{role_id}/menus", response_model=SuccessResponse[List[RouteItem]])
 async def get_role_menus(
     role_id: uuid.UUID,
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -125,7 +120,7 @@ async def change_role_status(
 
 @router.get("/count/total", response_model=SuccessResponse[dict])
 async def get_role_count(
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     status: Optional[str] = Query(None, description="角色状态筛选"),
     current_user: User = Depends(get_current_user)
 ):
@@ -1,15 +1,21 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, UploadFile, File, Query, status, Body
+from fastapi import APIRouter, Depends, UploadFile, File, Query, status, Body, Header
+from fastapi.responses import StreamingResponse
+from datetime import datetime
 from sqlalchemy.orm import Session
 import uuid
 
 from app.core.database import get_db_session
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_replica_db_session, require_permission
 from app.core.response import response_manager
 from app.models.user import User
-from app.schemas.user import UserInfo, User as UserSchema, UserCreate, UserUpdate, UserRegister, AvatarUpload
+from app.schemas.user import (
+    UserInfo, User as UserSchema, UserCreate, UserUpdate, UserRegister, AvatarUpload,
+    UserBulkCreate, UserBulkUpdate, UserBulkDelete, UserBulkResult
+)
 from app.schemas.response import SuccessResponse, PaginationResponse
 from app.services.user import user_service
+from app.utils.export import EXPORT_FORMATS, negotiate_format
 from app.core.logger import get_logger
 from app.exceptions.base import NotFoundError, ValidationError
 
@@ -17,8 +23,8 @@ router = APIRouter()
 logger = get_logger(__name__)
 
 @router.get("/current", response_model=SuccessResponse[UserInfo])
-async def get_current_user(
-    db: Session = Depends(get_db_session),
+async def read_current_user(
+    db: Session = Depends(get_replica_db_session),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -55,40 +61,108 @@ async def upload_avatar(
 
 @router.get("/", response_model=PaginationResponse[UserSchema])
 async def get_users(
-    db: Session = Depends(get_db_session),
-    skip: int = Query(0, ge=0, description="跳过的记录数"),
+    db: Session = Depends(get_replica_db_session),
+    skip: int = Query(0, ge=0, description="跳过的记录数（传入cursor时忽略）"),
     limit: int = Query(100, ge=1, le=1000, description="返回的记录数"),
+    cursor: Optional[str] = Query(None, description="分页游标，取上一页返回的next_cursor"),
+    include_total: Optional[bool] = Query(None, description="是否统计总数，默认偏移分页统计、游标分页不统计"),
     include_relations: bool = Query(True, description="是否包含关联信息（角色、部门）"),
     current_user: User = Depends(get_current_user)
 ):
     """
     获取用户列表
+    - 传入cursor时使用键集分页，深分页不随页码变慢
     """
-    users = await user_service.get_users(
-        db, 
-        skip=skip, 
-        limit=limit, 
+    if include_total is None:
+        include_total = not cursor
+    result = await user_service.get_user_page(
+        db,
+        limit=limit,
+        skip=skip,
+        cursor=cursor,
+        include_total=include_total,
         include_relations=include_relations
     )
     
-    # 获取总数
-    total = await user_service.get_user_count(db)
-    
-    # 计算页码
-    page = (skip // limit) + 1 if limit > 0 else 1
-    
-    return response_manager.paginated(
-        items=users,
-        total=total,
-        page=page,
-        page_size=limit,
-        message="用户列表查询成功"
+    return response_manager.page(result, skip=skip, limit=limit, cursor=cursor, message="用户列表查询成功")
+
+@router.get("/count/total", response_model=SuccessResponse[dict])
+async def get_user_count(
+    db: Session = Depends(get_replica_db_session),
+    status: Optional[str] = Query(None, description="用户状态筛选"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    获取用户总数
+    """
+    count = await user_service.get_user_count(db, status=status)
+    return response_manager.success(data={"total": count}, message="用户总数查询成功")
+
+@router.get("/export")
+async def export_users(
+    format: Optional[str] = Query(None, description=f"导出格式: {'/'.join(EXPORT_FORMATS)}，未指定时按Accept头选择，默认csv"),
+    status: Optional[str] = Query(None, description="用户状态筛选"),
+    accept: Optional[str] = Header(None),
+    current_user: User = Depends(require_permission("user:export"))
+):
+    """
+    导出用户（含部门、角色名称）
+    - 流式输出，服务端按批读取，不在内存中缓存完整结果
+    """
+    export_format = negotiate_format(format, accept)
+    filename = f"users_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format.extension}"
+    return StreamingResponse(
+        user_service.export_users(export_format, status=status),
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
+@router.post("/bulk", response_model=SuccessResponse[UserBulkResult])
+async def bulk_create_users(
+    *,
+    db: Session = Depends(get_db_session),
+    bulk_in: UserBulkCreate,
+    current_user: User = Depends(require_permission("user:add"))
+):
+    """
+    批量创建用户（管理员用）
+    - 返回逐行结果，校验未通过的行不影响其他行
+    """
+    result = await user_service.bulk_create_users(db, bulk_in.Users)
+    return response_manager.success(data=result, message=f"批量创建完成，成功{result.Succeeded}个，失败{result.Failed}个")
+
+@router.put("/bulk", response_model=SuccessResponse[UserBulkResult])
+async def bulk_update_users(
+    *,
+    db: Session = Depends(get_db_session),
+    bulk_in: UserBulkUpdate,
+    current_user: User = Depends(require_permission("user:edit"))
+):
+    """
+    批量更新用户
+    - 每行只更新传入的字段，返回逐行结果
+    """
+    result = await user_service.bulk_update_users(db, bulk_in.Users)
+    return response_manager.success(data=result, message=f"批量更新完成，成功{result.Succeeded}个，失败{result.Failed}个")
+
+@router.post("/bulk/delete", response_model=SuccessResponse[UserBulkResult])
+async def bulk_delete_users(
+    *,
+    db: Session = Depends(get_db_session),
+    bulk_in: UserBulkDelete,
+    current_user: User = Depends(require_permission("user:delete"))
+):
+    """
+    批量删除用户
+    - 返回逐行结果，不存在的用户不影响其他行
+    """
+    result = await user_service.bulk_delete_users(db, bulk_in.Ids)
+    return response_manager.success(data=result, message=f"批量删除完成，成功{result.Succeeded}个，失败{result.Failed}个")
+
 @router.get("/{user_id}", response_model=SuccessResponse[UserSchema])
 async def get_user(
     user_id: uuid.UUID,
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     include_relations: bool = Query(True, description="是否包含关联信息（角色、部门）"),
     current_user: User = Depends(get_current_user)
 ):
@@ -105,7 +179,7 @@ async def create_user(
     *,
     db: Session = Depends(get_db_session),
     user_in: UserCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("user:add"))
 ):
     """
     创建用户（管理员用）
@@ -118,7 +192,7 @@ async def update_user(
     user_id: uuid.UUID,
     user_update: UserUpdate,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("user:edit"))
 ):
     """
     更新用户信息
@@ -130,7 +204,7 @@ async def update_user(
 async def delete_user(
     user_id: uuid.UUID,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("user:delete"))
 ):
     """
     删除用户
@@ -143,7 +217,7 @@ async def change_user_status(
     user_id: uuid.UUID,
     status: str = Query(..., regex="^[01]$", description="状态：0-禁用，1-启用"),
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("user:edit"))
 ):
     """
     更改用户状态
@@ -157,7 +231,7 @@ async def change_user_role(
     user_id: uuid.UUID,
     role_id: uuid.UUID,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("user:edit"))
 ):
     """
     更改用户角色
@@ -168,7 +242,7 @@ async def change_user_role(
 @router.get("/email/{email}", response_model=SuccessResponse[UserSchema])
 async def get_user_by_email(
     email: str,
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_replica_db_session),
     include_relations: bool = Query(True, description="是否包含关联信息（角色、部门）"),
     current_user: User = Depends(get_current_user)
 ):
@@ -200,7 +274,7 @@ async def admin_upload_avatar(
     user_id: uuid.UUID,
     avatar_data: AvatarUpload,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(require_permission("user:edit"))
 ):
     """
     管理员为用户上传头像
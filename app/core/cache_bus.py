@@ -0,0 +1,102 @@
+import asyncio
+import json
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+from app.core.session_store import session_store
+from app.core.logger import get_logger
+
+logger = get_logger("cache_bus")
+
+Handler = Callable[[str], Union[None, Awaitable[None]]]
+
+class CacheBus:
+    """
+    进程内缓存失效总线
+    - 本进程发布的失效消息立即在本地处理
+    - 通过会话存储的发布订阅（Redis）广播给其他worker，保证多worker缓存一致
+    - 订阅断开期间丢失的消息由各缓存自身的TTL兜底
+    """
+
+    channel = "cache:invalidate"
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def register(self, topic: str, handler: Handler) -> None:
+        """注册某个主题的失效处理函数，handler接收失效的键"""
+        self._handlers.setdefault(topic, []).append(handler)
+
+    async def _dispatch(self, topic: str, key: str) -> None:
+        for handler in self._handlers.get(topic, []):
+            try:
+                result = handler(key)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"处理缓存失效消息失败: {topic} {key} - {str(e)}")
+
+    async def publish(self, topic: str, key: str, local: bool = True) -> None:
+        """
+        发布失效消息
+        - 先在本进程内处理（local=False 表示调用方已在本进程处理，只广播）
+        - 广播失败只记录日志，不影响已提交的写操作
+        """
+        if local:
+            await self._dispatch(topic, key)
+        message = json.dumps({"origin": self.origin, "topic": topic, "key": key})
+        try:
+            await session_store.publish(self.channel, message)
+        except Exception as e:
+            logger.error(f"广播缓存失效消息失败: {str(e)}")
+
+    def publish_threadsafe(self, topic: str, key: str, local: bool = True) -> bool:
+        """
+        从工作线程发布失效消息（例如在线程池中提交的事务）
+        - 订阅任务未启动时返回False，由调用方自行处理
+        """
+        if self._loop is None or self._loop.is_closed():
+            return False
+        asyncio.run_coroutine_threadsafe(self.publish(topic, key, local), self._loop)
+        return True
+
+    async def _listen(self) -> None:
+        """订阅失效频道，断线后自动重连"""
+        while True:
+            try:
+                logger.info(f"订阅缓存失效频道: {self.channel}")
+                async for message in session_store.subscribe(self.channel):
+                    try:
+                        data = json.loads(message)
+                    except (TypeError, ValueError):
+                        continue
+                    if data.get("origin") == self.origin:
+                        continue
+                    await self._dispatch(data.get("topic", ""), data.get("key", ""))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"缓存失效订阅中断，5秒后重连: {str(e)}")
+                await asyncio.sleep(5)
+
+    async def start(self) -> None:
+        """启动订阅任务"""
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """停止订阅任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# 创建全局缓存失效总线
+cache_bus = CacheBus()
@@ -1,13 +1,26 @@
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from pydantic_settings import BaseSettings
-from pydantic import ConfigDict
+from pydantic import ConfigDict, model_validator
 import secrets
 import os
 
 # 获取项目根目录
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+# 同步驱动到异步驱动的映射
+ASYNC_DRIVERS = {
+    "mssql": "mssql+aioodbc",
+    "mssql+pyodbc": "mssql+aioodbc",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def to_async_database_url(url: str) -> str:
+    """将同步数据库URL转换为对应异步驱动的URL"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
 class Settings(BaseSettings):
     """项目配置类"""
     
@@ -41,13 +54,32 @@ class Settings(BaseSettings):
     DB_DATABASE: str = "E10"
     DB_USER: str = ""
     DB_PASSWORD: str = ""
+    # 数据库连接URL，未设置时由 DB_* 配置构建SQL Server连接；
+    # 可直接指定其他数据库，例如本地或CI运行基准测试: sqlite:///./bench.db
+    DATABASE_URL: Optional[str] = None
+    # 只读副本（Always On可读辅助副本）：列表、树、计数等GET接口的查询路由到副本；
+    # 未设置 DATABASE_REPLICA_URL 时，若设置了 DB_REPLICA_SERVER 则以 ApplicationIntent=ReadOnly 构建连接，两者都未设置时不启用
+    DB_REPLICA_SERVER: Optional[str] = None
+    DATABASE_REPLICA_URL: Optional[str] = None
     DATABASE_ECHO: bool = False
     POOL_SIZE: int = 5
     MAX_OVERFLOW: int = 10
     POOL_TIMEOUT: int = 30
     POOL_RECYCLE: int = 1800
     POOL_PRE_PING: bool = True
+    POOL_SLOW_CHECKOUT_MS: int = 500  # 获取连接等待超过该时间（毫秒）时记录警告，连接池大小建议也以此判断是否饱和
     SQL_DEBUG: bool = False
+    # 单个请求中同一语句形状执行达到该次数时记录疑似N+1查询警告；DEBUG模式下响应头 X-SQL-Stats 返回语句数和耗时
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    # 只读会话（GET接口）的隔离级别，未设置时使用连接默认级别；
+    # SNAPSHOT-快照隔离（SQL Server需开启 ALLOW_SNAPSHOT_ISOLATION），同一请求的多条查询读取一致的快照且不被写入阻塞;
+    # 隔离级别在签出连接时设置、归还时恢复，每个请求有额外开销
+    DB_READONLY_ISOLATION_LEVEL: Optional[str] = None
+    # SQL Server（pyodbc）批量写入使用 fast_executemany，参数数组一次发送而不是逐行往返
+    DB_FAST_EXECUTEMANY: bool = True
+    # 数据库会话模式: sync-同步Session（pyodbc），在事件循环上执行查询;
+    # thread-同步Session，CRUD层的查询在专用线程池中执行; async-AsyncSession（aioodbc）
+    DATABASE_MODE: str = "sync"
     
     # Redis配置
     REDIS_HOST: str = "localhost"
@@ -55,6 +87,19 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
     
+    # 令牌/会话存储: redis-多worker部署; memory-单进程部署或测试，不依赖Redis
+    SESSION_STORE_BACKEND: str = "redis"
+    
+    # 认证用户缓存配置（进程内，通过Redis发布订阅跨worker失效）
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 300  # 秒
+    
+    # 权限配置（权限注册表常驻内存，启动时全量编译，角色/菜单变更后增量重建）
+    SUPERUSER_ROLE_NAME: str = "超级管理员"  # 拥有全部权限的角色名称
+    
+    # 计数器配置（用户/角色/菜单总数常驻内存，提交时增量更新，通过Redis发布订阅同步到其他worker）
+    COUNTER_RECONCILE_INTERVAL: int = 300  # 秒，定期与数据库对账，0表示不对账
+    
     # Celery配置
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
@@ -64,8 +109,34 @@ class Settings(BaseSettings):
     
     # JWT配置
     SECRET_KEY: str = secrets.token_urlsafe(32)
-    ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 3600  # 1小时
+    ALGORITHM: str = "HS256"  # HS256使用SECRET_KEY; RS256/ES256使用密钥目录中的私钥并发布JWKS
+    JWT_KEYS_DIR: Path = BASE_DIR / "keys"  # 非对称签名私钥目录，文件名为 {kid}.pem
+    JWT_ACTIVE_KID: Optional[str] = None  # 当前签名密钥，未指定时使用最新的密钥文件
+    JWT_KEYS_RELOAD_INTERVAL: int = 60  # 检查密钥目录变更的间隔（秒），0表示只在启动时加载
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30  # 访问令牌有效期（分钟），过期后使用刷新令牌换取
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7  # 刷新令牌有效期（天），每次刷新后重新计算
+    JWT_CACHE_SIZE: int = 10000  # 已验证令牌缓存条目数
+    # 令牌校验方式: generation-比较令牌代数与进程内缓存的最小有效代数，通常无网络IO; session-每个请求读取存储中的用户令牌比较
+    TOKEN_VALIDATION_MODE: str = "generation"
+    TOKEN_GENERATION_CACHE_SIZE: int = 10000  # 最小有效代数缓存条目数
+    TOKEN_GENERATION_CACHE_TTL: int = 60  # 秒，发布订阅中断时代数变更最迟在该时间后生效
+    
+    # 密码哈希配置
+    PASSWORD_HASH_WORKERS: int = 0  # 哈希进程数，0表示使用CPU核数
+    PASSWORD_HASH_MAX_QUEUE: int = 100  # 等待哈希的最大请求数，超过后直接拒绝
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # bcrypt计算轮数（代价因子），只影响新生成的哈希
+    
+    # 批量用户接口配置
+    USER_BULK_MAX_ROWS: int = 10000  # 单次请求最多处理的用户数
+    USER_EXPORT_BATCH_SIZE: int = 1000  # 导出时每批从服务端游标读取的行数
+    
+    # 登录限流配置（滑动窗口，只统计验证失败的登录，在查询用户和验证密码之前检查）
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_WINDOW: int = 60  # 窗口长度（秒）
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 5  # 每个邮箱窗口内最多失败或进行中的登录次数
+    LOGIN_RATE_LIMIT_PER_IP: int = 20  # 每个IP窗口内最多失败或进行中的登录次数
+    # 反向代理地址（IP或网段），来自这些地址的请求从 X-Forwarded-For 中取客户端IP
+    TRUSTED_PROXIES: List[str] = []
     
     # 静态文件配置
     STATIC_URL: str = "/static"
@@ -75,19 +146,40 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5MB
     ALLOWED_IMAGE_TYPES: List[str] = ["image/jpeg", "image/png", "image/gif"]
     
-    @property
-    def DATABASE_URL(self) -> str:
-        """构建数据库连接URL"""
+    def _mssql_url(self, server: str, extra: str = "") -> str:
+        """由 DB_* 配置构建SQL Server连接URL"""
         conn_str = (
             f"DRIVER={{{self.DB_DRIVER}}};"
-            f"SERVER={self.DB_SERVER};"
+            f"SERVER={server};"
             f"DATABASE={self.DB_DATABASE};"
             f"UID={self.DB_USER};"
             f"PWD={self.DB_PASSWORD};"
             f"TrustServerCertificate=yes"
+            f"{extra}"
         )
         return f"mssql+pyodbc:///?odbc_connect={conn_str}"
 
+    @model_validator(mode="after")
+    def build_database_url(self) -> "Settings":
+        """未指定 DATABASE_URL / DATABASE_REPLICA_URL 时由 DB_* 配置构建SQL Server连接URL"""
+        if not self.DATABASE_URL:
+            self.DATABASE_URL = self._mssql_url(self.DB_SERVER)
+        if not self.DATABASE_REPLICA_URL and self.DB_REPLICA_SERVER:
+            self.DATABASE_REPLICA_URL = self._mssql_url(self.DB_REPLICA_SERVER, ";ApplicationIntent=ReadOnly")
+        return self
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """构建异步驱动的数据库连接URL"""
+        return to_async_database_url(self.DATABASE_URL)
+
+    @property
+    def ASYNC_DATABASE_REPLICA_URL(self) -> Optional[str]:
+        """构建异步驱动的只读副本连接URL"""
+        if not self.DATABASE_REPLICA_URL:
+            return None
+        return to_async_database_url(self.DATABASE_REPLICA_URL)
+
 # 创建全局配置对象
 settings = Settings()
 
@@ -0,0 +1,291 @@
+import asyncio
+import json
+import threading
+from typing import Any, Dict, Optional, Sequence, Set, Tuple, Type
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.core.cache_bus import cache_bus
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, DBSession, SessionLocal, db_execute
+from app.core.logger import get_logger
+from app.exceptions.base import DatabaseError
+from app.models.menu import Menu
+from app.models.role import Role
+from app.models.user import User
+
+logger = get_logger("counters")
+
+COUNTER_TOPIC = "counter"
+
+Bucket = Tuple[Any, ...]
+
+class EntityCounter:
+    """
+    单个实体的计数器
+    - 按维度列（例如 Status）分桶计数，带筛选条件的总数为匹配桶之和，与 WHERE 条件语义一致
+    - 首次使用或收到重新加载消息时执行一次 GROUP BY 查询
+    """
+
+    def __init__(self, name: str, model: Type, dimensions: Sequence[str]):
+        self.name = name
+        self.model = model
+        self.dimensions = tuple(dimensions)
+        self.loaded = False
+        self._buckets: Dict[Bucket, int] = {}
+        self._lock = threading.Lock()
+
+    async def load(self, db: DBSession) -> int:
+        """从数据库重新统计，返回与内存计数的差异（对账时用于记录漂移）"""
+        columns = [getattr(self.model, name) for name in self.dimensions]
+        result = await db_execute(db, select(*columns, func.count()).group_by(*columns))
+        buckets = {tuple(row[:-1]): row[-1] for row in result.all()}
+        with self._lock:
+            drift = 0
+            if self.loaded:
+                for key in set(buckets) | set(self._buckets):
+                    drift += abs(buckets.get(key, 0) - self._buckets.get(key, 0))
+            self._buckets = buckets
+            self.loaded = True
+        return drift
+
+    def apply(self, deltas: Dict[Bucket, int]) -> None:
+        """应用已提交事务的增量"""
+        with self._lock:
+            if not self.loaded:
+                return
+            buckets = dict(self._buckets)
+            for key, delta in deltas.items():
+                value = buckets.get(key, 0) + delta
+                if value:
+                    buckets[key] = value
+                else:
+                    buckets.pop(key, None)
+            self._buckets = buckets
+
+    def count(self, **filters: Any) -> int:
+        """按维度筛选求和，值为None的筛选条件表示不限"""
+        positions = [
+            (self.dimensions.index(name), value)
+            for name, value in filters.items() if value is not None
+        ]
+        return sum(
+            value for key, value in self._buckets.items()
+            if all(key[i] == expected for i, expected in positions)
+        )
+
+class CounterRegistry:
+    """
+    计数器注册表
+    - /count/total 接口直接读取内存计数，不执行 COUNT(*)
+    - 用户、角色、菜单的新增、删除和状态变更在会话提交后增量更新本进程计数，并广播给其他worker
+    - 批量写入（不经过ORM单元）调用 invalidate，下次读取时重新统计
+    - 定期与数据库对账，广播丢失或批量SQL造成的偏差在一个周期内修正
+    """
+
+    def __init__(self, reconcile_interval: int):
+        self.reconcile_interval = reconcile_interval
+        self.counters: Dict[str, EntityCounter] = {}
+        self._models: Dict[Type, EntityCounter] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.reconciles = 0
+        self.drift = 0
+
+    def register(self, counter: EntityCounter) -> None:
+        self.counters[counter.name] = counter
+        self._models[counter.model] = counter
+
+    def for_model(self, model: Type) -> Optional[EntityCounter]:
+        return self._models.get(model)
+
+    async def count(self, db: DBSession, name: str, **filters: Any) -> int:
+        """读取计数，未加载时使用当前会话统计一次"""
+        counter = self.counters[name]
+        if not counter.loaded:
+            try:
+                await counter.load(db)
+            except SQLAlchemyError as e:
+                logger.error(f"加载计数器失败: {str(e)}")
+                raise DatabaseError("统计数量失败")
+        return counter.count(**filters)
+
+    def invalidate(self, name: str) -> None:
+        """标记计数器需要重新统计并通知其他worker"""
+        self.counters[name].loaded = False
+        _broadcast([json.dumps({"counter": name, "reload": True})])
+
+    def apply(self, key: str) -> None:
+        """处理其他worker广播的计数变更"""
+        try:
+            message = json.loads(key)
+            counter = self.counters[message["counter"]]
+        except (TypeError, ValueError, KeyError):
+            logger.error(f"无效的计数变更消息: {key}")
+            return
+        if message.get("reload"):
+            counter.loaded = False
+        else:
+            counter.apply({tuple(bucket): delta for bucket, delta in message.get("deltas", [])})
+
+    async def reconcile(self) -> None:
+        """与数据库对账，重新统计全部计数器"""
+        if settings.DATABASE_MODE == "async":
+            async with AsyncSessionLocal() as db:
+                drift = await self._load_all(db)
+        else:
+            with SessionLocal() as db:
+                drift = await self._load_all(db)
+        self.reconciles += 1
+        if drift:
+            self.drift += drift
+            logger.warning(f"计数器对账修正 {drift} 个偏差")
+
+    async def _load_all(self, db: DBSession) -> int:
+        drift = 0
+        for counter in self.counters.values():
+            drift += await counter.load(db)
+        return drift
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"计数器对账失败: {str(e)}")
+
+    async def start(self) -> None:
+        """加载计数并启动定期对账任务"""
+        try:
+            await self.reconcile()
+            logger.info("计数器加载完成")
+        except Exception as e:
+            logger.error(f"计数器加载失败，首次读取时重试: {str(e)}")
+        if self.reconcile_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self) -> None:
+        """停止对账任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """计数器指标"""
+        return {
+            "counters": {
+                name: {"loaded": counter.loaded, "total": counter.count()}
+                for name, counter in self.counters.items()
+            },
+            "reconciles": self.reconciles,
+            "drift": self.drift
+        }
+
+# 创建全局计数器注册表
+counter_registry = CounterRegistry(settings.COUNTER_RECONCILE_INTERVAL)
+counter_registry.register(EntityCounter("user", User, ["Status"]))
+counter_registry.register(EntityCounter("role", Role, ["Status"]))
+counter_registry.register(EntityCounter("menu", Menu, ["Hidden", "ParentId"]))
+
+cache_bus.register(COUNTER_TOPIC, counter_registry.apply)
+
+# ---------------------------------------------------------------------------
+# 变更跟踪：flush时按对象的新旧维度值记录增量，提交后应用并广播
+# ---------------------------------------------------------------------------
+
+_DELTAS_KEY = "counter_deltas"
+_RELOAD_KEY = "counter_reload"
+_pending_tasks: Set[asyncio.Task] = set()
+
+def _dimension_values(obj, counter: EntityCounter, new: bool) -> Optional[Bucket]:
+    """对象在flush前（new=False）或flush后（new=True）的维度值，无法确定时返回None"""
+    state = inspect(obj)
+    values = []
+    for name in counter.dimensions:
+        history = state.attrs[name].history
+        if new:
+            candidates = history.added or history.unchanged
+        else:
+            candidates = history.deleted or history.unchanged
+        if candidates:
+            values.append(candidates[0])
+        elif new or not history.added:
+            value = state.dict.get(name, NO_VALUE)
+            if value is NO_VALUE:
+                return None
+            values.append(value)
+        else:
+            # 旧值未加载，无法确定原来的桶
+            return None
+    return tuple(values)
+
+def _broadcast(keys: Sequence[str]) -> None:
+    """广播给其他worker（本进程已处理）"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        for key in keys:
+            cache_bus.publish_threadsafe(COUNTER_TOPIC, key, local=False)
+        return
+    for key in keys:
+        task = loop.create_task(cache_bus.publish(COUNTER_TOPIC, key, local=False))
+        _pending_tasks.add(task)
+        task.add_done_callback(_pending_tasks.discard)
+
+@event.listens_for(Session, "after_flush")
+def _collect_counter_deltas(session: Session, flush_context) -> None:
+    changes = []
+    for obj in session.new:
+        changes.append((obj, None, True))
+    for obj in session.deleted:
+        changes.append((obj, False, None))
+    for obj in session.dirty:
+        changes.append((obj, False, True))
+
+    for obj, old, new in changes:
+        counter = counter_registry.for_model(type(obj))
+        if counter is None:
+            continue
+        before = _dimension_values(obj, counter, new=False) if old is not None else None
+        after = _dimension_values(obj, counter, new=True) if new is not None else None
+        if (old is not None and before is None) or (new is not None and after is None):
+            session.info.setdefault(_RELOAD_KEY, set()).add(counter.name)
+            continue
+        if before == after:
+            continue
+        deltas = session.info.setdefault(_DELTAS_KEY, {}).setdefault(counter.name, {})
+        if before is not None:
+            deltas[before] = deltas.get(before, 0) - 1
+        if after is not None:
+            deltas[after] = deltas.get(after, 0) + 1
+
+@event.listens_for(Session, "after_rollback")
+def _discard_counter_deltas(session: Session) -> None:
+    session.info.pop(_DELTAS_KEY, None)
+    session.info.pop(_RELOAD_KEY, None)
+
+@event.listens_for(Session, "after_commit")
+def _apply_counter_deltas(session: Session) -> None:
+    changes: Dict[str, Dict[Bucket, int]] = session.info.pop(_DELTAS_KEY, None) or {}
+    reload: Set[str] = session.info.pop(_RELOAD_KEY, None) or set()
+    keys = []
+    for name in reload:
+        counter_registry.counters[name].loaded = False
+        keys.append(json.dumps({"counter": name, "reload": True}))
+    for name, deltas in changes.items():
+        deltas = {bucket: delta for bucket, delta in deltas.items() if delta}
+        if not deltas or name in reload:
+            continue
+        counter_registry.counters[name].apply(deltas)
+        keys.append(json.dumps({"counter": name, "deltas": [[list(bucket), delta] for bucket, delta in deltas.items()]}))
+    if keys:
+        _broadcast(keys)
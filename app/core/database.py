@@ -1,36 +1,214 @@
 from contextlib import contextmanager
-from typing import Generator, Optional
-from sqlalchemy import create_engine
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, Generator, List, Optional, Sequence, Type, Union
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, Result, Row
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import InvalidRequestError, SQLAlchemyError
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.dml import UpdateBase
 from app.core.config import settings
+from app.core.db_executor import db_executor
+from app.core.pool_metrics import MonitoredAsyncAdaptedQueuePool, MonitoredQueuePool, monitor_engine
+# 注册请求级SQL统计的引擎事件
+import app.core.query_stats  # noqa: F401
 from app.core.logger import get_logger
-import logging
 
 # 配置日志
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+
+# 连接info中的标记：连接上的事务已经提交或回滚，之后没有开始新事务
+_TRANSACTION_ENDED_KEY = "transaction_ended"
+
+def _skip_redundant_reset(engine: Engine) -> None:
+    """
+    连接归还连接池时只在需要时回滚（引擎以 pool_reset_on_return=None 创建）
+    - 默认每次归还都回滚一次，提交过的请求因此多一次数据库往返（COMMIT之后再ROLLBACK）
+    - 会话关闭时先回滚事务再归还连接，同样会重复回滚
+    - 事务已经结束且之后没有开始新事务时跳过；连接失效时info被清空，仍会回滚
+    """
+    def _ended(conn) -> None:
+        conn.info[_TRANSACTION_ENDED_KEY] = True
+
+    def _begin(conn) -> None:
+        conn.info.pop(_TRANSACTION_ENDED_KEY, None)
+
+    event.listen(engine, "commit", _ended)
+    event.listen(engine, "rollback", _ended)
+    event.listen(engine, "begin", _begin)
+
+    @event.listens_for(engine, "reset")
+    def _reset(dbapi_connection, connection_record, reset_state):
+        ended = connection_record.info.pop(_TRANSACTION_ENDED_KEY, False) if connection_record else False
+        if reset_state.terminate_only or not reset_state.asyncio_safe:
+            return
+        if not (reset_state.transaction_was_reset or ended):
+            engine.dialect.do_rollback(dbapi_connection)
+
+def create_db_engine(url: str, **kwargs) -> Engine:
+    """
+    创建同步数据库引擎
+    - SQL Server使用pyodbc和QueuePool（带等待时间统计），批量写入启用 fast_executemany
+    - SQLite（本地开发、CI、基准测试）允许连接跨线程使用，FastAPI线程池和 DATABASE_MODE=thread 需要
+    - 连接归还时跳过重复的回滚（_skip_redundant_reset），传入 pool_reset_on_return 时使用连接池默认行为
+    """
+    if url.startswith("sqlite"):
+        kwargs.setdefault("connect_args", {"check_same_thread": False})
+    elif url.startswith("mssql+pyodbc"):
+        kwargs.setdefault("fast_executemany", settings.DB_FAST_EXECUTEMANY)
+    kwargs.setdefault("poolclass", MonitoredQueuePool)
+    kwargs.setdefault("pool_size", settings.POOL_SIZE)
+    kwargs.setdefault("max_overflow", settings.MAX_OVERFLOW)
+    kwargs.setdefault("pool_timeout", settings.POOL_TIMEOUT)
+    kwargs.setdefault("pool_recycle", settings.POOL_RECYCLE)
+    kwargs.setdefault("pool_pre_ping", settings.POOL_PRE_PING)
+    kwargs.setdefault("echo", settings.SQL_DEBUG)
+    kwargs.setdefault("pool_reset_on_return", None)
+    engine = create_engine(url, **kwargs)
+    if kwargs["pool_reset_on_return"] is None:
+        _skip_redundant_reset(engine)
+    return engine
 
 # 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=QueuePool,
-    pool_size=settings.POOL_SIZE,
-    max_overflow=settings.MAX_OVERFLOW,
-    pool_timeout=settings.POOL_TIMEOUT,
-    pool_recycle=settings.POOL_RECYCLE,
-    pool_pre_ping=settings.POOL_PRE_PING,
-    echo=settings.SQL_DEBUG
+engine = create_db_engine(settings.DATABASE_URL)
+monitor_engine("primary", engine)
+
+# 只读副本引擎，未配置副本时为None
+replica_engine: Optional[Engine] = (
+    create_db_engine(settings.DATABASE_REPLICA_URL)
+    if settings.DATABASE_REPLICA_URL else None
 )
+if replica_engine is not None:
+    monitor_engine("replica", replica_engine)
+
+# 会话info中的路由标记
+USE_REPLICA_KEY = "use_replica"
+PRIMARY_PINNED_KEY = "primary_pinned"
+# 语句执行选项：必须读取最新数据的查询（例如认证加载用户）强制走主库
+FORCE_PRIMARY_OPTION = "force_primary"
+# 只读会话标记及只读事务使用的隔离级别
+READ_ONLY_KEY = "read_only"
+READ_ONLY_ISOLATION_KEY = "read_only_isolation_level"
+
+# (引擎, 隔离级别) -> 设置了隔离级别的引擎，与原引擎共用连接池，连接归还时恢复默认隔离级别
+_isolation_binds: Dict[Any, Engine] = {}
+
+def _with_isolation_level(bind: Engine, isolation_level: str) -> Engine:
+    key = (bind, isolation_level)
+    if key not in _isolation_binds:
+        _isolation_binds[key] = bind.execution_options(isolation_level=isolation_level)
+    return _isolation_binds[key]
+
+class RoutingSession(Session):
+    """
+    主库/只读副本路由会话
+    - 会话标记 use_replica（GET接口的依赖设置）后，查询路由到只读副本
+    - flush或执行INSERT/UPDATE/DELETE语句时固定到主库，之后同一会话的读取也走主库，保证读到自己的写入
+    - 带 force_primary 执行选项的语句总是走主库，但不固定会话
+    - 未配置副本或未标记的会话全部使用主库
+    - 只读会话设置了隔离级别时，连接以该隔离级别开始事务
+    """
+
+    def __init__(self, *args: Any, replica_bind: Optional[Engine] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        bind = self._route(mapper, clause, **kwargs)
+        isolation_level = self.info.get(READ_ONLY_ISOLATION_KEY)
+        return _with_isolation_level(bind, isolation_level) if isolation_level else bind
+
+    def _route(self, mapper=None, clause=None, **kwargs):
+        if self.replica_bind is not None and self.info.get(USE_REPLICA_KEY) and not self.info.get(PRIMARY_PINNED_KEY):
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info[PRIMARY_PINNED_KEY] = True
+            elif clause is None or not clause.get_execution_options().get(FORCE_PRIMARY_OPTION):
+                return self.replica_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+@event.listens_for(RoutingSession, "before_flush")
+def _refuse_read_only_flush(session: Session, flush_context: Any, instances: Any) -> None:
+    if session.info.get(READ_ONLY_KEY):
+        raise InvalidRequestError("只读会话不允许写入（flush）")
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _refuse_read_only_dml(orm_execute_state: Any) -> None:
+    if orm_execute_state.session.info.get(READ_ONLY_KEY) and (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        raise InvalidRequestError("只读会话不允许执行INSERT/UPDATE/DELETE")
+
+def use_replica(db: Union[Session, AsyncSession]) -> None:
+    """标记会话的查询路由到只读副本（已有写入的会话仍使用主库）"""
+    db.info[USE_REPLICA_KEY] = True
+
+def use_read_only(db: Union[Session, AsyncSession]) -> None:
+    """
+    标记会话只读
+    - 禁止flush和INSERT/UPDATE/DELETE，请求结束时不提交，关闭会话时回滚
+    - 会话尚未使用连接时按 DB_READONLY_ISOLATION_LEVEL 设置隔离级别（例如SNAPSHOT），默认不设置，沿用连接的隔离级别
+    - 已开始的事务（例如认证依赖已查询过用户）保持原隔离级别
+    """
+    db.info[READ_ONLY_KEY] = True
+    if settings.DB_READONLY_ISOLATION_LEVEL and not db.in_transaction():
+        db.info[READ_ONLY_ISOLATION_KEY] = settings.DB_READONLY_ISOLATION_LEVEL
 
 # 创建会话工厂
 SessionLocal = sessionmaker(
+    class_=RoutingSession,
     autocommit=False,
     autoflush=False,
     bind=engine,
+    replica_bind=replica_engine,
     expire_on_commit=False  # 防止提交后对象过期
 )
 
+def create_async_db_engine(url: str, **kwargs) -> AsyncEngine:
+    """
+    创建异步数据库引擎
+    - SQL Server使用aioodbc，连接池参数与同步引擎一致
+    - SQLite使用aiosqlite（测试、基准），不设置连接池大小；内存数据库保留驱动默认的连接池
+    - 连接归还时跳过重复的回滚，与同步引擎相同
+    """
+    if ":memory:" not in url and not url.endswith("://"):
+        kwargs.setdefault("poolclass", MonitoredAsyncAdaptedQueuePool)
+    if not url.startswith("sqlite"):
+        kwargs.setdefault("pool_size", settings.POOL_SIZE)
+        kwargs.setdefault("max_overflow", settings.MAX_OVERFLOW)
+        kwargs.setdefault("pool_timeout", settings.POOL_TIMEOUT)
+        kwargs.setdefault("pool_recycle", settings.POOL_RECYCLE)
+    kwargs.setdefault("pool_pre_ping", settings.POOL_PRE_PING)
+    kwargs.setdefault("echo", settings.SQL_DEBUG)
+    kwargs.setdefault("pool_reset_on_return", None)
+    engine = create_async_engine(url, **kwargs)
+    if kwargs["pool_reset_on_return"] is None:
+        _skip_redundant_reset(engine.sync_engine)
+    return engine
+
+# 异步引擎只在 DATABASE_MODE=async 时创建，同步部署不需要安装aioodbc
+async_engine: Optional[AsyncEngine] = (
+    create_async_db_engine(settings.ASYNC_DATABASE_URL)
+    if settings.DATABASE_MODE == "async" else None
+)
+async_replica_engine: Optional[AsyncEngine] = (
+    create_async_db_engine(settings.ASYNC_DATABASE_REPLICA_URL)
+    if settings.DATABASE_MODE == "async" and settings.ASYNC_DATABASE_REPLICA_URL else None
+)
+
+if async_engine is not None:
+    monitor_engine("async_primary", async_engine.sync_engine)
+if async_replica_engine is not None:
+    monitor_engine("async_replica", async_replica_engine.sync_engine)
+
+# 创建异步会话工厂，路由规则与同步会话相同
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession,
+    replica_bind=async_replica_engine.sync_engine if async_replica_engine is not None else None,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # 创建基类
 Base = declarative_base()
 
@@ -46,14 +224,16 @@ def get_db() -> Generator[Session, None, None]:
         db.commit()
     ```
     
-    如果发生异常，事务会自动回滚
+    如果发生异常，事务会自动回滚；标记为只读的会话（use_read_only）不提交，关闭时回滚
     """
     session: Optional[Session] = None
     try:
         session = SessionLocal()
         yield session
-        session.commit()
-        logger.info("数据库事务已提交")
+        # 只读会话不提交，关闭会话时回滚
+        if not session.info.get(READ_ONLY_KEY):
+            session.commit()
+            logger.info("数据库事务已提交")
     except SQLAlchemyError as e:
         if session:
             session.rollback()
@@ -79,9 +259,9 @@ def init_db() -> None:
         logger.error(f"数据库初始化失败: {str(e)}")
         raise
 
-def get_db_session() -> Generator[Session, None, None]:
+def get_sync_db_session() -> Generator[Session, None, None]:
     """
-    FastAPI 依赖注入使用的数据库会话
+    FastAPI 依赖注入使用的同步数据库会话
     
     使用示例:
     ```python
@@ -91,4 +271,139 @@ def get_db_session() -> Generator[Session, None, None]:
     ```
     """
     with get_db() as session:
-        yield session 
\ No newline at end of file
+        yield session 
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    FastAPI 依赖注入使用的异步数据库会话
+    - 请求正常结束时提交（只读会话不提交，关闭时回滚），发生异常时回滚
+    - 查询通过异步驱动执行，等待数据库期间事件循环可以处理其他请求
+    """
+    session = AsyncSessionLocal()
+    try:
+        yield session
+        # 只读会话不提交，关闭会话时回滚
+        if not session.info.get(READ_ONLY_KEY):
+            await session.commit()
+            logger.info("数据库事务已提交")
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"数据库事务已回滚: {str(e)}")
+        raise
+    finally:
+        await session.close()
+        logger.debug("数据库会话已关闭")
+
+# 接口使用的数据库会话依赖，按部署的 DATABASE_MODE 选择
+get_db_session = get_async_db_session if settings.DATABASE_MODE == "async" else get_sync_db_session
+
+# ---------------------------------------------------------------------------
+# 会话操作：CRUD层通过以下函数访问数据库，同一套代码同时支持Session与AsyncSession
+# DATABASE_MODE=thread 时同步Session的调用在数据库执行器的线程池中执行
+# ---------------------------------------------------------------------------
+
+DBSession = Union[Session, AsyncSession]
+
+async def _run_sync(db: Session, fn: Callable[..., Any], *args: Any) -> Any:
+    """执行同步会话调用"""
+    if db_executor.enabled:
+        return await db_executor.run(db, fn, *args)
+    return fn(*args)
+
+async def db_execute(db: DBSession, statement: Executable, params: Optional[Dict[str, Any]] = None) -> Result:
+    """
+    执行语句
+    - params 为预构建语句中 bindparam 的参数值，热点查询的语句在模块加载时构建一次，
+      每次调用不再重新构造语句，缓存键直接命中编译缓存
+    """
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement, params)
+    if db_executor.enabled:
+        # 结果在工作线程中取完，避免在事件循环上读取游标
+        return await db_executor.run(db, lambda: db.execute(statement, params).freeze()())
+    return db.execute(statement, params)
+
+async def db_execute_dml(db: DBSession, statement: Executable, params: Optional[List[Dict[str, Any]]] = None) -> None:
+    """
+    执行不返回行的写语句（批量INSERT/UPDATE/DELETE）
+    - params 为参数字典列表时按 executemany 执行，SQL Server下由 fast_executemany 一次发送
+    """
+    if isinstance(db, AsyncSession):
+        await db.execute(statement, params)
+    elif db_executor.enabled:
+        await db_executor.run(db, lambda: db.execute(statement, params))
+    else:
+        db.execute(statement, params)
+
+async def db_stream(db: DBSession, statement: Executable, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+    """
+    以服务端游标逐批读取结果（yield_per），内存占用与总行数无关
+    - 每次产出最多 batch_size 行；DATABASE_MODE=thread 时每批在数据库执行器中读取
+    - 读取期间占用连接，调用方应使用独立会话并在结束后关闭
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    if isinstance(db, AsyncSession):
+        result = await db.stream(statement)
+        async for partition in result.partitions():
+            yield partition
+        return
+
+    result = await _run_sync(db, db.execute, statement)
+    partitions = result.partitions()
+    try:
+        while True:
+            partition = await _run_sync(db, next, partitions, None)
+            if partition is None:
+                break
+            yield partition
+    finally:
+        result.close()
+
+async def db_first(db: DBSession, statement: Executable, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+    """返回第一个实体，不存在时返回None"""
+    return (await db_execute(db, statement, params)).scalars().first()
+
+async def db_all(db: DBSession, statement: Executable, params: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """返回全部实体"""
+    return list((await db_execute(db, statement, params)).scalars().all())
+
+async def db_scalar(db: DBSession, statement: Executable, params: Optional[Dict[str, Any]] = None) -> Any:
+    """返回第一行第一列"""
+    return (await db_execute(db, statement, params)).scalar()
+
+async def db_get(db: DBSession, model: Type, ident: Any) -> Optional[Any]:
+    """按主键获取实体"""
+    if isinstance(db, AsyncSession):
+        return await db.get(model, ident)
+    return await _run_sync(db, db.get, model, ident)
+
+async def db_commit(db: DBSession) -> None:
+    """提交事务"""
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        await _run_sync(db, db.commit)
+
+async def db_rollback(db: DBSession) -> None:
+    """回滚事务"""
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        await _run_sync(db, db.rollback)
+
+async def db_refresh(db: DBSession, instance: Any, attribute_names: Optional[List[str]] = None) -> None:
+    """
+    重新加载实体
+    - AsyncSession不能在访问属性时延迟加载关联对象，响应中需要的关联属性要通过attribute_names显式加载
+    """
+    if isinstance(db, AsyncSession):
+        await db.refresh(instance, attribute_names)
+    else:
+        await _run_sync(db, db.refresh, instance, attribute_names)
+
+async def db_delete(db: DBSession, instance: Any) -> None:
+    """删除实体"""
+    if isinstance(db, AsyncSession):
+        await db.delete(instance)
+    else:
+        await _run_sync(db, db.delete, instance)
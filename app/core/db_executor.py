@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.core.config import settings
+from app.exceptions.base import ServiceUnavailableError
+
+class DatabaseExecutor:
+    """
+    同步数据库调用执行器（DATABASE_MODE=thread）
+    - CRUD层的同步查询放到专用线程池执行，等待SQL Server期间事件循环继续处理其他请求
+    - 线程数与连接池容量（POOL_SIZE + MAX_OVERFLOW）一致
+    - 会话第一次执行时在asyncio信号量上获取许可，事务结束（连接归还连接池）时释放，
+      持有许可的会话数不超过连接数，超出的请求在asyncio中排队，而不是占着线程阻塞在QueuePool中
+    - 排队超过 timeout 秒直接拒绝，与连接池的 POOL_TIMEOUT 语义一致
+    - 调用时复制当前上下文，contextvars（请求级状态）在工作线程中保持可见
+    """
+
+    permit_key = "db_executor_permit"
+
+    def __init__(self, max_workers: int, timeout: float, enabled: bool = False):
+        self.max_workers = max(max_workers, 1)
+        self.timeout = timeout
+        self.enabled = enabled
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiting = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._acquired = 0
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._wait_last_ms = 0.0
+        self._run_total_ms = 0.0
+        self._run_max_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """延迟创建线程池"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+        return self._semaphore
+
+    async def _acquire(self) -> None:
+        """获取许可并记录排队耗时"""
+        self._waiting += 1
+        wait_start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._get_semaphore().acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise ServiceUnavailableError("数据库繁忙，请稍后重试")
+        finally:
+            self._waiting -= 1
+
+        wait_ms = (time.perf_counter() - wait_start) * 1000
+        self._acquired += 1
+        self._wait_total_ms += wait_ms
+        self._wait_last_ms = wait_ms
+        self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def release(self, session: Session) -> None:
+        """释放会话持有的许可，可以在任意线程调用"""
+        if session.info.pop(self.permit_key, None) is not self:
+            return
+        if self._semaphore is None or self._loop is None or self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._semaphore.release()
+        else:
+            self._loop.call_soon_threadsafe(self._semaphore.release)
+
+    async def run(self, session: Session, fn: Callable[..., Any], *args: Any) -> Any:
+        """在线程池中执行会话的同步调用并记录排队与执行耗时"""
+        acquired = False
+        if not session.info.get(self.permit_key):
+            await self._acquire()
+            session.info[self.permit_key] = self
+            acquired = True
+
+        self._running += 1
+        run_start = time.perf_counter()
+        try:
+            context = contextvars.copy_context()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), context.run, fn, *args)
+        finally:
+            run_ms = (time.perf_counter() - run_start) * 1000
+            self._running -= 1
+            self._completed += 1
+            self._run_total_ms += run_ms
+            self._run_max_ms = max(self._run_max_ms, run_ms)
+            if acquired and not session.in_transaction():
+                # 调用没有开启事务（例如命中标识映射），会话不占用连接
+                self.release(session)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取执行器指标"""
+        return {
+            "enabled": self.enabled,
+            "max_workers": self.max_workers,
+            "available": self._semaphore._value if self._semaphore is not None else self.max_workers,
+            "queue_depth": self._waiting,
+            "running": self._running,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "acquired": self._acquired,
+            "wait_avg_ms": round(self._wait_total_ms / self._acquired, 2) if self._acquired else 0.0,
+            "wait_max_ms": round(self._wait_max_ms, 2),
+            "wait_last_ms": round(self._wait_last_ms, 2),
+            "run_avg_ms": round(self._run_total_ms / self._completed, 2) if self._completed else 0.0,
+            "run_max_ms": round(self._run_max_ms, 2),
+        }
+
+    def shutdown(self) -> None:
+        """关闭线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# 创建全局数据库执行器
+db_executor = DatabaseExecutor(
+    max_workers=settings.POOL_SIZE + settings.MAX_OVERFLOW,
+    timeout=settings.POOL_TIMEOUT,
+    enabled=settings.DATABASE_MODE == "thread"
+)
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_permit(session: Session, transaction: SessionTransaction) -> None:
+    """最外层事务结束后连接已归还连接池，释放会话的许可"""
+    if transaction.parent is None:
+        executor = session.info.get(DatabaseExecutor.permit_key)
+        if executor is not None:
+            executor.release(session)
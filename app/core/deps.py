@@ -1,12 +1,17 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from ipaddress import ip_address, ip_network
+from typing import Callable, Generator, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
-from app.exceptions.base import AuthenticationError
+from app.exceptions.base import AuthorizationError
 from app.core.config import settings
-from app.core.database import get_db, get_db_session
+from app.core.database import DBSession, FORCE_PRIMARY_OPTION, db_first, get_db, get_db_session, use_read_only, use_replica
 from app.models.user import User
+from app.core.principal import UserPrincipal, get_cached_principal, cache_principal
+from app.core.permissions import permission_registry
+from app.core.security import decode_access_token
 from app.services.auth import auth_service
 from app.core.logger import get_logger
 
@@ -14,15 +19,65 @@ logger = get_logger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# 受信任的反向代理网段
+_TRUSTED_PROXIES = [ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _TRUSTED_PROXIES)
+
+async def get_client_ip(request: Request) -> str:
+    """
+    获取客户端IP
+    - 直连地址是受信任的反向代理（TRUSTED_PROXIES）时，从 X-Forwarded-For 自右向左取第一个非代理地址
+    - 其他请求忽略 X-Forwarded-For，客户端无法伪造IP绕过按IP限流
+    """
+    host = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(host):
+        return host
+    forwarded = [address.strip() for address in request.headers.get("x-forwarded-for", "").split(",")]
+    for address in reversed([address for address in forwarded if address]):
+        host = address
+        if not _is_trusted_proxy(address):
+            break
+    return host
+
+# 认证时加载用户的预构建语句：用户快照会被缓存，始终从主库读取，避免缓存副本延迟期间的旧状态
+_PRINCIPAL_USER = select(User).where(User.Id == bindparam("id")).execution_options(**{FORCE_PRIMARY_OPTION: True})
+
+async def get_readonly_db_session(db: DBSession = Depends(get_db_session)) -> DBSession:
+    """
+    只读接口（GET）使用的主库会话
+    - 与同一请求中的其他依赖（例如 get_current_user）共用 get_db_session 的会话，不额外占用连接
+    - 会话只读：flush和INSERT/UPDATE/DELETE抛出异常，请求结束时不提交
+    - 关闭会话时的回滚是唯一的事务结束往返（连接池跳过已结束事务的重复回滚）；DB_READONLY_ISOLATION_LEVEL=SNAPSHOT 时以快照隔离读取
+    - 必须读取主库最新数据的接口（例如获取下一个菜单ID）使用此依赖，其余读取使用 get_replica_db_session
+    """
+    use_read_only(db)
+    return db
+
+async def get_replica_db_session(db: DBSession = Depends(get_readonly_db_session)) -> DBSession:
+    """
+    只读接口使用的数据库会话
+    - 在 get_readonly_db_session 的基础上，查询路由到只读副本
+    - 强制走主库的查询（force_primary）仍使用主库
+    """
+    use_replica(db)
+    return db
+
 async def get_current_user(
     db: Session = Depends(get_db_session),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> UserPrincipal:
     """
     获取当前用户
     - 验证JWT token
-    - 验证Redis中的token
-    - 返回用户信息
+    - 优先从进程内缓存读取用户快照，未命中时查询数据库
+    - 验证token是否已被撤销（默认比较令牌代数，不访问Redis）
+    - 返回用户快照
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,12 +86,8 @@ async def get_current_user(
     )
     
     try:
-        # 解码JWT token
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
+        # 解码JWT token（命中缓存时跳过签名验证）
+        payload = decode_access_token(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
@@ -44,12 +95,15 @@ async def get_current_user(
         raise credentials_exception
     
     # 获取用户信息
-    user = db.query(User).filter(User.Id == user_id).first()
+    user = get_cached_principal(user_id)
     if user is None:
-        raise credentials_exception
+        db_user = await db_first(db, _PRINCIPAL_USER, {"id": user_id})
+        if db_user is None:
+            raise credentials_exception
+        user = cache_principal(db_user)
     
-    # 验证Redis中的token
-    is_valid = await auth_service.validate_token(user_id, token)
+    # 验证token是否已被撤销
+    is_valid = await auth_service.validate_token(user_id, token, payload)
     if not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,9 +114,25 @@ async def get_current_user(
     return user
 
 async def get_current_active_superuser(
-    current_user: User = Depends(get_current_user),
-) -> User:
-    """获取当前超级用户"""
-    if not current_user.Role == "超级管理员":
-        raise AuthenticationError(message="权限不足")
-    return current_user 
\ No newline at end of file
+    current_user: UserPrincipal = Depends(get_current_user),
+) -> UserPrincipal:
+    """获取当前超级用户（按角色判断，读取内存中的权限注册表）"""
+    if not permission_registry.is_superuser(current_user.RoleId):
+        raise AuthorizationError(message="权限不足")
+    return current_user
+
+def require_permission(permission: str) -> Callable:
+    """
+    权限校验依赖
+    - 使用示例: current_user: UserPrincipal = Depends(require_permission("user:add"))
+    - 从内存权限注册表按位检查，不访问数据库
+    - 超级管理员拥有全部权限
+    """
+    async def permission_checker(
+        current_user: UserPrincipal = Depends(get_current_user),
+    ) -> UserPrincipal:
+        if not permission_registry.has_permission(current_user.RoleId, permission):
+            raise AuthorizationError(message=f"权限不足: {permission}")
+        return current_user
+
+    return permission_checker
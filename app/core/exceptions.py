@@ -14,7 +14,9 @@ from app.exceptions.base import (
     NotFoundError, 
     DatabaseError,
     AuthenticationError,
-    AuthorizationError
+    AuthorizationError,
+    ServiceUnavailableError,
+    TooManyRequestsError
 )
 
 logger = get_logger("exception_handler")
@@ -35,6 +37,7 @@ def register_exception_handlers(app: FastAPI):
             404: BusinessCode.NOT_FOUND,
             409: BusinessCode.CONFLICT,
             422: BusinessCode.VALIDATION_ERROR,
+            429: BusinessCode.TOO_MANY_REQUESTS,
             500: BusinessCode.INTERNAL_ERROR
         }
         
@@ -153,6 +156,30 @@ def register_exception_handlers(app: FastAPI):
             http_status=500
         )
     
+    @app.exception_handler(ServiceUnavailableError)
+    async def service_unavailable_exception_handler(request: Request, exc: ServiceUnavailableError):
+        """处理服务不可用异常"""
+        logger.warning(f"服务不可用: {exc.message}")
+        
+        return response_manager.error(
+            message=exc.message,
+            code=BusinessCode.SERVICE_UNAVAILABLE,
+            http_status=503
+        )
+    
+    @app.exception_handler(TooManyRequestsError)
+    async def too_many_requests_exception_handler(request: Request, exc: TooManyRequestsError):
+        """处理请求频率超限异常"""
+        logger.warning(f"请求频率超限: {exc.message}")
+        
+        response = response_manager.error(
+            message=exc.message,
+            code=BusinessCode.TOO_MANY_REQUESTS,
+            http_status=429
+        )
+        response.headers.update(exc.headers or {})
+        return response
+    
     @app.exception_handler(SQLAlchemyError)
     async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
         """处理SQLAlchemy异常"""
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.exceptions.base import ServiceUnavailableError
+
+# 配置密码哈希上下文
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS
+)
+
+# 批量哈希时每个进程池任务处理的密码数，任务之间登录请求可以插队
+HASH_BATCH_SIZE = 16
+
+def _hash_password(password: str) -> str:
+    """在工作进程中计算密码哈希"""
+    return pwd_context.hash(password)
+
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    """在工作进程中计算一批密码哈希"""
+    return [pwd_context.hash(password) for password in passwords]
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    """在工作进程中验证密码"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+class HashingExecutor:
+    """
+    密码哈希执行器
+    - bcrypt运算放到独立的进程池中执行，不占用事件循环
+    - 同时提交到进程池的任务数不超过工作进程数，其余请求在asyncio中排队
+    - 排队数量超过上限时直接拒绝，避免登录高峰时请求无限堆积
+    """
+
+    def __init__(self, max_workers: int = 0, max_queue: int = 100):
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._last_ms = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """延迟创建进程池，避免在导入阶段派生子进程"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._semaphore
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """提交哈希任务并记录排队与耗时"""
+        if self._waiting >= self.max_queue:
+            self._rejected += 1
+            raise ServiceUnavailableError("密码服务繁忙，请稍后重试")
+
+        self._waiting += 1
+        try:
+            await self._get_semaphore().acquire()
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        start_time = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            self._running -= 1
+            self._completed += 1
+            self._total_ms += elapsed_ms
+            self._last_ms = elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+            self._get_semaphore().release()
+
+    async def hash(self, password: str) -> str:
+        """计算密码哈希"""
+        return await self._submit(_hash_password, password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        批量计算密码哈希
+        - 按 HASH_BATCH_SIZE 分批提交，同时在排队或运行的批次不超过进程数，不会占满等待队列
+        - 结果顺序与输入一致
+        """
+        batches = [passwords[i:i + HASH_BATCH_SIZE] for i in range(0, len(passwords), HASH_BATCH_SIZE)]
+        limiter = asyncio.Semaphore(self.max_workers)
+
+        async def run(batch: List[str]) -> List[str]:
+            async with limiter:
+                return await self._submit(_hash_passwords, batch)
+
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        return [hashed for batch in results for hashed in batch]
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """验证密码"""
+        return await self._submit(_verify_password, plain_password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取执行器指标"""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self._waiting,
+            "running": self._running,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_ms": round(self._total_ms / self._completed, 2) if self._completed else 0.0,
+            "max_ms": round(self._max_ms, 2),
+            "last_ms": round(self._last_ms, 2),
+        }
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# 创建全局哈希执行器
+hashing_executor = HashingExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
@@ -0,0 +1,205 @@
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("jwt_keys")
+
+# 支持的非对称签名算法（python-jose不支持EdDSA）
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+@dataclass(frozen=True)
+class SigningKey:
+    """签名密钥"""
+    kid: str
+    algorithm: str
+    private_key: Key
+    public_key: Key
+
+    def to_jwk(self) -> Dict[str, Any]:
+        """导出公钥JWK"""
+        data = self.public_key.to_dict()
+        data.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return data
+
+def generate_private_key_pem(algorithm: str) -> str:
+    """生成PEM格式的私钥"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if algorithm.startswith("RS"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        curves = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+        private_key = ec.generate_private_key(curves[algorithm])
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+
+class KeyRing:
+    """
+    JWT密钥环
+    - HS256等对称算法：使用 SECRET_KEY，不发布JWKS
+    - RS256/ES256等非对称算法：从密钥目录加载 {kid}.pem 私钥
+      - 当前签名密钥由 JWT_ACTIVE_KID 指定，未指定时使用最新的密钥文件
+      - 目录中其余密钥只用于验证，轮换期间旧令牌仍然有效
+      - 令牌头部带kid，验证时按kid选择公钥
+    - 轮换方式：放入新的私钥文件（未指定 JWT_ACTIVE_KID 时最新的文件即成为签名密钥），旧令牌全部过期后删除旧文件
+      - reload_interval 大于0时每隔该秒数检查一次密钥目录，文件有增删或修改时重新加载，无需重启
+      - 遇到未知kid时立即检查一次（至少间隔1秒），其他worker先切换到新密钥签发的令牌不会被拒绝
+      - 切换 JWT_ACTIVE_KID 仍需重启
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str,
+        keys_dir: Path,
+        active_kid: Optional[str] = None,
+        reload_interval: int = 0
+    ):
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.keys_dir = Path(keys_dir)
+        self.active_kid = active_kid
+        self.reload_interval = reload_interval
+        self._keys: Dict[str, SigningKey] = {}
+        self._active: Optional[SigningKey] = None
+        self._signature: Tuple = ()
+        self._last_check = time.monotonic()
+        if self.is_asymmetric:
+            self.reload()
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def _load_key(self, path: Path) -> SigningKey:
+        private_key = jwk.construct(path.read_text(), self.algorithm)
+        return SigningKey(
+            kid=path.stem,
+            algorithm=self.algorithm,
+            private_key=private_key,
+            public_key=private_key.public_key()
+        )
+
+    def _generate_key_file(self) -> None:
+        """
+        密钥目录为空时生成默认密钥
+        - 先写临时文件再硬链接到固定文件名，多个worker同时启动时只有一个能写入成功
+        - 生产环境应预先放置密钥文件
+        """
+        self.keys_dir.mkdir(parents=True, exist_ok=True)
+        path = self.keys_dir / "default.pem"
+        tmp_path = self.keys_dir / f".{uuid.uuid4().hex}.tmp"
+        tmp_path.write_text(generate_private_key_pem(self.algorithm))
+        os.chmod(tmp_path, 0o600)
+        try:
+            os.link(tmp_path, path)
+            logger.warning(f"未找到JWT签名密钥，已生成新密钥: {path}")
+        except FileExistsError:
+            pass
+        finally:
+            tmp_path.unlink()
+
+    def _key_files(self) -> List[Path]:
+        """按修改时间排序的密钥文件"""
+        if not self.keys_dir.exists():
+            return []
+        return sorted(self.keys_dir.glob("*.pem"), key=lambda p: p.stat().st_mtime)
+
+    @staticmethod
+    def _file_signature(paths: List[Path]) -> Tuple:
+        return tuple((path.name, path.stat().st_mtime_ns) for path in paths)
+
+    def reload(self) -> None:
+        """重新加载密钥目录，用于密钥轮换"""
+        paths = self._key_files()
+        if not paths:
+            self._generate_key_file()
+            paths = self._key_files()
+        if not paths:
+            raise RuntimeError(f"JWT签名密钥目录为空: {self.keys_dir}")
+
+        keys = {}
+        for path in paths:
+            try:
+                keys[path.stem] = self._load_key(path)
+            except Exception as e:
+                logger.error(f"加载JWT签名密钥失败: {path} - {str(e)}")
+
+        active_kid = self.active_kid or paths[-1].stem
+        if active_kid not in keys:
+            raise RuntimeError(f"JWT签名密钥不存在: {active_kid}")
+
+        self._keys = keys
+        self._active = keys[active_kid]
+        self._signature = self._file_signature(paths)
+        logger.info(f"已加载 {len(keys)} 个JWT签名密钥，当前签名密钥: {active_kid}")
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        按 reload_interval 检查密钥目录，文件有增删或修改时重新加载
+        - force=True 时忽略检查间隔，但两次检查至少间隔1秒
+        - 重新加载失败时继续使用原有密钥
+        """
+        if not self.is_asymmetric or self.reload_interval <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_check < (1 if force else self.reload_interval):
+            return
+        self._last_check = now
+        try:
+            if self._file_signature(self._key_files()) != self._signature:
+                self.reload()
+        except Exception as e:
+            logger.error(f"重新加载JWT签名密钥失败，继续使用原有密钥: {str(e)}")
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """签发令牌"""
+        if not self.is_asymmetric:
+            return jwt.encode(claims, self.secret_key, algorithm=self.algorithm)
+        self.refresh()
+        return jwt.encode(
+            claims,
+            self._active.private_key,
+            algorithm=self.algorithm,
+            headers={"kid": self._active.kid}
+        )
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """验证令牌，令牌无效时抛出 JWTError"""
+        if not self.is_asymmetric:
+            return jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        self.refresh()
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._keys.get(kid)
+        if key is None:
+            self.refresh(force=True)
+            key = self._keys.get(kid)
+        if key is None:
+            raise JWTError(f"未知的签名密钥: {kid}")
+        return jwt.decode(token, key.public_key, algorithms=[self.algorithm])
+
+    def jwks(self) -> Dict[str, List[Dict[str, Any]]]:
+        """导出全部验证公钥，对称算法返回空集合"""
+        return {"keys": [key.to_jwk() for key in self._keys.values()]}
+
+# 创建全局密钥环
+key_ring = KeyRing(
+    algorithm=settings.ALGORITHM,
+    secret_key=settings.SECRET_KEY,
+    keys_dir=settings.JWT_KEYS_DIR,
+    active_kid=settings.JWT_ACTIVE_KID,
+    reload_interval=settings.JWT_KEYS_RELOAD_INTERVAL
+)
@@ -0,0 +1,117 @@
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Optional, Sequence, TypeVar
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.sql import ColumnElement, Select
+
+from app.core.database import DBSession, db_all, db_execute, db_scalar
+from app.exceptions.base import ValidationError
+
+T = TypeVar("T")
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    键集分页的排序键
+    - column: 排序使用的列或表达式，最后一个排序键必须唯一（通常为Id）
+    - value: 从结果对象中取出该键的值，用于生成下一页游标
+    """
+    column: ColumnElement
+    value: Callable[[Any], Any]
+
+@dataclass
+class Page(Generic[T]):
+    """分页查询结果"""
+    items: List[T]
+    has_next: bool
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"无法编码的游标值: {type(value).__name__}")
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """将最后一行的排序键编码为不透明游标"""
+    raw = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """解码游标，格式不正确时抛出 ValidationError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValidationError("无效的分页游标")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError("无效的分页游标")
+    return values
+
+def keyset_condition(keys: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """
+    生成 (k1, k2, ...) > (v1, v2, ...) 条件
+    - SQL Server不支持行值比较，展开为 k1 > v1 OR (k1 = v1 AND k2 > v2) ...
+    """
+    clauses = []
+    for i, key in enumerate(keys):
+        equals = [keys[j].column == values[j] for j in range(i)]
+        clauses.append(and_(*equals, key.column > values[i]))
+    return or_(*clauses)
+
+async def _count(db: DBSession, query: Select) -> int:
+    """统计过滤后的总数"""
+    return await db_scalar(db, select(func.count()).select_from(query.order_by(None).subquery()))
+
+async def paginate(
+    db: DBSession,
+    query: Select,
+    keys: Sequence[SortKey],
+    *,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> Page:
+    """
+    分页查询
+    - 按排序键排序，多取一行判断是否有下一页
+    - 传入游标时使用键集分页（忽略skip），深分页耗时与页码无关
+    - include_total 为True时统计过滤后的总数：
+      偏移分页在同一条语句中附加 COUNT(*) OVER()，一次往返同时取回本页和总数；
+      游标分页的WHERE条件会排除之前的行，总数单独统计
+    """
+    page_query = query.order_by(*(key.column for key in keys))
+    if cursor:
+        page_query = page_query.where(keyset_condition(keys, decode_cursor(cursor, len(keys))))
+    elif skip:
+        page_query = page_query.offset(skip)
+    page_query = page_query.limit(limit + 1)
+
+    total = None
+    if include_total and not cursor:
+        result = await db_execute(db, page_query.add_columns(func.count().over().label("total_count")))
+        rows = result.all()
+        if rows:
+            total = rows[0][1]
+        elif not skip:
+            total = 0
+        else:
+            # 跳过的行数超过总数时窗口函数没有返回行
+            total = await _count(db, query)
+        rows = [row[0] for row in rows]
+    else:
+        rows = await db_all(db, page_query)
+        if include_total:
+            total = await _count(db, query)
+
+    has_next = len(rows) > limit
+    items = rows[:limit]
+    next_cursor = encode_cursor([key.value(items[-1]) for key in keys]) if has_next else None
+    return Page(items=items, has_next=has_next, next_cursor=next_cursor, total=total)
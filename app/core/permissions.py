@@ -0,0 +1,323 @@
+import asyncio
+import json
+import sys
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Union
+import uuid
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache_bus import cache_bus
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.db_executor import db_executor
+from app.core.logger import get_logger
+from app.models.menu import Menu
+from app.models.role import Role
+from app.models.role_menu import RoleMenu
+
+logger = get_logger("permissions")
+
+PERMISSION_TOPIC = "permission"
+
+# 单次提交变更的键超过该数量时直接全量重建
+FULL_REBUILD_THRESHOLD = 50
+
+RoleKey = Union[str, uuid.UUID]
+
+def _role_key(role_id: RoleKey) -> str:
+    return str(role_id).lower()
+
+def _parse_permissions(value) -> List[str]:
+    """解析菜单的权限标识数组，兼容JSON字符串"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [item for item in value if isinstance(item, str) and item]
+
+class PermissionRegistry:
+    """
+    角色权限注册表
+    - 每个权限标识驻留（intern）后分配一个比特位，角色的全部权限编译为一个整数位图
+    - 权限检查只做两次字典查找和一次按位与，不访问数据库和Redis
+    - 启动时全量编译；角色、菜单、角色菜单变更提交后按角色或菜单增量重建
+    - 比特位只增不回收，权限标识数量有限，不影响位图大小
+    """
+
+    def __init__(self, superuser_role_name: str):
+        self.superuser_role_name = superuser_role_name
+        self._flags: Dict[str, int] = {}
+        self._menu_masks: Dict[int, int] = {}
+        self._role_menus: Dict[str, FrozenSet[int]] = {}
+        self._role_masks: Dict[str, int] = {}
+        self._superusers: FrozenSet[str] = frozenset()
+        self._lock = threading.Lock()
+        self.built = False
+        self.rebuilds = 0
+
+    def _flag(self, permission: str) -> int:
+        flag = self._flags.get(permission)
+        if flag is None:
+            flag = 1 << len(self._flags)
+            self._flags[sys.intern(permission)] = flag
+        return flag
+
+    def _compile_menu(self, permissions: Iterable[str]) -> int:
+        mask = 0
+        for permission in permissions:
+            mask |= self._flag(permission)
+        return mask
+
+    def _compile_role(self, menu_ids: Iterable[int]) -> int:
+        mask = 0
+        for menu_id in menu_ids:
+            mask |= self._menu_masks.get(menu_id, 0)
+        return mask
+
+    def build(self, db: Session) -> None:
+        """全量编译全部角色权限"""
+        menus = db.query(Menu.MenuId, Menu.Permission).all()
+        roles = db.query(Role.Id, Role.RoleName, Role.Status).all()
+        role_menus = db.query(RoleMenu.RoleId, RoleMenu.MenuId).filter(RoleMenu.IsEnabled == True).all()
+        self.load(menus, roles, role_menus)
+
+    def load(self, menus: Iterable, roles: Iterable, role_menus: Iterable) -> None:
+        """
+        由查询结果编译注册表
+        :param menus: (MenuId, Permission) 列表
+        :param roles: (Id, RoleName, Status) 列表
+        :param role_menus: 已启用的 (RoleId, MenuId) 列表
+        """
+        with self._lock:
+            menu_masks = {
+                menu_id: self._compile_menu(_parse_permissions(permission))
+                for menu_id, permission in menus
+            }
+
+            grants: Dict[str, Set[int]] = {}
+            for role_id, menu_id in role_menus:
+                grants.setdefault(_role_key(role_id), set()).add(menu_id)
+
+            role_menus_map: Dict[str, FrozenSet[int]] = {}
+            superusers = set()
+            for role_id, role_name, status in roles:
+                key = _role_key(role_id)
+                if status != "1":
+                    continue
+                role_menus_map[key] = frozenset(grants.get(key, ()))
+                if role_name == self.superuser_role_name:
+                    superusers.add(key)
+
+            self._menu_masks = menu_masks
+            self._role_menus = role_menus_map
+            self._role_masks = {key: self._compile_role(menu_ids) for key, menu_ids in role_menus_map.items()}
+            self._superusers = frozenset(superusers)
+            self.built = True
+            self.rebuilds += 1
+        logger.info(f"权限注册表编译完成: {len(self._role_masks)} 个角色, {len(self._flags)} 个权限标识")
+
+    def rebuild_role(self, db: Session, role_id: RoleKey) -> None:
+        """重新编译单个角色（角色状态、名称或角色菜单变更）"""
+        role = db.query(Role.RoleName, Role.Status).filter(Role.Id == role_id).first()
+        menu_ids = [
+            menu_id for (menu_id,) in db.query(RoleMenu.MenuId).filter(
+                RoleMenu.RoleId == role_id,
+                RoleMenu.IsEnabled == True
+            ).all()
+        ]
+        if role is None:
+            self.set_role(role_id, None, "0", ())
+        else:
+            self.set_role(role_id, role.RoleName, role.Status, menu_ids)
+
+    def set_role(self, role_id: RoleKey, role_name: Optional[str], status: str, menu_ids: Iterable[int]) -> None:
+        """更新单个角色，角色不存在或已禁用时移除"""
+        key = _role_key(role_id)
+        with self._lock:
+            role_menus = dict(self._role_menus)
+            role_masks = dict(self._role_masks)
+            superusers = set(self._superusers)
+            superusers.discard(key)
+            if status != "1":
+                role_menus.pop(key, None)
+                role_masks.pop(key, None)
+            else:
+                role_menus[key] = frozenset(menu_ids)
+                role_masks[key] = self._compile_role(role_menus[key])
+                if role_name == self.superuser_role_name:
+                    superusers.add(key)
+
+            self._role_menus = role_menus
+            self._role_masks = role_masks
+            self._superusers = frozenset(superusers)
+            self.rebuilds += 1
+        logger.info(f"角色权限已重新编译: {key}")
+
+    def rebuild_menu(self, db: Session, menu_id: int) -> None:
+        """重新编译单个菜单，并更新拥有该菜单的角色"""
+        menu = db.query(Menu.Permission).filter(Menu.MenuId == menu_id).first()
+        self.set_menu(menu_id, None if menu is None else _parse_permissions(menu.Permission))
+
+    def set_menu(self, menu_id: int, permissions: Optional[Iterable[str]]) -> None:
+        """更新单个菜单的权限标识，permissions为None表示菜单已删除"""
+        with self._lock:
+            menu_masks = dict(self._menu_masks)
+            if permissions is None:
+                menu_masks.pop(menu_id, None)
+            else:
+                menu_masks[menu_id] = self._compile_menu(permissions)
+            self._menu_masks = menu_masks
+
+            role_masks = dict(self._role_masks)
+            for key, menu_ids in self._role_menus.items():
+                if menu_id in menu_ids:
+                    role_masks[key] = self._compile_role(menu_ids)
+            self._role_masks = role_masks
+            self.rebuilds += 1
+        logger.info(f"菜单权限已重新编译: {menu_id}")
+
+    def is_superuser(self, role_id: RoleKey) -> bool:
+        """角色是否为超级管理员"""
+        return _role_key(role_id) in self._superusers
+
+    def has_permission(self, role_id: RoleKey, permission: str) -> bool:
+        """检查角色是否拥有权限，超级管理员拥有全部权限"""
+        key = _role_key(role_id)
+        if key in self._superusers:
+            return True
+        flag = self._flags.get(permission)
+        if flag is None:
+            return False
+        return bool(self._role_masks.get(key, 0) & flag)
+
+    def get_permissions(self, role_id: RoleKey) -> List[str]:
+        """获取角色拥有的全部权限标识"""
+        mask = self._role_masks.get(_role_key(role_id), 0)
+        return sorted(permission for permission, flag in self._flags.items() if mask & flag)
+
+    def _reload(self, db: Session, key: str) -> None:
+        """
+        按权限变更消息重新编译
+        - role:{角色ID} 重新编译角色
+        - menu:{MenuId} 重新编译菜单
+        - all 全量编译
+        """
+        kind, _, value = key.partition(":")
+        if kind == "role":
+            self.rebuild_role(db, uuid.UUID(value))
+        elif kind == "menu":
+            self.rebuild_menu(db, int(value))
+        else:
+            self.build(db)
+
+    def _reload_and_close(self, db: Session, key: str) -> None:
+        try:
+            self._reload(db, key)
+        finally:
+            db.close()
+
+    def reload(self, key: str) -> None:
+        """在当前线程中处理权限变更消息（脚本、没有事件循环的线程）"""
+        try:
+            self._reload_and_close(SessionLocal(), key)
+        except Exception as e:
+            logger.error(f"重新编译权限失败: {key} - {str(e)}")
+
+    async def apply(self, key: str) -> None:
+        """
+        处理缓存失效总线上的权限变更消息，查询方式与接口一致
+        - DATABASE_MODE=thread 通过数据库执行器在线程池中查询
+        - DATABASE_MODE=async 使用异步会话
+        - sync 模式在事件循环上查询
+        """
+        try:
+            if settings.DATABASE_MODE == "async":
+                async with AsyncSessionLocal() as db:
+                    await db.run_sync(self._reload, key)
+            elif db_executor.enabled:
+                db = SessionLocal()
+                await db_executor.run(db, self._reload_and_close, db, key)
+            else:
+                self._reload_and_close(SessionLocal(), key)
+        except Exception as e:
+            logger.error(f"重新编译权限失败: {key} - {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """注册表统计"""
+        return {
+            "roles": len(self._role_masks),
+            "menus": len(self._menu_masks),
+            "permissions": len(self._flags),
+            "superuser_roles": len(self._superusers),
+            "rebuilds": self.rebuilds
+        }
+
+# 创建全局权限注册表
+permission_registry = PermissionRegistry(settings.SUPERUSER_ROLE_NAME)
+
+cache_bus.register(PERMISSION_TOPIC, permission_registry.apply)
+
+# ---------------------------------------------------------------------------
+# 变更跟踪：在会话flush时记录受影响的角色和菜单，提交后广播增量重建
+# ---------------------------------------------------------------------------
+
+_CHANGES_KEY = "permission_changes"
+_pending_tasks: Set[asyncio.Task] = set()
+
+def _attribute_values(obj, name: str) -> Set:
+    """属性当前值及本次flush前的旧值"""
+    history = inspect(obj).attrs[name].history
+    values = set(history.added or ()) | set(history.unchanged or ()) | set(history.deleted or ())
+    if not values:
+        values.add(getattr(obj, name, None))
+    values.discard(None)
+    return values
+
+@event.listens_for(Session, "after_flush")
+def _collect_permission_changes(session: Session, flush_context) -> None:
+    changes: Optional[Set[str]] = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, RoleMenu):
+            keys = {f"role:{_role_key(role_id)}" for role_id in _attribute_values(obj, "RoleId")}
+        elif isinstance(obj, Role):
+            keys = {f"role:{_role_key(role_id)}" for role_id in _attribute_values(obj, "Id")}
+        elif isinstance(obj, Menu):
+            keys = {f"menu:{menu_id}" for menu_id in _attribute_values(obj, "MenuId")}
+        else:
+            continue
+        if changes is None:
+            changes = session.info.setdefault(_CHANGES_KEY, set())
+        changes.update(keys)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_permission_changes(session: Session) -> None:
+    session.info.pop(_CHANGES_KEY, None)
+
+@event.listens_for(Session, "after_commit")
+def _publish_permission_changes(session: Session) -> None:
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    keys = sorted(changes) if len(changes) <= FULL_REBUILD_THRESHOLD else ["all"]
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 在线程池中提交（DATABASE_MODE=thread）时交给事件循环广播；
+        # 不在应用中运行（脚本、后台任务）时只重建本进程
+        for key in keys:
+            if not cache_bus.publish_threadsafe(PERMISSION_TOPIC, key):
+                permission_registry.reload(key)
+        return
+
+    for key in keys:
+        task = loop.create_task(cache_bus.publish(PERMISSION_TOPIC, key))
+        _pending_tasks.add(task)
+        task.add_done_callback(_pending_tasks.discard)
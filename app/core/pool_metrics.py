@@ -0,0 +1,286 @@
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.db_executor import db_executor
+from app.core.logger import get_logger
+
+logger = get_logger("pool_metrics")
+
+# 获取连接等待时间的分桶上限（毫秒），最后一个桶为超过最大上限
+WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+class PoolMonitor:
+    """
+    连接池监控
+    - 通过池事件记录签出/签入、新建连接耗时、pre_ping失败、连接失效
+    - 获取连接的等待时间由 MonitoredQueuePool 记录（包含排队、pre_ping和新建连接），超时单独计数
+    - 每次签出时记录当时已签出的连接数，用于统计并发分布和给出连接池大小建议
+    - 事件在事件循环或数据库执行器线程中触发，计数用锁保护
+    """
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空统计（调整配置后重新观察）"""
+        with self._lock:
+            self.started_at = time.time()
+            self.in_use = 0
+            self.peak_in_use = 0
+            self.peak_overflow = 0
+            self.checkouts = 0
+            self.concurrency: List[int] = []
+            self.wait_count = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+            self.timeouts = 0
+            self.connects = 0
+            self.connect_errors = 0
+            self.connect_total_ms = 0.0
+            self.connect_max_ms = 0.0
+            self.pre_ping_failures = 0
+            self.invalidations = 0
+
+    @property
+    def pool(self) -> Any:
+        # dispose() 会重建连接池，每次从引擎读取当前的池
+        return self.engine.pool
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            if self.in_use >= len(self.concurrency):
+                self.concurrency.extend([0] * (self.in_use + 1 - len(self.concurrency)))
+            self.concurrency[self.in_use] += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            size = getattr(self.pool, "size", lambda: 0)()
+            self.peak_overflow = max(self.peak_overflow, self.in_use - size)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def record_wait(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+        if elapsed_ms >= settings.POOL_SLOW_CHECKOUT_MS:
+            logger.warning(f"获取数据库连接耗时 {elapsed_ms:.0f}ms: {self.name} {self.pool.status()}")
+
+    def record_timeout(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+        logger.error(f"获取数据库连接超时（{elapsed_ms:.0f}ms）: {self.name} {self.pool.status()}")
+
+    def record_connect(self, elapsed_ms: float, error: bool = False) -> None:
+        with self._lock:
+            if error:
+                self.connect_errors += 1
+                return
+            self.connects += 1
+            self.connect_total_ms += elapsed_ms
+            self.connect_max_ms = max(self.connect_max_ms, elapsed_ms)
+
+    def record_pre_ping_failure(self) -> None:
+        with self._lock:
+            self.pre_ping_failures += 1
+
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def _wait_percentile(self, fraction: float) -> Optional[float]:
+        """按分桶估算等待时间分位数（返回所在桶的上限）"""
+        if not self.wait_count:
+            return None
+        target = math.ceil(self.wait_count * fraction)
+        seen = 0
+        for i, count in enumerate(self.wait_buckets):
+            seen += count
+            if seen >= target:
+                return float(WAIT_BUCKETS_MS[i]) if i < len(WAIT_BUCKETS_MS) else round(self.wait_max_ms, 2)
+        return round(self.wait_max_ms, 2)
+
+    def concurrency_percentile(self, fraction: float) -> int:
+        """签出时已签出连接数的分位数"""
+        if not self.checkouts:
+            return 0
+        target = math.ceil(self.checkouts * fraction)
+        seen = 0
+        for in_use, count in enumerate(self.concurrency):
+            seen += count
+            if seen >= target:
+                return in_use
+        return self.peak_in_use
+
+    def stats(self) -> Dict[str, Any]:
+        """连接池指标"""
+        pool = self.pool
+        with self._lock:
+            buckets = {
+                (f"<={bound}ms" if i < len(WAIT_BUCKETS_MS) else f">{WAIT_BUCKETS_MS[-1]}ms"): count
+                for i, (bound, count) in enumerate(zip(WAIT_BUCKETS_MS + (None,), self.wait_buckets))
+            }
+            return {
+                "pool_class": type(pool).__name__,
+                "pool_size": getattr(pool, "size", lambda: None)(),
+                "max_overflow": getattr(pool, "_max_overflow", None),
+                "timeout": getattr(pool, "_timeout", None),
+                "checked_out": getattr(pool, "checkedout", lambda: None)(),
+                "checked_in": getattr(pool, "checkedin", lambda: None)(),
+                "overflow": getattr(pool, "overflow", lambda: None)(),
+                "peak_checked_out": self.peak_in_use,
+                "peak_overflow": max(self.peak_overflow, 0),
+                "checkouts": self.checkouts,
+                "concurrency_p50": self.concurrency_percentile(0.50),
+                "concurrency_p95": self.concurrency_percentile(0.95),
+                "concurrency_p99": self.concurrency_percentile(0.99),
+                "wait": {
+                    "count": self.wait_count,
+                    "avg_ms": round(self.wait_total_ms / self.wait_count, 2) if self.wait_count else 0.0,
+                    "p95_ms": self._wait_percentile(0.95),
+                    "max_ms": round(self.wait_max_ms, 2),
+                    "buckets": buckets,
+                },
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "connect_errors": self.connect_errors,
+                "connect_avg_ms": round(self.connect_total_ms / self.connects, 2) if self.connects else 0.0,
+                "connect_max_ms": round(self.connect_max_ms, 2),
+                "pre_ping_failures": self.pre_ping_failures,
+                "invalidations": self.invalidations,
+                "observed_seconds": round(time.time() - self.started_at, 1),
+            }
+
+    def advise(self, workers: int = 1, headroom: float = 0.2) -> Dict[str, Any]:
+        """
+        根据观察到的并发给出连接池大小建议（单个worker进程）
+        - pool_size 覆盖p95并发并留出余量，常驻连接不会长期闲置
+        - max_overflow 覆盖观察到的峰值，突发时不排队
+        - 出现超时或等待时间较长时说明峰值被池容量截断，按当前容量上调
+        - workers 为部署的worker进程数，用于估算数据库总连接数
+        """
+        stats = self.stats()
+        reasons = []
+        p95 = stats["concurrency_p95"]
+        peak = stats["peak_checked_out"]
+        capacity = (stats["pool_size"] or 0) + (stats["max_overflow"] or 0)
+
+        pool_size = max(math.ceil(p95 * (1 + headroom)), 1)
+        max_peak = max(math.ceil(peak * (1 + headroom)), pool_size)
+        saturated = stats["timeouts"] > 0 or (stats["wait"]["p95_ms"] or 0) >= settings.POOL_SLOW_CHECKOUT_MS
+        if saturated and capacity:
+            # 峰值被容量截断，真实需求未知，至少在当前容量基础上增加一半
+            max_peak = max(max_peak, math.ceil(capacity * 1.5))
+            reasons.append(
+                f"观察期内获取连接超时 {stats['timeouts']} 次、等待p95 {stats['wait']['p95_ms']}ms，"
+                f"并发峰值受连接池容量 {capacity} 限制"
+            )
+        reasons.append(f"p95并发 {p95}，峰值 {peak}，预留 {int(headroom * 100)}% 余量")
+        if stats["checkouts"] < 1000:
+            reasons.append(f"样本较少（{stats['checkouts']} 次签出），建议在高峰期观察后再调整")
+        if settings.DATABASE_MODE == "thread" and self.name == "primary":
+            # 线程模式下请求在数据库执行器中排队，连接池本身不会出现等待
+            executor = db_executor.stats()
+            if not saturated and capacity and (executor["rejected"] or executor["wait_avg_ms"] >= settings.POOL_SLOW_CHECKOUT_MS):
+                max_peak = max(max_peak, math.ceil(capacity * 1.5))
+                reasons.append(
+                    f"数据库执行器平均排队 {executor['wait_avg_ms']}ms、拒绝 {executor['rejected']} 次，并发峰值受连接池容量 {capacity} 限制"
+                )
+            reasons.append("DATABASE_MODE=thread 时数据库执行器线程数等于连接池容量，调整后同时改变并行查询数")
+
+        max_overflow = max_peak - pool_size
+        return {
+            "current": {"pool_size": stats["pool_size"], "max_overflow": stats["max_overflow"]},
+            "recommended": {"pool_size": pool_size, "max_overflow": max_overflow},
+            "workers": workers,
+            "total_connections": workers * (pool_size + max_overflow),
+            "reasons": reasons,
+        }
+
+class _MonitoredPoolMixin:
+    """记录获取连接的等待时间，重建连接池（engine.dispose）时保留监控"""
+    monitor: Optional[PoolMonitor] = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.monitor is not None:
+                self.monitor.record_timeout((time.perf_counter() - start) * 1000)
+            raise
+        if self.monitor is not None:
+            self.monitor.record_wait((time.perf_counter() - start) * 1000)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+class MonitoredQueuePool(_MonitoredPoolMixin, QueuePool):
+    """带等待时间统计的QueuePool（同步引擎）"""
+
+class MonitoredAsyncAdaptedQueuePool(_MonitoredPoolMixin, AsyncAdaptedQueuePool):
+    """带等待时间统计的AsyncAdaptedQueuePool（异步引擎）"""
+
+# 已监控的连接池：名称 -> 监控
+pool_monitors: Dict[str, PoolMonitor] = {}
+
+def monitor_engine(name: str, engine: Engine) -> PoolMonitor:
+    """为引擎注册连接池事件并加入监控列表，异步引擎传入 async_engine.sync_engine"""
+    monitor = PoolMonitor(name, engine)
+    if isinstance(engine.pool, _MonitoredPoolMixin):
+        engine.pool.monitor = monitor
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        monitor.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        monitor.record_checkin()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        monitor.record_invalidation()
+
+    @event.listens_for(engine, "do_connect")
+    def _on_connect(dialect, conn_rec, cargs, cparams):
+        # 由监听器建立连接以测量耗时，返回的连接直接交给连接池
+        start = time.perf_counter()
+        try:
+            connection = dialect.connect(*cargs, **cparams)
+        except Exception:
+            monitor.record_connect(0, error=True)
+            raise
+        monitor.record_connect((time.perf_counter() - start) * 1000)
+        return connection
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        if context.is_pre_ping:
+            monitor.record_pre_ping_failure()
+
+    pool_monitors[name] = monitor
+    return monitor
@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+import uuid
+
+from app.core.cache_bus import cache_bus
+from app.core.config import settings
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+PRINCIPAL_TOPIC = "principal"
+# 批量失效主题，消息键为逗号分隔的用户ID
+PRINCIPALS_TOPIC = "principals"
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """
+    已认证用户快照
+    - 只包含鉴权需要的字段，避免每个请求都查询用户表
+    - 字段名与User模型保持一致，依赖方可以像使用User一样读取
+    """
+    Id: uuid.UUID
+    UserName: str
+    Email: str
+    Status: str
+    RoleId: uuid.UUID
+    DepartmentId: uuid.UUID
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            Id=user.Id,
+            UserName=user.UserName,
+            Email=user.Email,
+            Status=user.Status,
+            RoleId=user.RoleId,
+            DepartmentId=user.DepartmentId
+        )
+
+# 已认证用户缓存，键为用户ID字符串
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+def _normalize_key(user_id: Union[str, uuid.UUID]) -> str:
+    return str(user_id).lower()
+
+def get_cached_principal(user_id: Union[str, uuid.UUID]) -> Optional[UserPrincipal]:
+    """从缓存获取用户快照"""
+    return principal_cache.get(_normalize_key(user_id))
+
+def cache_principal(user: User) -> UserPrincipal:
+    """缓存用户快照"""
+    principal = UserPrincipal.from_user(user)
+    principal_cache.set(_normalize_key(user.Id), principal)
+    return principal
+
+async def invalidate_principal(user_id: Union[str, uuid.UUID]) -> None:
+    """用户数据变更后使所有worker中的快照失效"""
+    await cache_bus.publish(PRINCIPAL_TOPIC, _normalize_key(user_id))
+
+async def invalidate_principals(user_ids: Iterable[Union[str, uuid.UUID]]) -> None:
+    """批量写入后使一批用户的快照失效，只广播一条消息"""
+    keys = ",".join(_normalize_key(user_id) for user_id in user_ids)
+    if keys:
+        await cache_bus.publish(PRINCIPALS_TOPIC, keys)
+
+def _pop_principals(keys: str) -> None:
+    for key in keys.split(","):
+        principal_cache.pop(key)
+
+cache_bus.register(PRINCIPAL_TOPIC, principal_cache.pop)
+cache_bus.register(PRINCIPALS_TOPIC, _pop_principals)
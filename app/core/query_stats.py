@@ -0,0 +1,95 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# 连接info中记录语句开始时间的键（同一连接上语句串行执行，用栈兼容嵌套）
+_START_KEY = "query_stats_start"
+# 展开后的IN参数列表 (?, ?, ?) / (:p1, :p2) 归并为一个占位符，参数个数不同的同类查询视为相同形状
+_IN_LIST = re.compile(r"\(\s*(?:\?|:\w+|%\(\w+\)s|%s)(?:\s*,\s*(?:\?|:\w+|%\(\w+\)s|%s))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(statement: str) -> str:
+    """语句形状：合并空白和IN参数列表，参数已是占位符，相同形状即同一条查询反复执行"""
+    return _IN_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+class QueryStats:
+    """
+    单个请求的SQL统计
+    - 语句数、数据库耗时（游标执行耗时，不含取结果）
+    - 按语句形状计数，同一形状执行次数达到 SQL_N_PLUS_ONE_THRESHOLD 视为疑似N+1
+    - 由 track_queries 放入上下文变量，thread 模式下执行器复制上下文，工作线程中记录到同一个对象
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """执行次数达到阈值的语句形状，按次数降序"""
+        threshold = threshold or settings.SQL_N_PLUS_ONE_THRESHOLD
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def summary(self) -> Dict[str, Any]:
+        repeated = self.repeated()
+        return {
+            "sql_count": self.count,
+            "sql_time_ms": round(self.total_ms, 2),
+            "sql_repeated": [{"statement": shape[:200], "count": count} for shape, count in repeated],
+        }
+
+    def header(self) -> str:
+        """响应头内容，例如 count=3; time_ms=1.52; repeated=0"""
+        return f"count={self.count}; time_ms={self.total_ms:.2f}; repeated={len(self.repeated())}"
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def current_query_stats() -> Optional[QueryStats]:
+    """当前请求的SQL统计，不在请求中时为None"""
+    return _current.get()
+
+@contextmanager
+def track_queries() -> Generator[QueryStats, None, None]:
+    """在上下文中统计执行的SQL，中间件为每个请求开启，测试和脚本也可直接使用"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    start = starts.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - start) * 1000)
+
+@event.listens_for(Engine, "handle_error")
+def _on_error(context):
+    # 执行失败时没有 after_cursor_execute，丢弃开始时间
+    if context.connection is not None and not (context.is_disconnect or context.is_pre_ping):
+        starts = context.connection.info.get(_START_KEY)
+        if starts:
+            starts.pop()
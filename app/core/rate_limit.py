@@ -0,0 +1,122 @@
+import math
+import uuid
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.session_store import session_store
+from app.exceptions.base import TooManyRequestsError
+
+logger = get_logger("rate_limit")
+
+class LoginRateLimiter:
+    """
+    登录限流器
+    - 按邮箱和客户端IP分别维护滑动窗口，只有验证失败的登录持续占用额度
+    - 检查与占用额度在一次原子操作中完成，并发的请求不会同时通过检查；认证成功后归还额度
+    - 检查在查询用户和bcrypt验证之前执行，超限请求不消耗哈希进程池
+    - 存储不可用时放行，由哈希执行器的排队上限兜底
+    """
+
+    key_prefix = "login_throttle:"
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        window_seconds: int = 60,
+        per_email: int = 5,
+        per_ip: int = 20
+    ):
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self._checked = 0
+        self._allowed = 0
+        self._rejected_email = 0
+        self._rejected_ip = 0
+        self._released = 0
+        self._errors = 0
+
+    def _email_key(self, email: str) -> str:
+        return f"{self.key_prefix}email:{email.strip().lower()}"
+
+    def _ip_key(self, client_ip: str) -> str:
+        return f"{self.key_prefix}ip:{client_ip}"
+
+    async def check(self, email: str, client_ip: str) -> Optional[str]:
+        """
+        检查邮箱和IP在窗口内的尝试次数，未超限时原子地占用一次额度
+        :return: 额度标识，认证成功后交给 release 归还；限流关闭或存储不可用时返回None
+        :raises TooManyRequestsError: 邮箱或IP在窗口内的尝试次数已达上限
+        """
+        if not self.enabled:
+            return None
+
+        self._checked += 1
+        reservation = uuid.uuid4().hex
+        try:
+            retry_after_ms, blocked = await session_store.hit_sliding_window(
+                [self._email_key(email), self._ip_key(client_ip)],
+                [self.per_email, self.per_ip],
+                self.window_seconds * 1000,
+                member=reservation
+            )
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"登录限流检查失败，本次放行: {str(e)}")
+            return None
+
+        if blocked < 0:
+            self._allowed += 1
+            return reservation
+
+        retry_after = max(1, math.ceil(retry_after_ms / 1000))
+        if blocked == 0:
+            self._rejected_email += 1
+            logger.warning(f"登录尝试过于频繁: 邮箱 {email}，{retry_after}秒后重试")
+        else:
+            self._rejected_ip += 1
+            logger.warning(f"登录尝试过于频繁: IP {client_ip}，{retry_after}秒后重试")
+        raise TooManyRequestsError(
+            f"登录尝试过于频繁，请{retry_after}秒后重试",
+            retry_after=retry_after
+        )
+
+    async def release(self, email: str, client_ip: str, reservation: Optional[str]) -> None:
+        """归还认证成功的登录占用的额度"""
+        if reservation is None:
+            return
+
+        self._released += 1
+        try:
+            await session_store.release_sliding_window(
+                [self._email_key(email), self._ip_key(client_ip)],
+                reservation
+            )
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"归还登录限流额度失败: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """获取限流指标"""
+        return {
+            "enabled": self.enabled,
+            "window_seconds": self.window_seconds,
+            "per_email": self.per_email,
+            "per_ip": self.per_ip,
+            "checked": self._checked,
+            "allowed": self._allowed,
+            "rejected_email": self._rejected_email,
+            "rejected_ip": self._rejected_ip,
+            "released": self._released,
+            "errors": self._errors,
+        }
+
+# 创建全局登录限流器
+login_rate_limiter = LoginRateLimiter(
+    enabled=settings.LOGIN_RATE_LIMIT_ENABLED,
+    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW,
+    per_email=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    per_ip=settings.LOGIN_RATE_LIMIT_PER_IP
+)
@@ -1,4 +1,4 @@
-from typing import Any, List, Optional, TypeVar, Union
+from typing import TYPE_CHECKING, Any, List, Optional, TypeVar, Union
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 import math
@@ -14,6 +14,9 @@ from app.schemas.response import (
 
 T = TypeVar('T')
 
+if TYPE_CHECKING:
+    from app.core.pagination import Page
+
 class ResponseManager:
     """响应管理器"""
     
@@ -120,21 +123,31 @@ class ResponseManager:
     @staticmethod
     def paginated(
         items: List[T],
-        total: int,
+        total: Optional[int],
         page: int = 1,
         page_size: int = 10,
-        message: str = "查询成功"
+        message: str = "查询成功",
+        has_next: Optional[bool] = None,
+        has_prev: Optional[bool] = None,
+        next_cursor: Optional[str] = None
     ) -> PaginationResponse:
-        """创建分页响应"""
-        total_pages = math.ceil(total / page_size) if page_size > 0 else 0
+        """
+        创建分页响应
+        - total 为None（未统计总数）时必须传入 has_next
+        - 游标分页时传入 next_cursor，页码仅供参考
+        """
+        total_pages = None
+        if total is not None:
+            total_pages = math.ceil(total / page_size) if page_size > 0 else 0
         
         pagination_meta = PaginationMeta(
             total=total,
             page=page,
             page_size=page_size,
             total_pages=total_pages,
-            has_next=page < total_pages,
-            has_prev=page > 1
+            has_next=has_next if has_next is not None else page < (total_pages or 0),
+            has_prev=has_prev if has_prev is not None else page > 1,
+            next_cursor=next_cursor
         )
         
         pagination_data = PaginationData(
@@ -149,5 +162,25 @@ class ResponseManager:
             success=True
         )
 
+    @staticmethod
+    def page(
+        result: "Page",
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        message: str = "查询成功"
+    ) -> PaginationResponse:
+        """由分页查询结果（app.core.pagination.Page）创建分页响应"""
+        return ResponseManager.paginated(
+            items=result.items,
+            total=result.total,
+            page=(skip // limit) + 1 if limit > 0 and not cursor else 1,
+            page_size=limit,
+            message=message,
+            has_next=result.has_next,
+            has_prev=bool(cursor) or skip > 0,
+            next_cursor=result.next_cursor
+        )
+
 # 创建全局响应管理器实例
 response_manager = ResponseManager() 
\ No newline at end of file
@@ -1,88 +1,284 @@
-from datetime import datetime, timedelta
-from datetime import timezone
-from typing import Optional, Union
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from dataclasses import replace
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+from jose import JWTError
 from app.core.config import settings
-from app.core.redis import redis_client
+from app.core.jwt_keys import key_ring
+from app.core.session_store import RefreshGrant, SessionRecord, session_store
+from app.core.hashing import hashing_executor
+from app.core.cache_bus import cache_bus
+from app.utils.cache import TTLCache
+from app.exceptions.base import AuthenticationError
+import hashlib
+import secrets
+import time
 import uuid
 from app.core.logger import get_logger
 
 logger = get_logger(__name__)
 
-# 配置密码哈希上下文
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto"
+# 已验证JWT缓存：键为令牌摘要，值为解码后的声明，缓存到令牌过期为止
+JWT_CACHE_TOPIC = "jwt"
+jwt_cache = TTLCache(
+    maxsize=settings.JWT_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
 )
+# 用户ID -> {令牌摘要: 过期时间}，用于撤销时清理；容量与 jwt_cache 相同，条目保留到该用户最晚过期的令牌过期
+_jwt_cache_index = TTLCache(
+    maxsize=settings.JWT_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    解码并验证访问令牌
+    - 同一令牌的签名只验证一次，之后直接返回缓存的声明
+    - 缓存条目在令牌过期时失效
+    - 令牌无效时抛出 JWTError
+    """
+    digest = _token_digest(token)
+    payload = jwt_cache.get(digest)
+    if payload is not None:
+        return payload
+    
+    payload = key_ring.decode(token)
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = float(exp) - time.time()
+        if ttl > 0:
+            jwt_cache.set(digest, payload, ttl=ttl)
+            _index_token(str(payload.get("sub")), digest, ttl)
+    return payload
+
+def _index_token(user_id: str, digest: str, ttl: float) -> None:
+    """记录用户已缓存的令牌摘要，同时丢弃该用户已过期的摘要"""
+    now = time.monotonic()
+    digests = {
+        cached: expires_at
+        for cached, expires_at in (_jwt_cache_index.get(user_id) or {}).items()
+        if expires_at > now
+    }
+    digests[digest] = now + ttl
+    _jwt_cache_index.set(user_id, digests, ttl=max(digests.values()) - now)
+
+def _evict_user_tokens(user_id: str) -> None:
+    """清理用户所有已缓存的令牌声明"""
+    for digest in _jwt_cache_index.pop(str(user_id)) or {}:
+        jwt_cache.pop(digest)
+
+cache_bus.register(JWT_CACHE_TOPIC, _evict_user_tokens)
+
+# 令牌代数：签发时刻的毫秒时间戳，写入令牌的gen声明
+# 撤销用户全部令牌时把该用户的最小有效代数提升到当前时刻，代数更小的令牌即失效
+TOKEN_GENERATION_TOPIC = "token_generation"
+# 用户ID -> 最小有效代数，通过缓存失效总线在worker之间同步，TTL兜底订阅中断期间的遗漏
+token_generation_cache = TTLCache(
+    maxsize=settings.TOKEN_GENERATION_CACHE_SIZE,
+    ttl=settings.TOKEN_GENERATION_CACHE_TTL
+)
+
+def _new_generation() -> int:
+    return int(time.time() * 1000)
+
+def _token_generation_expire() -> int:
+    """最小有效代数需要保留到旧访问令牌和旧刷新令牌全部过期"""
+    return max(
+        settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+    )
+
+def _apply_token_generation(message: str) -> None:
+    """处理代数变更消息（格式 用户ID:代数），同时清理该用户已缓存的令牌声明"""
+    user_id, _, generation = message.rpartition(":")
+    current = token_generation_cache.get(user_id) or 0
+    token_generation_cache.set(user_id, max(current, int(generation)))
+    _evict_user_tokens(user_id)
+
+cache_bus.register(TOKEN_GENERATION_TOPIC, _apply_token_generation)
+
+async def check_token_generation(user_id: Union[str, int], generation: int) -> bool:
+    """
+    验证令牌代数是否仍然有效
+    - 最小有效代数命中进程内缓存时不需要网络IO
+    - 未命中时从会话存储读取一次并缓存
+    """
+    key = str(user_id)
+    min_generation = token_generation_cache.get(key)
+    if min_generation is None:
+        min_generation = await session_store.get_token_generation(key)
+        token_generation_cache.set(key, min_generation)
+    return int(generation) >= min_generation
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """验证密码（在哈希进程池中执行）"""
+    return await hashing_executor.verify(plain_password, hashed_password)
 
 async def get_password_hash(password: str) -> str:
-    """获取密码哈希"""
-    return pwd_context.hash(password)
+    """获取密码哈希（在哈希进程池中执行）"""
+    return await hashing_executor.hash(password)
+
+async def get_password_hashes(passwords: List[str]) -> List[str]:
+    """批量获取密码哈希（在哈希进程池中并行执行）"""
+    return await hashing_executor.hash_many(passwords)
+
+def _new_session(
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    generation: Optional[int] = None,
+    client: str = ""
+) -> SessionRecord:
+    """生成会话记录，令牌代数默认使用当前时刻"""
+    now = int(time.time())
+    if expires_delta:
+        lifetime = int(expires_delta.total_seconds())
+    else:
+        lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    return SessionRecord(
+        session_id=str(uuid.uuid4()),
+        user_id=str(subject),
+        issued_at=now,
+        expires_at=now + max(lifetime, 1),
+        client=client,
+        generation=generation or _new_generation()
+    )
+
+def _encode_session_token(record: SessionRecord) -> str:
+    """按会话记录生成JWT令牌（非对称算法时头部带kid）"""
+    return key_ring.encode({
+        "exp": record.expires_at,
+        "iat": record.issued_at,
+        "sub": record.user_id,
+        "session_id": record.session_id,
+        "gen": record.generation
+    })
+
+def _encode_access_token(
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    generation: Optional[int] = None,
+    client: str = ""
+) -> Tuple[str, SessionRecord]:
+    """
+    生成JWT令牌
+    :return: (令牌, 会话记录)
+    """
+    record = _new_session(subject, expires_delta, generation, client)
+    return _encode_session_token(record), record
+
+def _refresh_token_expire() -> int:
+    return settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
 
 async def create_access_token(
     subject: Union[str, int],
     expires_delta: Optional[timedelta] = None
 ) -> str:
     """创建访问令牌"""
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+    encoded_jwt, record = _encode_access_token(subject, expires_delta)
     
-    # 生成唯一的会话ID
-    session_id = str(uuid.uuid4())
-    
-    # 创建令牌数据
-    to_encode = {
-        "exp": expire,
-        "sub": str(subject),
-        "session_id": session_id
-    }
-    
-    # 生成JWT令牌
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
-    
-    # 将令牌信息存储到Redis
-    redis_key = f"token:{session_id}"
-    await redis_client.setex(
-        redis_key,
-        settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,  # 转换为秒
-        encoded_jwt
-    )
+    # 写入会话记录和用户会话索引
+    await session_store.create_session(record)
     
     return encoded_jwt
 
+async def _create_login_session(
+    record: SessionRecord,
+    refresh: Optional[RefreshGrant] = None
+) -> None:
+    """写入登录会话并广播新的最小有效代数"""
+    _evict_user_tokens(record.user_id)
+    try:
+        await session_store.create_login_session(record, _token_generation_expire(), refresh)
+    except Exception as e:
+        logger.error(f"存储登录令牌失败: {str(e)}")
+        raise ConnectionError("令牌服务暂时不可用") from e
+    await cache_bus.publish(TOKEN_GENERATION_TOPIC, f"{record.user_id}:{record.generation}")
+
+async def create_login_token(
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    client: str = ""
+) -> str:
+    """
+    创建登录令牌
+    - 撤销用户之前的所有会话
+    - 写入会话记录和会话索引
+    - 把最小有效代数提升到新令牌的代数，旧令牌在所有worker中失效
+    - 以上操作原子完成，Redis存储只需一次往返
+    """
+    encoded_jwt, record = _encode_access_token(subject, expires_delta, client=client)
+    await _create_login_session(record)
+    return encoded_jwt
+
+async def create_token_pair(subject: Union[str, int], client: str = "") -> Tuple[str, str]:
+    """
+    登录时签发访问令牌和刷新令牌
+    - 在创建登录会话的同一次存储往返中创建新的刷新令牌族
+    - 刷新令牌是随机字符串，存储中只保存其摘要
+    - 令牌族代数与访问令牌代数相同，用户重新登录或登出后整个令牌族失效
+    :return: (访问令牌, 刷新令牌)
+    """
+    access_token, record = _encode_access_token(subject, client=client)
+    refresh_token = secrets.token_urlsafe(32)
+    refresh = RefreshGrant(
+        digest=_token_digest(refresh_token),
+        family=uuid.uuid4().hex,
+        expire_seconds=_refresh_token_expire()
+    )
+    await _create_login_session(record, refresh)
+    return access_token, refresh_token
+
+async def rotate_refresh_token(refresh_token: str, client: str = "") -> Tuple[str, str, str]:
+    """
+    使用刷新令牌换取新的访问令牌和刷新令牌
+    - 旧刷新令牌作废，新刷新令牌属于同一令牌族
+    - 轮换与写入新会话在一次存储往返中完成，会话记录不含令牌本身，令牌在之后签发
+    - 已作废的刷新令牌再次出现视为泄露：撤销该用户全部会话
+    :return: (用户ID, 访问令牌, 刷新令牌)
+    """
+    record = _new_session("", client=client)
+    new_refresh_token = secrets.token_urlsafe(32)
+    try:
+        status, user_id = await session_store.rotate_refresh_token(
+            _token_digest(refresh_token),
+            _token_digest(new_refresh_token),
+            record,
+            _token_generation_expire(),
+            _refresh_token_expire()
+        )
+    except Exception as e:
+        logger.error(f"轮换刷新令牌失败: {str(e)}")
+        raise ConnectionError("令牌服务暂时不可用") from e
+
+    if status < 0:
+        logger.warning(f"检测到刷新令牌重用，撤销用户 {user_id} 的全部会话")
+        await revoke_all_tokens(user_id)
+        raise AuthenticationError("刷新令牌已失效，请重新登录")
+    if status == 0:
+        raise AuthenticationError("刷新令牌无效或已过期")
+
+    record = replace(record, user_id=user_id)
+    _evict_user_tokens(user_id)
+    await cache_bus.publish(TOKEN_GENERATION_TOPIC, f"{user_id}:{record.generation}")
+    return user_id, _encode_session_token(record), new_refresh_token
+
 async def verify_token(token: str) -> Optional[dict]:
     """验证令牌"""
     try:
         # 解码JWT令牌
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_access_token(token)
         
         # 获取会话ID
         session_id = payload.get("session_id")
         if not session_id:
             return None
         
-        # 检查Redis中是否存在该令牌
-        redis_key = f"token:{session_id}"
-        stored_token = await redis_client.get(redis_key)
+        # 检查会话记录是否存在且属于令牌的用户
+        record = await session_store.get_session(session_id)
         
-        if not stored_token or stored_token != token:
+        if record is None or record.user_id != str(payload.get("sub")):
             return None
         
         return payload
@@ -94,45 +290,44 @@ async def revoke_token(token: str) -> bool:
     """撤销令牌"""
     try:
         # 解码令牌获取会话ID
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_access_token(token)
         session_id = payload.get("session_id")
         
         if session_id:
-            # 从Redis中删除令牌
-            redis_key = f"token:{session_id}"
-            await redis_client.delete(redis_key)
+            # 删除会话记录及其会话索引
+            user_id = str(payload.get("sub"))
+            await session_store.revoke_session(user_id, session_id)
+            jwt_cache.pop(_token_digest(token))
+            generation = payload.get("gen")
+            if generation is None:
+                await cache_bus.publish(JWT_CACHE_TOPIC, user_id)
+                return True
+            # 代数校验无法只撤销单个会话，同时撤销该令牌及更早签发的令牌
+            min_generation = await session_store.raise_token_generation(
+                user_id, int(generation) + 1, _token_generation_expire()
+            )
+            await cache_bus.publish(TOKEN_GENERATION_TOPIC, f"{user_id}:{min_generation}")
             return True
     except JWTError:
         pass
     return False
 
-async def revoke_all_tokens(user_id: Union[str, int]) -> None:
+async def revoke_all_tokens(user_id: Union[str, int]) -> int:
     """
     撤销用户的所有令牌
-    - 获取用户的所有令牌
-    - 从Redis中删除这些令牌
-    - 处理Redis连接错误
+    - 通过用户会话索引定位该用户的会话，只处理该用户自己的会话
+    - 原子删除会话记录和索引，并提升最小有效代数，Redis存储只需一次往返
+    - 广播新的最小有效代数，其他worker无需查询存储即可拒绝旧令牌
+    - 处理存储连接错误
+    :return: 撤销的会话数量
     """
+    generation = _new_generation()
     try:
-        # 获取用户的所有令牌键
-        pattern = f"token:*"
-        async for key in redis_client.scan_iter(pattern):
-            try:
-                token = await redis_client.get(key)
-                if token:
-                    payload = jwt.decode(
-                        token,
-                        settings.SECRET_KEY,
-                        algorithms=[settings.ALGORITHM]
-                    )
-                    if str(payload.get("sub")) == str(user_id):
-                        await redis_client.delete(key)
-            except (JWTError, Exception) as e:
-                continue
+        revoked = await session_store.revoke_user_sessions(
+            user_id, generation, _token_generation_expire()
+        )
+        await cache_bus.publish(TOKEN_GENERATION_TOPIC, f"{user_id}:{generation}")
+        return int(revoked or 0)
     except Exception as e:
         logger.error(f"撤销令牌失败: {str(e)}")
-        raise ConnectionError("令牌服务暂时不可用") from e 
\ No newline at end of file
+        raise ConnectionError("令牌服务暂时不可用") from e
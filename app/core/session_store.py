@@ -0,0 +1,653 @@
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from string import Template
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple, Union
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger("session_store")
+
+UserId = Union[str, int]
+
+@dataclass(frozen=True)
+class SessionRecord:
+    """
+    会话记录
+    - 只保存校验需要的字段，不保存JWT本身
+    - 令牌的 session_id、sub、iat、exp、gen 声明与记录字段一一对应
+    """
+    session_id: str
+    user_id: str
+    issued_at: int
+    expires_at: int
+    client: str = ""
+    generation: int = 0
+
+    def ttl(self) -> int:
+        """剩余有效秒数"""
+        return max(self.expires_at - int(time.time()), 1)
+
+    def to_mapping(self) -> Dict[str, str]:
+        return {
+            "sid": self.session_id,
+            "uid": self.user_id,
+            "iat": str(self.issued_at),
+            "exp": str(self.expires_at),
+            "client": self.client,
+            "gen": str(self.generation),
+        }
+
+    @classmethod
+    def from_mapping(cls, data: Dict[str, str]) -> "SessionRecord":
+        return cls(
+            session_id=data["sid"],
+            user_id=data["uid"],
+            issued_at=int(data["iat"]),
+            expires_at=int(data["exp"]),
+            client=data.get("client", ""),
+            generation=int(data.get("gen", 0)),
+        )
+
+@dataclass(frozen=True)
+class RefreshGrant:
+    """刷新令牌写入参数，存储中只保存令牌摘要"""
+    digest: str
+    family: str
+    expire_seconds: int
+
+class SessionStore(ABC):
+    """
+    令牌/会话存储接口
+    - session:{session}       会话记录（会话ID、用户ID、签发时间、过期时间、客户端、代数）
+    - user_sessions:{user}    用户会话索引（会话ID -> 过期时间戳）
+    - token_gen:{user}        用户令牌最小有效代数，代数小于该值的令牌已被撤销
+    - refresh:{digest}        刷新令牌（用户ID、令牌族），轮换后保留到过期用于检测重用
+    - refresh_family:{family} 令牌族当前有效的刷新令牌摘要及其代数
+    - 发布订阅                缓存失效广播、WebSocket消息
+    - 滑动窗口限流            登录防暴力破解
+    """
+
+    session_prefix = "session:"
+    user_sessions_prefix = "user_sessions:"
+    token_generation_prefix = "token_gen:"
+    refresh_prefix = "refresh:"
+    refresh_family_prefix = "refresh_family:"
+
+    def session_key(self, session_id: str) -> str:
+        return f"{self.session_prefix}{session_id}"
+
+    def user_sessions_key(self, user_id: UserId) -> str:
+        return f"{self.user_sessions_prefix}{user_id}"
+
+    def token_generation_key(self, user_id: UserId) -> str:
+        return f"{self.token_generation_prefix}{user_id}"
+
+    def refresh_key(self, digest: str) -> str:
+        return f"{self.refresh_prefix}{digest}"
+
+    def refresh_family_key(self, family: str) -> str:
+        return f"{self.refresh_family_prefix}{family}"
+
+    @abstractmethod
+    async def create_session(self, record: SessionRecord) -> None:
+        """写入会话记录并加入用户会话索引"""
+
+    @abstractmethod
+    async def create_login_session(
+        self,
+        record: SessionRecord,
+        generation_expire: int,
+        refresh: Optional[RefreshGrant] = None
+    ) -> int:
+        """
+        登录：撤销用户旧会话并写入新会话，返回撤销的会话数
+        - 同时把用户令牌最小有效代数提升到新会话的代数
+        - 传入refresh时同时创建新的刷新令牌族
+        """
+
+    @abstractmethod
+    async def get_session(self, session_id: str) -> Optional[SessionRecord]:
+        """获取会话记录"""
+
+    @abstractmethod
+    async def revoke_session(self, user_id: UserId, session_id: str) -> None:
+        """撤销单个会话"""
+
+    @abstractmethod
+    async def revoke_user_sessions(
+        self, user_id: UserId, generation: int = 0, generation_expire: int = 0
+    ) -> int:
+        """
+        撤销用户全部会话，返回撤销的会话数
+        - generation大于0时同时把用户令牌最小有效代数提升到该值
+        """
+
+    @abstractmethod
+    async def get_token_generation(self, user_id: UserId) -> int:
+        """获取用户令牌最小有效代数，未设置时返回0"""
+
+    @abstractmethod
+    async def raise_token_generation(self, user_id: UserId, generation: int, expire_seconds: int) -> int:
+        """把用户令牌最小有效代数提升到generation（不会降低），返回提升后的值"""
+
+    @abstractmethod
+    async def rotate_refresh_token(
+        self,
+        digest: str,
+        new_digest: str,
+        record: SessionRecord,
+        generation_expire: int,
+        refresh_expire: int
+    ) -> Tuple[int, Optional[str]]:
+        """
+        轮换刷新令牌并按登录语义写入新会话（record中的用户ID由刷新令牌确定）
+        - 令牌是所在族的当前令牌且族代数不低于用户最小有效代数时，写入新令牌和新会话并返回(1, 用户ID)
+        - 令牌不是当前令牌（已被使用过）时判定为重用，删除整个令牌族并返回(-1, 用户ID)
+        - 令牌不存在、已过期或已被撤销时返回(0, None)
+        """
+
+    @abstractmethod
+    async def hit_sliding_window(
+        self, keys: List[str], limits: List[int], window_ms: int, member: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        在多个滑动窗口上原子地记录一次请求
+        - 任一窗口已达上限时不记录，返回(需要等待的毫秒数, 触发限流的键下标)
+        - 全部未达上限时在每个窗口以member记录一次，返回(0, -1)
+        - member未指定时自动生成；需要撤销本次记录时由调用方传入，再交给 release_sliding_window
+        """
+
+    @abstractmethod
+    async def release_sliding_window(self, keys: List[str], member: str) -> None:
+        """从多个滑动窗口中撤销一次记录"""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        """发布消息"""
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> AsyncIterator[str]:
+        """订阅频道，逐条返回消息"""
+
+class RedisSessionStore(SessionStore):
+    """
+    基于Redis的会话存储，多worker/多节点部署使用
+    - 会话相关操作各自由一个Lua脚本完成，每次只需一次往返
+    - 脚本内按前缀拼接用户相关的键，不适用于Redis Cluster
+    """
+
+    # 各脚本共用的函数，键前缀在注册脚本时替换
+    SESSION_LUA = """
+local function raise_generation(user, generation, expire)
+    local key = '$generation_prefix' .. user
+    local current = tonumber(redis.call('GET', key) or '0')
+    if generation > current then
+        redis.call('SET', key, generation, 'EX', expire)
+        return generation
+    end
+    return current
+end
+
+local function revoke_sessions(user)
+    local index_key = '$user_sessions_prefix' .. user
+    local sessions = redis.call('ZRANGE', index_key, 0, -1)
+    for _, session_id in ipairs(sessions) do
+        redis.call('DEL', '$session_prefix' .. session_id)
+    end
+    redis.call('DEL', index_key)
+    return #sessions
+end
+
+-- fields: 会话ID, 用户ID, 签发时间, 过期时间, 客户端, 代数
+local function write_session(fields, ttl)
+    local key = '$session_prefix' .. fields[1]
+    local index_key = '$user_sessions_prefix' .. fields[2]
+    redis.call('HSET', key, 'sid', fields[1], 'uid', fields[2], 'iat', fields[3],
+        'exp', fields[4], 'client', fields[5], 'gen', fields[6])
+    redis.call('EXPIRE', key, ttl)
+    redis.call('ZREMRANGEBYSCORE', index_key, '-inf', fields[3])
+    redis.call('ZADD', index_key, fields[4], fields[1])
+    if redis.call('TTL', index_key) < tonumber(ttl) then
+        redis.call('EXPIRE', index_key, ttl)
+    end
+end
+
+local function write_refresh(digest, user, family, generation, ttl)
+    local key = '$refresh_prefix' .. digest
+    local family_key = '$refresh_family_prefix' .. family
+    redis.call('HSET', key, 'user', user, 'family', family)
+    redis.call('EXPIRE', key, ttl)
+    redis.call('HSET', family_key, 'current', digest, 'gen', generation)
+    redis.call('EXPIRE', family_key, ttl)
+end
+"""
+
+    # ARGV: 会话字段(6), 会话ttl
+    CREATE_SESSION_SCRIPT = """
+write_session({ARGV[1], ARGV[2], ARGV[3], ARGV[4], ARGV[5], ARGV[6]}, ARGV[7])
+return 1
+"""
+
+    # ARGV: 会话字段(6), 会话ttl, 代数ttl, [刷新令牌摘要, 令牌族, 刷新令牌ttl]
+    LOGIN_SCRIPT = """
+local revoked = revoke_sessions(ARGV[2])
+write_session({ARGV[1], ARGV[2], ARGV[3], ARGV[4], ARGV[5], ARGV[6]}, ARGV[7])
+raise_generation(ARGV[2], tonumber(ARGV[6]), ARGV[8])
+if ARGV[9] then
+    write_refresh(ARGV[9], ARGV[2], ARGV[10], ARGV[6], ARGV[11])
+end
+return revoked
+"""
+
+    # ARGV: 用户ID, 代数, 代数ttl
+    REVOKE_ALL_SCRIPT = """
+local revoked = revoke_sessions(ARGV[1])
+if tonumber(ARGV[2]) > 0 then
+    raise_generation(ARGV[1], tonumber(ARGV[2]), ARGV[3])
+end
+return revoked
+"""
+
+    # ARGV: 用户ID, 代数, 代数ttl
+    RAISE_GENERATION_SCRIPT = """
+return raise_generation(ARGV[1], tonumber(ARGV[2]), ARGV[3])
+"""
+
+    # ARGV: 旧摘要, 新摘要, 会话ID, 签发时间, 过期时间, 客户端, 代数, 会话ttl, 代数ttl, 刷新令牌ttl
+    ROTATE_REFRESH_SCRIPT = """
+local refresh_key = '$refresh_prefix' .. ARGV[1]
+local user = redis.call('HGET', refresh_key, 'user')
+if not user then
+    return {0, ''}
+end
+local family = redis.call('HGET', refresh_key, 'family')
+local family_key = '$refresh_family_prefix' .. family
+local current = redis.call('HMGET', family_key, 'current', 'gen')
+if not current[1] then
+    return {0, ''}
+end
+if current[1] ~= ARGV[1] then
+    redis.call('DEL', family_key)
+    return {-1, user}
+end
+local min_generation = tonumber(redis.call('GET', '$generation_prefix' .. user) or '0')
+if tonumber(current[2]) < min_generation then
+    redis.call('DEL', family_key)
+    return {0, ''}
+end
+revoke_sessions(user)
+write_session({ARGV[3], user, ARGV[4], ARGV[5], ARGV[6], ARGV[7]}, ARGV[8])
+raise_generation(user, tonumber(ARGV[7]), ARGV[9])
+write_refresh(ARGV[2], user, family, ARGV[7], ARGV[10])
+return {1, user}
+"""
+
+    # 滑动窗口限流：先检查全部窗口，都未超限才记录，一次往返完成
+    SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local retry_after = 0
+local blocked = -1
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[i + 3]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = math.max(tonumber(oldest[2]) + window - now, 1)
+        if wait > retry_after then
+            retry_after = wait
+            blocked = i - 1
+        end
+    end
+end
+if blocked >= 0 then
+    return {retry_after, blocked}
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, window)
+end
+return {0, -1}
+"""
+
+    # 撤销滑动窗口中的一次记录
+    RELEASE_WINDOW_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    redis.call('ZREM', key, ARGV[1])
+end
+return 0
+"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self._create_session_script = self._register(self.CREATE_SESSION_SCRIPT)
+        self._login_script = self._register(self.LOGIN_SCRIPT)
+        self._revoke_all_script = self._register(self.REVOKE_ALL_SCRIPT)
+        self._raise_generation_script = self._register(self.RAISE_GENERATION_SCRIPT)
+        self._rotate_refresh_script = self._register(self.ROTATE_REFRESH_SCRIPT)
+        self._sliding_window_script = redis.register_script(self.SLIDING_WINDOW_SCRIPT)
+        self._release_window_script = redis.register_script(self.RELEASE_WINDOW_SCRIPT)
+
+    def _register(self, body: str):
+        """注册会话脚本：拼接公共函数并替换键前缀"""
+        script = Template(self.SESSION_LUA + body).substitute(
+            session_prefix=self.session_prefix,
+            user_sessions_prefix=self.user_sessions_prefix,
+            generation_prefix=self.token_generation_prefix,
+            refresh_prefix=self.refresh_prefix,
+            refresh_family_prefix=self.refresh_family_prefix,
+        )
+        return self.redis.register_script(script)
+
+    @staticmethod
+    def _session_args(record: SessionRecord) -> List[Union[str, int]]:
+        return [
+            record.session_id,
+            record.user_id,
+            record.issued_at,
+            record.expires_at,
+            record.client,
+            record.generation,
+        ]
+
+    async def create_session(self, record: SessionRecord) -> None:
+        await self._create_session_script(args=[*self._session_args(record), record.ttl()])
+
+    async def create_login_session(
+        self,
+        record: SessionRecord,
+        generation_expire: int,
+        refresh: Optional[RefreshGrant] = None
+    ) -> int:
+        args = [*self._session_args(record), record.ttl(), max(generation_expire, 1)]
+        if refresh is not None:
+            args += [refresh.digest, refresh.family, refresh.expire_seconds]
+        revoked = await self._login_script(args=args)
+        return int(revoked or 0)
+
+    async def get_session(self, session_id: str) -> Optional[SessionRecord]:
+        data = await self.redis.hgetall(self.session_key(session_id))
+        return SessionRecord.from_mapping(data) if data else None
+
+    async def revoke_session(self, user_id: UserId, session_id: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self.session_key(session_id))
+            pipe.zrem(self.user_sessions_key(user_id), session_id)
+            await pipe.execute()
+
+    async def revoke_user_sessions(
+        self, user_id: UserId, generation: int = 0, generation_expire: int = 0
+    ) -> int:
+        revoked = await self._revoke_all_script(
+            args=[str(user_id), generation, max(generation_expire, 1)]
+        )
+        return int(revoked or 0)
+
+    async def get_token_generation(self, user_id: UserId) -> int:
+        return int(await self.redis.get(self.token_generation_key(user_id)) or 0)
+
+    async def raise_token_generation(self, user_id: UserId, generation: int, expire_seconds: int) -> int:
+        current = await self._raise_generation_script(
+            args=[str(user_id), generation, max(expire_seconds, 1)]
+        )
+        return int(current)
+
+    async def rotate_refresh_token(
+        self,
+        digest: str,
+        new_digest: str,
+        record: SessionRecord,
+        generation_expire: int,
+        refresh_expire: int
+    ) -> Tuple[int, Optional[str]]:
+        status, user_id = await self._rotate_refresh_script(
+            args=[
+                digest,
+                new_digest,
+                record.session_id,
+                record.issued_at,
+                record.expires_at,
+                record.client,
+                record.generation,
+                record.ttl(),
+                max(generation_expire, 1),
+                refresh_expire,
+            ]
+        )
+        return int(status), user_id or None
+
+    async def hit_sliding_window(
+        self, keys: List[str], limits: List[int], window_ms: int, member: Optional[str] = None
+    ) -> Tuple[int, int]:
+        now_ms = int(time.time() * 1000)
+        retry_after, blocked = await self._sliding_window_script(
+            keys=keys,
+            args=[now_ms, window_ms, member or f"{now_ms}:{uuid.uuid4().hex}", *limits]
+        )
+        return int(retry_after), int(blocked)
+
+    async def release_sliding_window(self, keys: List[str], member: str) -> None:
+        await self._release_window_script(keys=keys, args=[member])
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self.redis.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.close()
+
+class MemorySessionStore(SessionStore):
+    """
+    进程内会话存储，单节点部署和测试使用
+    - 所有操作在事件循环内同步完成，中间没有await，天然原子
+    - 过期条目在访问时惰性清理；限流窗口另外定期整体清理，只出现一次的邮箱、IP不会一直占用内存
+    - 发布订阅只在当前进程内生效
+    """
+
+    def __init__(self):
+        self._records: Dict[str, Tuple[Dict[str, str], float]] = {}
+        self._indexes: Dict[str, Dict[str, float]] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._windows: Dict[str, List[Tuple[float, str]]] = {}
+        # 限流窗口最后一次记录过期的时间，以及下次整体清理的时间
+        self._window_expires: Dict[str, float] = {}
+        self._next_window_sweep = 0.0
+
+    def _get(self, key: str) -> Optional[Dict[str, str]]:
+        item = self._records.get(key)
+        if item is None:
+            return None
+        record, expires_at = item
+        if expires_at <= time.time():
+            del self._records[key]
+            return None
+        return record
+
+    def _set(self, key: str, record: Dict[str, str], expire_seconds: int) -> None:
+        self._records[key] = (record, time.time() + expire_seconds)
+
+    def _revoke_sessions(self, user_id: UserId) -> int:
+        sessions = self._indexes.pop(self.user_sessions_key(user_id), {})
+        for session_id in sessions:
+            self._records.pop(self.session_key(session_id), None)
+        return len(sessions)
+
+    def _write_session(self, record: SessionRecord) -> None:
+        self._set(self.session_key(record.session_id), record.to_mapping(), record.ttl())
+        index = self._indexes.setdefault(self.user_sessions_key(record.user_id), {})
+        for expired in [sid for sid, exp in index.items() if exp <= record.issued_at]:
+            del index[expired]
+        index[record.session_id] = record.expires_at
+
+    def _write_refresh(self, refresh: RefreshGrant, user_id: str, generation: int) -> None:
+        self._set(
+            self.refresh_key(refresh.digest),
+            {"user": user_id, "family": refresh.family},
+            refresh.expire_seconds
+        )
+        self._set(
+            self.refresh_family_key(refresh.family),
+            {"current": refresh.digest, "gen": str(generation)},
+            refresh.expire_seconds
+        )
+
+    def _sweep_windows(self, now: float, window: float) -> None:
+        """每隔一个窗口长度清理全部已过期的限流窗口"""
+        if now < self._next_window_sweep:
+            return
+        for key in [key for key, expires_at in self._window_expires.items() if expires_at <= now]:
+            del self._window_expires[key]
+            self._windows.pop(key, None)
+        self._next_window_sweep = now + window
+
+    def _get_generation(self, user_id: UserId) -> int:
+        return int((self._get(self.token_generation_key(user_id)) or {}).get("gen", 0))
+
+    def _raise_generation(self, user_id: UserId, generation: int, expire_seconds: int) -> int:
+        current = self._get_generation(user_id)
+        if generation > current:
+            self._set(self.token_generation_key(user_id), {"gen": str(generation)}, max(expire_seconds, 1))
+            return generation
+        return current
+
+    async def create_session(self, record: SessionRecord) -> None:
+        self._write_session(record)
+
+    async def create_login_session(
+        self,
+        record: SessionRecord,
+        generation_expire: int,
+        refresh: Optional[RefreshGrant] = None
+    ) -> int:
+        revoked = self._revoke_sessions(record.user_id)
+        self._write_session(record)
+        self._raise_generation(record.user_id, record.generation, generation_expire)
+        if refresh is not None:
+            self._write_refresh(refresh, record.user_id, record.generation)
+        return revoked
+
+    async def get_session(self, session_id: str) -> Optional[SessionRecord]:
+        data = self._get(self.session_key(session_id))
+        return SessionRecord.from_mapping(data) if data else None
+
+    async def revoke_session(self, user_id: UserId, session_id: str) -> None:
+        self._records.pop(self.session_key(session_id), None)
+        self._indexes.get(self.user_sessions_key(user_id), {}).pop(session_id, None)
+
+    async def revoke_user_sessions(
+        self, user_id: UserId, generation: int = 0, generation_expire: int = 0
+    ) -> int:
+        revoked = self._revoke_sessions(user_id)
+        if generation > 0:
+            self._raise_generation(user_id, generation, generation_expire)
+        return revoked
+
+    async def get_token_generation(self, user_id: UserId) -> int:
+        return self._get_generation(user_id)
+
+    async def raise_token_generation(self, user_id: UserId, generation: int, expire_seconds: int) -> int:
+        return self._raise_generation(user_id, generation, expire_seconds)
+
+    async def rotate_refresh_token(
+        self,
+        digest: str,
+        new_digest: str,
+        record: SessionRecord,
+        generation_expire: int,
+        refresh_expire: int
+    ) -> Tuple[int, Optional[str]]:
+        refresh = self._get(self.refresh_key(digest))
+        if refresh is None:
+            return 0, None
+        family_key = self.refresh_family_key(refresh["family"])
+        family = self._get(family_key)
+        if family is None:
+            return 0, None
+        user_id = refresh["user"]
+        if family["current"] != digest:
+            self._records.pop(family_key, None)
+            return -1, user_id
+        if int(family["gen"]) < self._get_generation(user_id):
+            self._records.pop(family_key, None)
+            return 0, None
+        record = replace(record, user_id=user_id)
+        self._revoke_sessions(user_id)
+        self._write_session(record)
+        self._raise_generation(user_id, record.generation, generation_expire)
+        self._write_refresh(
+            RefreshGrant(new_digest, refresh["family"], refresh_expire), user_id, record.generation
+        )
+        return 1, user_id
+
+    async def hit_sliding_window(
+        self, keys: List[str], limits: List[int], window_ms: int, member: Optional[str] = None
+    ) -> Tuple[int, int]:
+        now = time.time()
+        window = window_ms / 1000
+        self._sweep_windows(now, window)
+        retry_after, blocked = 0, -1
+        for i, (key, limit) in enumerate(zip(keys, limits)):
+            hits = [hit for hit in self._windows.get(key, []) if hit[0] > now - window]
+            if hits:
+                self._windows[key] = hits
+            else:
+                self._windows.pop(key, None)
+                self._window_expires.pop(key, None)
+            if len(hits) >= limit:
+                wait = max(int((hits[0][0] + window - now) * 1000), 1)
+                if wait > retry_after:
+                    retry_after, blocked = wait, i
+        if blocked >= 0:
+            return retry_after, blocked
+        hit = (now, member or uuid.uuid4().hex)
+        for key in keys:
+            self._windows.setdefault(key, []).append(hit)
+            self._window_expires[key] = now + window
+        return 0, -1
+
+    async def release_sliding_window(self, keys: List[str], member: str) -> None:
+        for key in keys:
+            hits = [hit for hit in self._windows.get(key, []) if hit[1] != member]
+            if hits:
+                self._windows[key] = hits
+            else:
+                self._windows.pop(key, None)
+                self._window_expires.pop(key, None)
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in list(self._subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning(f"订阅者消息队列已满，丢弃消息: {channel}")
+
+    async def subscribe(self, channel: str) -> AsyncIterator[str]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_MESSAGE_QUEUE_SIZE)
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.get(channel, set()).discard(queue)
+
+def create_session_store(backend: str) -> SessionStore:
+    """根据配置创建会话存储"""
+    if backend == "memory":
+        logger.info("使用进程内会话存储")
+        return MemorySessionStore()
+    if backend == "redis":
+        from app.core.redis import redis_client
+        return RedisSessionStore(redis_client)
+    raise ValueError(f"不支持的会话存储类型: {backend}")
+
+# 创建全局会话存储
+session_store = create_session_store(settings.SESSION_STORE_BACKEND)
@@ -1,6 +1,6 @@
 from typing import Dict, Set
 from fastapi import WebSocket
-from app.core.redis import redis_client
+from app.core.session_store import session_store
 import json
 
 class ConnectionManager:
@@ -37,18 +37,13 @@ class ConnectionManager:
                 await connection.send_text(message)
                 
     async def publish_message(self, channel: str, message: dict):
-        """发布消息到 Redis 频道"""
-        await redis_client.publish(channel, json.dumps(message))
+        """发布消息到频道"""
+        await session_store.publish(channel, json.dumps(message))
         
     async def subscribe_to_channel(self, channel: str, websocket: WebSocket):
-        """订阅 Redis 频道"""
-        pubsub = redis_client.pubsub()
-        await pubsub.subscribe(channel)
-        
-        while True:
-            message = await pubsub.get_message(ignore_subscribe_messages=True)
-            if message:
-                await websocket.send_text(message["data"])
+        """订阅频道"""
+        async for message in session_store.subscribe(channel):
+            await websocket.send_text(message)
 
 # 创建全局连接管理器实例
 manager = ConnectionManager() 
\ No newline at end of file
@@ -13,14 +13,14 @@ logger = get_logger("auth.crud")
 class CRUDAuth:
     async def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         """
-        验证用户
+        验证用户（同时加载角色和部门，登录时无需再次查询）
         :param db: 数据库会话
         :param email: 用户邮箱
         :param password: 用户密码
         :return: 用户对象或None
         """
         try:
-            user = await crud_user.get_by_email(db, email=email)
+            user = await crud_user.get_by_email(db, email=email, include_relations=True)
             if not user:
                 logger.warning(f"用户邮箱不存在: {email}")
                 return None
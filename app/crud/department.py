@@ -1,4 +1,5 @@
 from typing import Optional, List
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from uuid import UUID
@@ -6,6 +7,8 @@ import uuid
 from datetime import datetime
 
 from app.models.department import Department
+from app.models.user import User
+from app.core.database import db_all, db_commit, db_delete, db_first, db_get, db_refresh, db_rollback, db_scalar
 from app.schemas.department import DepartmentTree
 from app.core.logger import get_logger
 from app.exceptions.base import DatabaseError, NotFoundError, ValidationError
@@ -16,7 +19,7 @@ class CRUDDepartment:
     async def get_by_id(self, db: Session, id: str) -> Optional[Department]:
         """根据ID获取部门"""
         try:
-            return db.query(Department).get(id)
+            return await db_get(db, Department, id)
         except SQLAlchemyError as e:
             logger.error(f"查询部门失败: {str(e)}")
             raise DatabaseError("查询部门失败")
@@ -24,7 +27,7 @@ class CRUDDepartment:
     async def get_by_name(self, db: Session, name: str) -> Optional[Department]:
         """根据名称获取部门"""
         try:
-            return db.query(Department).filter(Department.DepartmentName == name).first()
+            return await db_first(db, select(Department).where(Department.DepartmentName == name))
         except SQLAlchemyError as e:
             logger.error(f"查询部门失败: {str(e)}")
             raise DatabaseError("查询部门失败")
@@ -33,7 +36,7 @@ class CRUDDepartment:
         """获取部门树结构"""
         try:
             # 获取所有部门
-            departments = db.query(Department).all()
+            departments = await db_all(db, select(Department))
             
             # 构建部门字典
             dept_dict = {
@@ -75,60 +78,61 @@ class CRUDDepartment:
                 UpdatedAt=datetime.now()
             )
             db.add(db_obj)
-            db.commit()
-            db.refresh(db_obj)
+            await db_commit(db)
+            await db_refresh(db, db_obj)
             logger.info(f"部门创建成功: {name}")
             return db_obj
         except SQLAlchemyError as e:
             logger.error(f"创建部门失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("创建部门失败")
 
     async def update_status(self, db: Session, id: UUID, status: str) -> Department:
         """更新部门状态"""
         try:
-            dept = db.query(Department).get(id)
+            dept = await db_get(db, Department, id)
             if not dept:
                 raise NotFoundError(f"部门不存在: {id}")
             
             dept.Status = status
             dept.UpdatedAt = datetime.now()
-            db.commit()
-            db.refresh(dept)
+            await db_commit(db)
+            await db_refresh(db, dept)
             logger.info(f"部门状态更新成功: {id} -> {status}")
             return dept
         except NotFoundError:
             raise
         except SQLAlchemyError as e:
             logger.error(f"更新部门状态失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("更新部门状态失败")
 
     async def delete(self, db: Session, *, id: UUID) -> Department:
         """删除部门"""
         try:
-            dept = db.query(Department).get(id)
+            dept = await db_get(db, Department, id)
             if not dept:
                 raise NotFoundError(f"部门不存在: {id}")
             
             # 检查是否有子部门
-            children = db.query(Department).filter(Department.ParentId == id).count()
+            children = await db_scalar(db, select(func.count()).select_from(Department).where(Department.ParentId == id))
             if children > 0:
                 raise ValidationError("部门存在子部门，无法删除")
             
             # 检查是否有用户
-            if hasattr(dept, 'users') and dept.users:
+            users = await db_scalar(db, select(func.count()).select_from(User).where(User.DepartmentId == id))
+            if users > 0:
                 raise ValidationError("部门存在用户，无法删除")
             
-            db.delete(dept)
-            db.commit()
+            await db_delete(db, dept)
+            await db_commit(db)
             logger.info(f"部门删除成功: {id}")
             return dept
         except (NotFoundError, ValidationError):
             raise
         except SQLAlchemyError as e:
             logger.error(f"删除部门失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("删除部门失败")
 
 department = CRUDDepartment() 
\ No newline at end of file
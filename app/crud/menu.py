@@ -1,16 +1,36 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, asc
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.exc import SQLAlchemyError
 import uuid
 
 from app.models.menu import Menu
 from app.schemas.menu import MenuCreate, MenuUpdate, MenuTree
+from app.core.pagination import Page, SortKey, paginate
+from app.core.database import db_all, db_commit, db_delete, db_first, db_refresh, db_rollback, db_scalar
 from app.core.logger import get_logger
 from app.exceptions.base import DatabaseError
 
 logger = get_logger("menu.crud")
 
+# 热点查询的预构建语句，调用时只传参数值
+_MENU_BY_ID = select(Menu).where(Menu.Id == bindparam("id"))
+_MENU_BY_MENU_ID = select(Menu).where(Menu.MenuId == bindparam("value"))
+_MENU_BY_NAME = select(Menu).where(Menu.Name == bindparam("value"))
+_MENU_BY_PATH = select(Menu).where(Menu.Path == bindparam("value"))
+
+def _exists_statements(column) -> tuple:
+    """唯一性校验语句：(不排除, 排除指定菜单)"""
+    statement = select(Menu.Id).where(column == bindparam("value")).limit(1)
+    return statement, statement.where(Menu.Id != bindparam("exclude_id"))
+
+_MENU_ID_EXISTS = _exists_statements(Menu.MenuId)
+_NAME_EXISTS = _exists_statements(Menu.Name)
+_PATH_EXISTS = _exists_statements(Menu.Path)
+
+# 菜单列表顺序：MenuOrder为空的菜单按0排序（与0并列，再按MenuId），所有列表和键集分页共用
+_MENU_ORDER = (func.coalesce(Menu.MenuOrder, 0), Menu.MenuId)
+
 class MenuCRUD:
     def __init__(self, db: Session):
         self.db = db
@@ -20,19 +40,19 @@ class MenuCRUD:
         try:
             db_menu = Menu(**menu.model_dump())
             self.db.add(db_menu)
-            self.db.commit()
-            self.db.refresh(db_menu)
+            await db_commit(self.db)
+            await db_refresh(self.db, db_menu)
             logger.info(f"菜单创建成功: {db_menu.Name}")
             return db_menu
         except SQLAlchemyError as e:
             logger.error(f"创建菜单失败: {str(e)}")
-            self.db.rollback()
+            await db_rollback(self.db)
             raise DatabaseError("菜单创建失败")
 
     async def get_by_id(self, menu_id: uuid.UUID) -> Optional[Menu]:
         """根据ID获取菜单"""
         try:
-            return self.db.query(Menu).filter(Menu.Id == menu_id).first()
+            return await db_first(self.db, _MENU_BY_ID, {"id": menu_id})
         except SQLAlchemyError as e:
             logger.error(f"查询菜单失败: {str(e)}")
             raise DatabaseError("查询菜单失败")
@@ -40,7 +60,7 @@ class MenuCRUD:
     async def get_by_menu_id(self, menu_id: int) -> Optional[Menu]:
         """根据MenuId获取菜单"""
         try:
-            return self.db.query(Menu).filter(Menu.MenuId == menu_id).first()
+            return await db_first(self.db, _MENU_BY_MENU_ID, {"value": menu_id})
         except SQLAlchemyError as e:
             logger.error(f"查询菜单失败: {str(e)}")
             raise DatabaseError("查询菜单失败")
@@ -48,7 +68,7 @@ class MenuCRUD:
     async def get_by_name(self, name: str) -> Optional[Menu]:
         """根据名称获取菜单"""
         try:
-            return self.db.query(Menu).filter(Menu.Name == name).first()
+            return await db_first(self.db, _MENU_BY_NAME, {"value": name})
         except SQLAlchemyError as e:
             logger.error(f"查询菜单失败: {str(e)}")
             raise DatabaseError("查询菜单失败")
@@ -56,7 +76,7 @@ class MenuCRUD:
     async def get_by_path(self, path: str) -> Optional[Menu]:
         """根据路径获取菜单"""
         try:
-            return self.db.query(Menu).filter(Menu.Path == path).first()
+            return await db_first(self.db, _MENU_BY_PATH, {"value": path})
         except SQLAlchemyError as e:
             logger.error(f"查询菜单失败: {str(e)}")
             raise DatabaseError("查询菜单失败")
@@ -70,15 +90,49 @@ class MenuCRUD:
     ) -> List[Menu]:
         """获取菜单列表"""
         try:
-            query = self.db.query(Menu)
+            query = select(Menu)
+            
+            if hidden is not None:
+                query = query.where(Menu.Hidden == hidden)
+                
+            if parent_id is not None:
+                query = query.where(Menu.ParentId == parent_id)
+                
+            return await db_all(self.db, query.order_by(*_MENU_ORDER).offset(skip).limit(limit))
+        except SQLAlchemyError as e:
+            logger.error(f"查询菜单列表失败: {str(e)}")
+            raise DatabaseError("查询菜单列表失败")
+
+    # 列表排序键：菜单排序（空值按0）+ MenuId，与 _MENU_ORDER 相同，分页与不分页的列表顺序一致
+    sort_keys = (
+        SortKey(_MENU_ORDER[0], lambda obj: obj.MenuOrder or 0),
+        SortKey(Menu.MenuId, lambda obj: obj.MenuId),
+    )
+
+    async def get_page(
+        self,
+        *,
+        limit: int = 100,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        hidden: Optional[bool] = None,
+        parent_id: Optional[int] = None
+    ) -> Page[Menu]:
+        """分页获取菜单列表，传入cursor时使用键集分页"""
+        try:
+            query = select(Menu)
             
             if hidden is not None:
-                query = query.filter(Menu.Hidden == hidden)
+                query = query.where(Menu.Hidden == hidden)
                 
             if parent_id is not None:
-                query = query.filter(Menu.ParentId == parent_id)
+                query = query.where(Menu.ParentId == parent_id)
                 
-            return query.order_by(asc(Menu.MenuOrder), asc(Menu.MenuId)).offset(skip).limit(limit).all()
+            return await paginate(
+                self.db, query, self.sort_keys,
+                limit=limit, skip=skip, cursor=cursor, include_total=include_total
+            )
         except SQLAlchemyError as e:
             logger.error(f"查询菜单列表失败: {str(e)}")
             raise DatabaseError("查询菜单列表失败")
@@ -86,7 +140,7 @@ class MenuCRUD:
     async def get_all_ordered(self) -> List[Menu]:
         """获取所有菜单并按顺序排列"""
         try:
-            return self.db.query(Menu).order_by(asc(Menu.MenuOrder), asc(Menu.MenuId)).all()
+            return await db_all(self.db, select(Menu).order_by(*_MENU_ORDER))
         except SQLAlchemyError as e:
             logger.error(f"查询菜单列表失败: {str(e)}")
             raise DatabaseError("查询菜单列表失败")
@@ -94,7 +148,7 @@ class MenuCRUD:
     async def get_root_menus(self) -> List[Menu]:
         """获取根菜单（没有父菜单的菜单）"""
         try:
-            return self.db.query(Menu).filter(Menu.ParentId.is_(None)).order_by(asc(Menu.MenuOrder), asc(Menu.MenuId)).all()
+            return await db_all(self.db, select(Menu).where(Menu.ParentId.is_(None)).order_by(*_MENU_ORDER))
         except SQLAlchemyError as e:
             logger.error(f"查询根菜单失败: {str(e)}")
             raise DatabaseError("查询根菜单失败")
@@ -102,20 +156,23 @@ class MenuCRUD:
     async def get_children(self, parent_menu_id: int) -> List[Menu]:
         """获取指定菜单的子菜单"""
         try:
-            return self.db.query(Menu).filter(Menu.ParentId == parent_menu_id).order_by(asc(Menu.MenuOrder), asc(Menu.MenuId)).all()
+            return await db_all(self.db, select(Menu).where(Menu.ParentId == parent_menu_id).order_by(*_MENU_ORDER))
         except SQLAlchemyError as e:
             logger.error(f"查询子菜单失败: {str(e)}")
             raise DatabaseError("查询子菜单失败")
 
-    async def count(self, hidden: Optional[bool] = None) -> int:
-        """获取菜单总数"""
+    async def count(self, hidden: Optional[bool] = None, parent_id: Optional[int] = None) -> int:
+        """获取菜单总数，筛选条件与 get_multi 一致"""
         try:
-            query = self.db.query(Menu)
+            query = select(func.count()).select_from(Menu)
             
             if hidden is not None:
-                query = query.filter(Menu.Hidden == hidden)
+                query = query.where(Menu.Hidden == hidden)
                 
-            return query.count()
+            if parent_id is not None:
+                query = query.where(Menu.ParentId == parent_id)
+                
+            return await db_scalar(self.db, query)
         except SQLAlchemyError as e:
             logger.error(f"统计菜单数量失败: {str(e)}")
             raise DatabaseError("统计菜单数量失败")
@@ -131,13 +188,13 @@ class MenuCRUD:
             for field, value in update_data.items():
                 setattr(db_menu, field, value)
                 
-            self.db.commit()
-            self.db.refresh(db_menu)
+            await db_commit(self.db)
+            await db_refresh(self.db, db_menu)
             logger.info(f"菜单更新成功: {menu_id}")
             return db_menu
         except SQLAlchemyError as e:
             logger.error(f"更新菜单失败: {str(e)}")
-            self.db.rollback()
+            await db_rollback(self.db)
             raise DatabaseError("更新菜单失败")
 
     async def delete(self, menu_id: uuid.UUID) -> bool:
@@ -147,24 +204,25 @@ class MenuCRUD:
             if not db_menu:
                 return False
                 
-            self.db.delete(db_menu)
-            self.db.commit()
+            await db_delete(self.db, db_menu)
+            await db_commit(self.db)
             logger.info(f"菜单删除成功: {menu_id}")
             return True
         except SQLAlchemyError as e:
             logger.error(f"删除菜单失败: {str(e)}")
-            self.db.rollback()
+            await db_rollback(self.db)
             raise DatabaseError("删除菜单失败")
 
+    async def _exists(self, statements: tuple, value, exclude_id: Optional[uuid.UUID]) -> bool:
+        statement, excluding = statements
+        if exclude_id:
+            return await db_first(self.db, excluding, {"value": value, "exclude_id": exclude_id}) is not None
+        return await db_first(self.db, statement, {"value": value}) is not None
+
     async def check_menu_id_exists(self, menu_id: int, exclude_id: Optional[uuid.UUID] = None) -> bool:
         """检查MenuId是否已存在"""
         try:
-            query = self.db.query(Menu).filter(Menu.MenuId == menu_id)
-            
-            if exclude_id:
-                query = query.filter(Menu.Id != exclude_id)
-                
-            return query.first() is not None
+            return await self._exists(_MENU_ID_EXISTS, menu_id, exclude_id)
         except SQLAlchemyError as e:
             logger.error(f"检查菜单ID是否存在失败: {str(e)}")
             raise DatabaseError("检查菜单ID失败")
@@ -172,12 +230,7 @@ class MenuCRUD:
     async def check_name_exists(self, name: str, exclude_id: Optional[uuid.UUID] = None) -> bool:
         """检查菜单名称是否已存在"""
         try:
-            query = self.db.query(Menu).filter(Menu.Name == name)
-            
-            if exclude_id:
-                query = query.filter(Menu.Id != exclude_id)
-                
-            return query.first() is not None
+            return await self._exists(_NAME_EXISTS, name, exclude_id)
         except SQLAlchemyError as e:
             logger.error(f"检查菜单名称是否存在失败: {str(e)}")
             raise DatabaseError("检查菜单名称失败")
@@ -185,12 +238,7 @@ class MenuCRUD:
     async def check_path_exists(self, path: str, exclude_id: Optional[uuid.UUID] = None) -> bool:
         """检查路径是否已存在"""
         try:
-            query = self.db.query(Menu).filter(Menu.Path == path)
-            
-            if exclude_id:
-                query = query.filter(Menu.Id != exclude_id)
-                
-            return query.first() is not None
+            return await self._exists(_PATH_EXISTS, path, exclude_id)
         except SQLAlchemyError as e:
             logger.error(f"检查菜单路径是否存在失败: {str(e)}")
             raise DatabaseError("检查菜单路径失败")
@@ -198,9 +246,9 @@ class MenuCRUD:
     async def get_next_menu_id(self) -> int:
         """获取下一个可用的MenuId（从1000开始）"""
         try:
-            max_menu_id = self.db.query(Menu.MenuId).order_by(desc(Menu.MenuId)).first()
-            if max_menu_id and max_menu_id[0] >= 1000:
-                return max_menu_id[0] + 1
+            max_menu_id = await db_scalar(self.db, select(func.max(Menu.MenuId)))
+            if max_menu_id and max_menu_id >= 1000:
+                return max_menu_id + 1
             return 1000
         except SQLAlchemyError as e:
             logger.error(f"获取下一个菜单ID失败: {str(e)}")
@@ -245,7 +293,7 @@ class MenuCRUD:
             if show_hidden:
                 menus = await self.get_all_ordered()
             else:
-                menus = self.db.query(Menu).filter(Menu.Hidden == False).order_by(asc(Menu.MenuOrder), asc(Menu.MenuId)).all()
+                menus = await db_all(self.db, select(Menu).where(Menu.Hidden == False).order_by(*_MENU_ORDER))
             
             return await self.build_menu_tree(menus)
         except SQLAlchemyError as e:
@@ -1,35 +1,44 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import bindparam, func, or_, select
 from sqlalchemy.exc import SQLAlchemyError
 import uuid
 
 from app.models.role import Role
 from app.schemas.role import RoleCreate, RoleUpdate
+from app.core.pagination import Page, SortKey, paginate
+from app.core.database import db_all, db_commit, db_delete, db_first, db_refresh, db_rollback, db_scalar
 from app.core.logger import get_logger
-from app.exceptions.base import DatabaseError, NotFoundError
+from app.exceptions.base import DatabaseError
 
 logger = get_logger("role.crud")
 
+# 热点查询的预构建语句，调用时只传参数值
+_ROLE_BY_ID = select(Role).where(Role.Id == bindparam("id"))
+_ROLE_BY_NAME = select(Role).where(Role.RoleName == bindparam("name"))
+_ROLE_BY_CODE = select(Role).where(Role.RoleCode == bindparam("code"))
+_ROLE_EXISTS = select(Role.Id).where(or_(Role.RoleName == bindparam("name"), Role.RoleCode == bindparam("code"))).limit(1)
+_ROLE_EXISTS_EXCLUDING = _ROLE_EXISTS.where(Role.Id != bindparam("exclude_id"))
+
 class RoleCRUD:
     async def create(self, db: Session, role: RoleCreate) -> Role:
         """创建角色"""
         try:
             db_role = Role(**role.model_dump())
             db.add(db_role)
-            db.commit()
-            db.refresh(db_role)
+            await db_commit(db)
+            await db_refresh(db, db_role)
             logger.info(f"角色创建成功: {db_role.RoleName}")
             return db_role
         except SQLAlchemyError as e:
             logger.error(f"创建角色失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("创建角色失败")
 
     async def get_by_id(self, db: Session, role_id: uuid.UUID) -> Optional[Role]:
         """根据ID获取角色"""
         try:
-            return db.query(Role).filter(Role.Id == role_id).first()
+            return await db_first(db, _ROLE_BY_ID, {"id": role_id})
         except SQLAlchemyError as e:
             logger.error(f"查询角色失败: {str(e)}")
             raise DatabaseError("查询角色失败")
@@ -37,7 +46,7 @@ class RoleCRUD:
     async def get_by_name(self, db: Session, role_name: str) -> Optional[Role]:
         """根据角色名称获取角色"""
         try:
-            return db.query(Role).filter(Role.RoleName == role_name).first()
+            return await db_first(db, _ROLE_BY_NAME, {"name": role_name})
         except SQLAlchemyError as e:
             logger.error(f"查询角色失败: {str(e)}")
             raise DatabaseError("查询角色失败")
@@ -45,7 +54,7 @@ class RoleCRUD:
     async def get_by_code(self, db: Session, role_code: str) -> Optional[Role]:
         """根据角色代码获取角色"""
         try:
-            return db.query(Role).filter(Role.RoleCode == role_code).first()
+            return await db_first(db, _ROLE_BY_CODE, {"code": role_code})
         except SQLAlchemyError as e:
             logger.error(f"查询角色失败: {str(e)}")
             raise DatabaseError("查询角色失败")
@@ -59,12 +68,44 @@ class RoleCRUD:
     ) -> List[Role]:
         """获取角色列表"""
         try:
-            query = db.query(Role)
+            query = select(Role)
+            
+            if status is not None:
+                query = query.where(Role.Status == status)
+                
+            query = query.order_by(*(key.column for key in self.sort_keys))
+            return await db_all(db, query.offset(skip).limit(limit))
+        except SQLAlchemyError as e:
+            logger.error(f"查询角色列表失败: {str(e)}")
+            raise DatabaseError("查询角色列表失败")
+
+    # 列表排序键：角色名称 + Id
+    sort_keys = (
+        SortKey(Role.RoleName, lambda obj: obj.RoleName),
+        SortKey(Role.Id, lambda obj: obj.Id),
+    )
+
+    async def get_page(
+        self,
+        db: Session,
+        *,
+        limit: int = 100,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        status: Optional[str] = None
+    ) -> Page[Role]:
+        """分页获取角色列表，传入cursor时使用键集分页"""
+        try:
+            query = select(Role)
             
             if status is not None:
-                query = query.filter(Role.Status == status)
+                query = query.where(Role.Status == status)
                 
-            return query.offset(skip).limit(limit).all()
+            return await paginate(
+                db, query, self.sort_keys,
+                limit=limit, skip=skip, cursor=cursor, include_total=include_total
+            )
         except SQLAlchemyError as e:
             logger.error(f"查询角色列表失败: {str(e)}")
             raise DatabaseError("查询角色列表失败")
@@ -72,12 +113,12 @@ class RoleCRUD:
     async def count(self, db: Session, status: Optional[str] = None) -> int:
         """获取角色总数"""
         try:
-            query = db.query(Role)
+            query = select(func.count()).select_from(Role)
             
             if status is not None:
-                query = query.filter(Role.Status == status)
+                query = query.where(Role.Status == status)
                 
-            return query.count()
+            return await db_scalar(db, query)
         except SQLAlchemyError as e:
             logger.error(f"统计角色数量失败: {str(e)}")
             raise DatabaseError("统计角色数量失败")
@@ -93,13 +134,13 @@ class RoleCRUD:
             for field, value in update_data.items():
                 setattr(db_role, field, value)
                 
-            db.commit()
-            db.refresh(db_role)
+            await db_commit(db)
+            await db_refresh(db, db_role)
             logger.info(f"角色更新成功: {role_id}")
             return db_role
         except SQLAlchemyError as e:
             logger.error(f"更新角色失败: {str(e)}")
-            self.db.rollback()
+            await db_rollback(db)
             raise DatabaseError("更新角色失败")
 
     async def delete(self, db: Session, role_id: uuid.UUID) -> bool:
@@ -109,28 +150,22 @@ class RoleCRUD:
             if not db_role:
                 return False
                 
-            db.delete(db_role)
-            db.commit()
+            await db_delete(db, db_role)
+            await db_commit(db)
             logger.info(f"角色删除成功: {role_id}")
             return True
         except SQLAlchemyError as e:
             logger.error(f"删除角色失败: {str(e)}")
-            self.db.rollback()
+            await db_rollback(db)
             raise DatabaseError("删除角色失败")
 
     async def check_role_exists(self, db: Session, role_name: str, role_code: str, exclude_id: Optional[uuid.UUID] = None) -> bool:
         """检查角色名称或代码是否已存在"""
         try:
-            query = db.query(Role).filter(
-                and_(
-                    (Role.RoleName == role_name) | (Role.RoleCode == role_code)
-                )
-            )
-            
+            params = {"name": role_name, "code": role_code}
             if exclude_id:
-                query = query.filter(Role.Id != exclude_id)
-                
-            return query.first() is not None
+                return await db_first(db, _ROLE_EXISTS_EXCLUDING, {**params, "exclude_id": exclude_id}) is not None
+            return await db_first(db, _ROLE_EXISTS, params) is not None
         except SQLAlchemyError as e:
             logger.error(f"检查角色是否存在失败: {str(e)}")
             raise DatabaseError("检查角色失败")
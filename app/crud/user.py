@@ -1,4 +1,5 @@
-from typing import Optional, List
+from typing import Any, Dict, Iterable, Optional, List, Set
+from sqlalchemy import bindparam, delete, func, insert, select, update
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import SQLAlchemyError
 import uuid
@@ -7,15 +8,39 @@ from datetime import datetime
 from app.models.user import User
 from app.models.role import Role
 from app.models.department import Department
+from app.models.email_config import EmailConfig
 from app.schemas.user import UserRegister, UserCreate, UserUpdate,UserInfo
 from app.core.security import get_password_hash
+from app.core.principal import invalidate_principal, invalidate_principals
 from app.core.logger import get_logger
 from app.core.config import settings
+from app.core.pagination import Page, SortKey, paginate
+from app.core.counters import counter_registry
+from app.core.database import db_all, db_commit, db_delete, db_execute, db_execute_dml, db_first, db_get, db_refresh, db_rollback, db_scalar
 from app.exceptions.base import DatabaseError, NotFoundError
 
 logger = get_logger("user.crud")
 
+# IN 列表每批的参数个数，SQL Server单条语句最多2100个参数
+IN_CHUNK_SIZE = 1000
+
+# 热点查询（登录、认证、唯一性校验）的预构建语句，调用时只传参数值
+_WITH_RELATIONS = (joinedload(User.role), joinedload(User.department))
+_USER_BY_ID = select(User).where(User.Id == bindparam("id"))
+_USER_BY_ID_WITH_RELATIONS = _USER_BY_ID.options(*_WITH_RELATIONS)
+_USER_BY_EMAIL = select(User).where(User.Email == bindparam("email"))
+_USER_BY_EMAIL_WITH_RELATIONS = _USER_BY_EMAIL.options(*_WITH_RELATIONS)
+
+def _chunks(values: List[Any], size: int = IN_CHUNK_SIZE) -> Iterable[List[Any]]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
 class CRUDUser:
+    async def _refresh(self, db: Session, user: User) -> None:
+        """提交后重新加载用户及响应中包含的角色、部门"""
+        await db_refresh(db, user)
+        await db_refresh(db, user, ["role", "department"])
+
     async def get_by_id(self, db: Session, id: uuid.UUID, include_relations: bool = False) -> Optional[User]:
         """
         根据ID获取用户
@@ -25,13 +50,8 @@ class CRUDUser:
         :return: 用户对象或None
         """
         try:
-            query = db.query(User)
-            if include_relations:
-                query = query.options(
-                    joinedload(User.role),
-                    joinedload(User.department)
-                )
-            return query.filter(User.Id == id).first()
+            statement = _USER_BY_ID_WITH_RELATIONS if include_relations else _USER_BY_ID
+            return await db_first(db, statement, {"id": id})
         except SQLAlchemyError as e:
             logger.error(f"查询用户失败: {str(e)}")
             raise DatabaseError("查询用户失败")
@@ -45,13 +65,8 @@ class CRUDUser:
         :return: 用户对象或None
         """
         try:
-            query = db.query(User)
-            if include_relations:
-                query = query.options(
-                    joinedload(User.role),
-                    joinedload(User.department)
-                )
-            return query.filter(User.Email == email).first()
+            statement = _USER_BY_EMAIL_WITH_RELATIONS if include_relations else _USER_BY_EMAIL
+            return await db_first(db, statement, {"email": email})
         except SQLAlchemyError as e:
             logger.error(f"查询用户失败: {str(e)}")
             raise DatabaseError("查询用户失败")
@@ -72,13 +87,55 @@ class CRUDUser:
         :return: 用户列表
         """
         try:
-            query = db.query(User)
+            query = select(User)
+            if include_relations:
+                query = query.options(
+                    joinedload(User.role),
+                    joinedload(User.department)
+                )
+            query = query.order_by(*(key.column for key in self.sort_keys))
+            return await db_all(db, query.offset(skip).limit(limit))
+        except SQLAlchemyError as e:
+            logger.error(f"查询用户列表失败: {str(e)}")
+            raise DatabaseError("查询用户列表失败")
+    
+    # 列表排序键：用户名 + Id，Id保证游标唯一
+    sort_keys = (
+        SortKey(User.UserName, lambda obj: obj.UserName),
+        SortKey(User.Id, lambda obj: obj.Id),
+    )
+
+    async def get_page(
+        self,
+        db: Session,
+        *,
+        limit: int = 100,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        include_relations: bool = False
+    ) -> Page[User]:
+        """
+        分页获取用户列表
+        :param db: 数据库会话
+        :param limit: 每页数量
+        :param skip: 跳过数量（传入cursor时忽略）
+        :param cursor: 上一页返回的游标
+        :param include_total: 是否统计总数
+        :param include_relations: 是否包含关联信息（角色、部门）
+        :return: 分页结果
+        """
+        try:
+            query = select(User)
             if include_relations:
                 query = query.options(
                     joinedload(User.role),
                     joinedload(User.department)
                 )
-            return query.offset(skip).limit(limit).all()
+            return await paginate(
+                db, query, self.sort_keys,
+                limit=limit, skip=skip, cursor=cursor, include_total=include_total
+            )
         except SQLAlchemyError as e:
             logger.error(f"查询用户列表失败: {str(e)}")
             raise DatabaseError("查询用户列表失败")
@@ -105,13 +162,13 @@ class CRUDUser:
                 UpdatedAt=datetime.now()
             )
             db.add(db_obj)
-            db.commit()
-            db.refresh(db_obj)
+            await db_commit(db)
+            await self._refresh(db, db_obj)
             logger.info(f"用户创建成功: {db_obj.UserName}")
             return db_obj
         except SQLAlchemyError as e:
             logger.error(f"创建用户失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("创建用户失败")
 
     async def create_user(self, db: Session, *, obj_in: UserCreate) -> Optional[User]:
@@ -134,13 +191,13 @@ class CRUDUser:
                 UpdatedAt=datetime.now()
             )
             db.add(db_obj)
-            db.commit()
-            db.refresh(db_obj)
+            await db_commit(db)
+            await self._refresh(db, db_obj)
             logger.info(f"用户创建成功: {db_obj.UserName}")
             return db_obj
         except SQLAlchemyError as e:
             logger.error(f"创建用户失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("创建用户失败")
 
     async def update(self, db: Session, *, id: uuid.UUID, obj_in: UserUpdate) -> Optional[User]:
@@ -152,7 +209,7 @@ class CRUDUser:
         :return: 更新后的用户对象
         """
         try:
-            user = db.query(User).filter(User.Id == id).first()
+            user = await db_first(db, select(User).where(User.Id == id))
             if not user:
                 raise NotFoundError(f"用户不存在: {id}")
             
@@ -161,15 +218,16 @@ class CRUDUser:
                 setattr(user, field, value)
             
             user.UpdatedAt = datetime.now()
-            db.commit()
-            db.refresh(user)
+            await db_commit(db)
+            await self._refresh(db, user)
+            await invalidate_principal(id)
             logger.info(f"用户更新成功: {id}")
             return user
         except NotFoundError:
             raise
         except SQLAlchemyError as e:
             logger.error(f"更新用户失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("更新用户失败")
     
     async def delete(self, db: Session, *, id: uuid.UUID) -> Optional[User]:
@@ -180,18 +238,19 @@ class CRUDUser:
         :return: 被删除的用户对象
         """
         try:
-            obj = db.query(User).get(id)
+            obj = await db_get(db, User, id)
             if not obj:
                 raise NotFoundError(f"用户不存在: {id}")
-            db.delete(obj)
-            db.commit()
+            await db_delete(db, obj)
+            await db_commit(db)
+            await invalidate_principal(id)
             logger.info(f"用户删除成功: {id}")
             return obj
         except NotFoundError:
             raise
         except SQLAlchemyError as e:
             logger.error(f"删除用户失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("删除用户失败")
     
     async def update_avatar(self, db: Session, *, id: uuid.UUID, avatar_url: str) -> Optional[User]:
@@ -203,21 +262,22 @@ class CRUDUser:
         :return: 更新后的用户对象
         """
         try:
-            user = db.query(User).filter(User.Id == id).first()
+            user = await db_first(db, select(User).where(User.Id == id))
             if not user:
                 raise NotFoundError(f"用户不存在: {id}")
             
             user.AvatarUrl = avatar_url
             user.UpdatedAt = datetime.now()
-            db.commit()
-            db.refresh(user)
+            await db_commit(db)
+            await self._refresh(db, user)
+            await invalidate_principal(id)
             logger.info(f"用户头像更新成功: {id}")
             return user
         except NotFoundError:
             raise
         except SQLAlchemyError as e:
             logger.error(f"更新用户头像失败: {str(e)}")
-            db.rollback()
+            await db_rollback(db)
             raise DatabaseError("更新用户头像失败")
     
     async def count(self, db: Session) -> int:
@@ -227,9 +287,102 @@ class CRUDUser:
         :return: 用户总数
         """
         try:
-            return db.query(User).count()
+            return await db_scalar(db, select(func.count()).select_from(User))
         except SQLAlchemyError as e:
             logger.error(f"统计用户数量失败: {str(e)}")
             raise DatabaseError("统计用户数量失败")
 
+    async def find_existing(self, db: Session, column, values: Iterable[Any]) -> Set[Any]:
+        """
+        批量校验：返回 values 中在 column 上已存在的值
+        :param db: 数据库会话
+        :param column: 要比较的列，例如 User.Email、Role.Id
+        :param values: 待校验的值
+        :return: 已存在的值
+        """
+        values = list(set(values))
+        found: Set[Any] = set()
+        try:
+            for chunk in _chunks(values):
+                result = await db_execute(db, select(column).where(column.in_(chunk)))
+                found.update(result.scalars().all())
+            return found
+        except SQLAlchemyError as e:
+            logger.error(f"批量校验失败: {str(e)}")
+            raise DatabaseError("批量校验失败")
+
+    async def get_ids_by_emails(self, db: Session, emails: Iterable[str]) -> Dict[str, uuid.UUID]:
+        """
+        批量按邮箱查询用户ID
+        :param db: 数据库会话
+        :param emails: 邮箱
+        :return: 小写邮箱 -> 用户ID
+        """
+        emails = list(set(emails))
+        owners: Dict[str, uuid.UUID] = {}
+        try:
+            for chunk in _chunks(emails):
+                result = await db_execute(db, select(User.Email, User.Id).where(User.Email.in_(chunk)))
+                owners.update((email.lower(), id) for email, id in result.all())
+            return owners
+        except SQLAlchemyError as e:
+            logger.error(f"批量查询用户邮箱失败: {str(e)}")
+            raise DatabaseError("批量查询用户邮箱失败")
+
+    async def _after_bulk_write(self, ids: Iterable[uuid.UUID]) -> None:
+        """批量写入不经过ORM单元，需要显式使计数器和认证用户快照失效"""
+        counter_registry.invalidate("user")
+        await invalidate_principals(ids)
+
+    async def bulk_create(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """
+        批量创建用户（单个事务）
+        :param db: 数据库会话
+        :param rows: 列值字典，需包含Id和PasswordHash
+        """
+        try:
+            await db_execute_dml(db, insert(User), rows)
+            await db_commit(db)
+            counter_registry.invalidate("user")
+            logger.info(f"批量创建用户成功: {len(rows)}")
+        except SQLAlchemyError as e:
+            logger.error(f"批量创建用户失败: {str(e)}")
+            await db_rollback(db)
+            raise DatabaseError("批量创建用户失败")
+
+    async def bulk_update(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """
+        批量按主键更新用户（单个事务）
+        :param db: 数据库会话
+        :param rows: 列值字典，需包含Id，只更新出现的列
+        """
+        try:
+            now = datetime.now()
+            await db_execute_dml(db, update(User), [{**row, "UpdatedAt": now} for row in rows])
+            await db_commit(db)
+            await self._after_bulk_write(row["Id"] for row in rows)
+            logger.info(f"批量更新用户成功: {len(rows)}")
+        except SQLAlchemyError as e:
+            logger.error(f"批量更新用户失败: {str(e)}")
+            await db_rollback(db)
+            raise DatabaseError("批量更新用户失败")
+
+    async def bulk_delete(self, db: Session, ids: List[uuid.UUID]) -> None:
+        """
+        批量删除用户（单个事务），与单个删除一致，关联的邮箱配置解除关联
+        :param db: 数据库会话
+        :param ids: 用户ID
+        """
+        try:
+            for chunk in _chunks(ids):
+                await db_execute_dml(db, update(EmailConfig).where(EmailConfig.UserId.in_(chunk)).values(UserId=None))
+                await db_execute_dml(db, delete(User).where(User.Id.in_(chunk)))
+            await db_commit(db)
+            await self._after_bulk_write(ids)
+            logger.info(f"批量删除用户成功: {len(ids)}")
+        except SQLAlchemyError as e:
+            logger.error(f"批量删除用户失败: {str(e)}")
+            await db_rollback(db)
+            raise DatabaseError("批量删除用户失败")
+
 user = CRUDUser() 
\ No newline at end of file
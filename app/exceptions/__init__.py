@@ -16,6 +16,8 @@ from app.exceptions.base import (
     PermissionError,
     NotFoundError,
     DatabaseError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
     BaseException  # 向后兼容别名
 )
 
@@ -32,5 +34,7 @@ __all__ = [
     "PermissionError",
     "NotFoundError",
     "DatabaseError",
+    "ServiceUnavailableError",
+    "TooManyRequestsError",
     "BaseException"
 ] 
\ No newline at end of file
@@ -107,5 +107,37 @@ class DatabaseError(BaseAPIException):
             headers=headers
         )
 
+class ServiceUnavailableError(BaseAPIException):
+    """服务暂时不可用"""
+    def __init__(
+        self,
+        message: str = "服务暂时不可用",
+        data: Any = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message=message,
+            data=data,
+            headers=headers
+        )
+
+class TooManyRequestsError(BaseAPIException):
+    """请求过于频繁"""
+    def __init__(
+        self,
+        message: str = "请求过于频繁，请稍后重试",
+        retry_after: int = 1,
+        data: Any = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.retry_after = retry_after
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            message=message,
+            data=data,
+            headers={**(headers or {}), "Retry-After": str(retry_after)}
+        )
+
 # 为了向后兼容，创建别名
 BaseException = BaseAPIException 
\ No newline at end of file
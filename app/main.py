@@ -1,12 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 from app.middlewares.logging import LoggingMiddleware
 from app.core.logger import get_logger
 from app.core.config import Settings
 from app.core.response import response_manager
+from app.core.hashing import hashing_executor
+from app.core.db_executor import db_executor
+from app.core.cache_bus import cache_bus
+from app.core.jwt_keys import key_ring
+from app.core.database import SessionLocal, async_engine, async_replica_engine
+from app.core.permissions import permission_registry
+from app.core.counters import counter_registry
 from app.exceptions import register_exception_handlers
-from app.api.v1.endpoints import auth, users, departments, roles, menus
+from app.api.v1.endpoints import auth, users, departments, roles, menus, metrics
 from app.schemas.response import SuccessResponse
 
 # 创建logger实例
@@ -71,10 +79,43 @@ def register_routers() -> None:
         prefix=f"{settings.API_V1_STR}/menus",
         tags=["菜单"]
     )
+    app.include_router(
+        metrics.router,
+        prefix=f"{settings.API_V1_STR}/metrics",
+        tags=["监控"]
+    )
 
 # 注册路由
 register_routers()
 
+@app.on_event("startup")
+async def startup_event():
+    """应用启动时订阅缓存失效频道，编译权限注册表并加载计数器"""
+    await cache_bus.start()
+    db = SessionLocal()
+    try:
+        permission_registry.build(db)
+    except Exception as e:
+        logger.error(f"权限注册表编译失败: {str(e)}")
+    finally:
+        db.close()
+    await counter_registry.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时释放资源"""
+    await counter_registry.stop()
+    await cache_bus.stop()
+    hashing_executor.shutdown()
+    logger.info("密码哈希进程池已关闭")
+    db_executor.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+        logger.info("异步数据库连接池已关闭")
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
+        logger.info("异步只读副本连接池已关闭")
+
 @app.get("/", response_model=SuccessResponse[dict])
 async def root():
     """根路径，返回API信息"""
@@ -88,6 +129,18 @@ async def root():
         message="API服务运行正常"
     )
 
+@app.get("/.well-known/jwks.json", tags=["认证"])
+async def jwks():
+    """
+    JWT验证公钥集合
+    - 按标准JWKS格式返回，不使用统一响应包装，供其他服务本地验证令牌
+    - 使用HS256时返回空集合
+    """
+    return JSONResponse(
+        content=key_ring.jwks(),
+        headers={"Cache-Control": "public, max-age=300"}
+    )
+
 @app.get("/hello/{name}", response_model=SuccessResponse[dict])
 async def say_hello(name: str):
     logger.info(f"Hello endpoint called with name: {name}")
@@ -1,9 +1,10 @@
 import time
-import json
 from typing import Callable
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.config import settings
 from app.core.logger import get_logger
+from app.core.query_stats import track_queries
 
 logger = get_logger(name="api")
 
@@ -39,60 +40,66 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             }
         )
         
-        try:
-            # 处理请求
-            response = await call_next(request)
-            
-            # 计算处理时间
-            process_time = time.time() - start_time
-            process_time_ms = round(process_time * 1000, 2)  # 转换为毫秒并保留2位小数
-            
-            # 获取响应体
-            response_body = b""
-            async for chunk in response.body_iterator:
-                response_body += chunk
+        # 统计本请求执行的SQL（下游在复制的上下文中运行，记录到同一个统计对象）
+        with track_queries() as query_stats:
+            try:
+                # 处理请求
+                response = await call_next(request)
             
-            # 重新构建响应
-            response = Response(
-                content=response_body,
-                status_code=response.status_code,
-                headers=dict(response.headers),
-                media_type=response.media_type
-            )
+                # 计算处理时间
+                process_time = time.time() - start_time
+                process_time_ms = round(process_time * 1000, 2)  # 转换为毫秒并保留2位小数
             
-            # 记录响应信息
-            logger.info(
-                f"请求处理完成: {request.method} {request.url.path} - 耗时: {process_time_ms}ms - 状态码: {response.status_code}",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "url": str(request.url),
-                    "path": request.url.path,
-                    "client_host": client_host,
-                    "status_code": response.status_code,
-                    "process_time_ms": process_time_ms,
-                }
-            )
+                # 响应体直接透传，不读入内存（导出等流式响应按块发送给客户端）
+
+                sql = query_stats.summary()
+                for item in sql["sql_repeated"]:
+                    logger.warning(
+                        f"疑似N+1查询: {request.method} {request.url.path} 同一语句执行 {item['count']} 次: {item['statement']}",
+                        extra={"request_id": request_id, "path": request.url.path}
+                    )
+                if settings.DEBUG:
+                    response.headers["X-SQL-Stats"] = query_stats.header()
+
+                # 记录响应信息
+                logger.info(
+                    f"请求处理完成: {request.method} {request.url.path} - 耗时: {process_time_ms}ms - 状态码: {response.status_code}"
+                    f" - SQL: {sql['sql_count']}条/{sql['sql_time_ms']}ms",
+                    extra={
+                        "request_id": request_id,
+                        "method": request.method,
+                        "url": str(request.url),
+                        "path": request.url.path,
+                        "client_host": client_host,
+                        "status_code": response.status_code,
+                        "process_time_ms": process_time_ms,
+                        "sql_count": sql["sql_count"],
+                        "sql_time_ms": sql["sql_time_ms"],
+                        "sql_repeated": len(sql["sql_repeated"]),
+                    }
+                )
             
-            return response
+                return response
             
-        except Exception as e:
-            # 计算处理时间
-            process_time = time.time() - start_time
-            process_time_ms = round(process_time * 1000, 2)
+            except Exception as e:
+                # 计算处理时间
+                process_time = time.time() - start_time
+                process_time_ms = round(process_time * 1000, 2)
             
-            # 记录异常信息
-            logger.exception(
-                f"请求处理失败: {request.method} {request.url.path} - 耗时: {process_time_ms}ms - 错误: {str(e)}",
-                extra={
-                    "request_id": request_id,
-                    "method": request.method,
-                    "url": str(request.url),
-                    "path": request.url.path,
-                    "client_host": client_host,
-                    "error": str(e),
-                    "process_time_ms": process_time_ms,
-                    "status_code": 500
-                }
-            )
-            raise
\ No newline at end of file
+                # 记录异常信息
+                logger.exception(
+                    f"请求处理失败: {request.method} {request.url.path} - 耗时: {process_time_ms}ms - 错误: {str(e)}",
+                    extra={
+                        "request_id": request_id,
+                        "method": request.method,
+                        "url": str(request.url),
+                        "path": request.url.path,
+                        "client_host": client_host,
+                        "error": str(e),
+                        "process_time_ms": process_time_ms,
+                        "status_code": 500,
+                        "sql_count": query_stats.count,
+                        "sql_time_ms": round(query_stats.total_ms, 2),
+                    }
+                )
+                raise
\ No newline at end of file
@@ -1,3 +1,4 @@
+from .types import GUID
 from .base import BaseModel
 from .user import User
 from .department import Department
@@ -6,4 +7,4 @@ from .menu import Menu
 from .role_menu import RoleMenu
 from .email_config import EmailConfig
 
-__all__ = ["BaseModel", "User", "Department", "Role", "Menu", "RoleMenu", "EmailConfig"] 
\ No newline at end of file
+__all__ = ["GUID", "BaseModel", "User", "Department", "Role", "Menu", "RoleMenu", "EmailConfig"] 
\ No newline at end of file
@@ -1,14 +1,14 @@
 from sqlalchemy import Column, Integer, ForeignKey, Index, Boolean
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
 from app.models.base import BaseModel
+from app.models.types import GUID
 
 class RoleMenu(BaseModel):
     """角色菜单关联表"""
     __tablename__ = "hRoleMenu"
 
     RoleId = Column(
-        UNIQUEIDENTIFIER, 
+        GUID, 
         ForeignKey("hRoles.Id"), 
         nullable=False, 
         comment="角色ID"
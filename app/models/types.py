@@ -0,0 +1,34 @@
+import uuid
+from typing import Any, Optional
+from sqlalchemy.types import CHAR, TypeDecorator
+from sqlalchemy.dialects.mssql import UNIQUEIDENTIFIER
+
+class GUID(TypeDecorator):
+    """
+    跨数据库的GUID类型
+    - SQL Server使用 UNIQUEIDENTIFIER
+    - 其他数据库（SQLite等）使用 CHAR(36)，按带连字符的小写字符串存储
+    - 绑定参数接受 uuid.UUID 或字符串，查询结果统一返回 uuid.UUID
+    """
+
+    impl = CHAR(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "mssql":
+            return dialect.type_descriptor(UNIQUEIDENTIFIER())
+        return dialect.type_descriptor(CHAR(36))
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[Any]:
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        if dialect.name == "mssql":
+            return value
+        return str(value)
+
+    def process_result_value(self, value: Any, dialect) -> Optional[uuid.UUID]:
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
@@ -27,12 +27,13 @@ class ErrorResponse(BaseResponse[None]):
 
 class PaginationMeta(BaseModel):
     """分页元数据"""
-    total: int = Field(..., description="总记录数")
+    total: Optional[int] = Field(None, description="总记录数，未统计时为空")
     page: int = Field(..., description="当前页码")
     page_size: int = Field(..., description="每页记录数")
-    total_pages: int = Field(..., description="总页数")
+    total_pages: Optional[int] = Field(None, description="总页数，未统计总数时为空")
     has_next: bool = Field(..., description="是否有下一页")
     has_prev: bool = Field(..., description="是否有上一页")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，没有下一页时为空")
 
 class PaginationData(BaseModel, Generic[T]):
     """分页数据模型"""
@@ -57,8 +58,10 @@ class BusinessCode:
     NOT_FOUND = 404
     CONFLICT = 409
     VALIDATION_ERROR = 422
+    TOO_MANY_REQUESTS = 429
     
     # 服务端错误
     INTERNAL_ERROR = 500
     DATABASE_ERROR = 501
-    EXTERNAL_SERVICE_ERROR = 502 
\ No newline at end of file
+    EXTERNAL_SERVICE_ERROR = 502
+    SERVICE_UNAVAILABLE = 503 
\ No newline at end of file
@@ -1,8 +1,10 @@
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 from pydantic import BaseModel, EmailStr, Field
 from fastapi import Body
 from pydantic.types import UUID4
 from datetime import datetime
+from app.core.config import settings
 
 class RoleInfo(BaseModel):
     """角色信息模型"""
@@ -96,10 +98,49 @@ class UserLoginResponse(BaseModel):
     """用户登录响应模型"""
     userInfo: UserInfo
     token: str
+    refreshToken: str = Field(..., description="刷新令牌，访问令牌过期后用于换取新令牌")
+
+class RefreshTokenRequest(BaseModel):
+    """刷新令牌请求模型"""
+    refreshToken: str
+
+class RefreshTokenResponse(BaseModel):
+    """刷新令牌响应模型"""
+    token: str
+    refreshToken: str
 
 class LogoutRequest(BaseModel):
     user_id: UUID4
 
 class AvatarUpload(BaseModel):
     """头像上传请求模型"""
-    avatar: str = Body(..., description="Base64格式的图片数据")
\ No newline at end of file
+    avatar: str = Body(..., description="Base64格式的图片数据")
+
+class UserBulkCreate(BaseModel):
+    """批量创建用户请求模型"""
+    Users: List[UserCreate] = Field(..., min_length=1, max_length=settings.USER_BULK_MAX_ROWS, description="待创建的用户")
+
+class UserBulkUpdateItem(UserUpdate):
+    """批量更新用户的单行数据"""
+    Id: UUID = Field(..., description="用户ID")
+
+class UserBulkUpdate(BaseModel):
+    """批量更新用户请求模型"""
+    Users: List[UserBulkUpdateItem] = Field(..., min_length=1, max_length=settings.USER_BULK_MAX_ROWS, description="待更新的用户")
+
+class UserBulkDelete(BaseModel):
+    """批量删除用户请求模型"""
+    Ids: List[UUID] = Field(..., min_length=1, max_length=settings.USER_BULK_MAX_ROWS, description="待删除的用户ID")
+
+class UserBulkRowResult(BaseModel):
+    """批量操作的单行结果，Index为该行在请求中的位置"""
+    Index: int
+    Id: Optional[UUID] = None
+    Success: bool
+    Message: Optional[str] = None
+
+class UserBulkResult(BaseModel):
+    """批量操作结果"""
+    Succeeded: int
+    Failed: int
+    Results: List[UserBulkRowResult]
@@ -1,12 +1,16 @@
-from datetime import timedelta
-from typing import Optional
+import uuid
+from typing import Any, Dict, Optional
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.schemas.user import UserLogin, UserLoginResponse, UserInfo
+from app.schemas.user import UserLogin, UserLoginResponse, UserInfo, RefreshTokenResponse
 from app.crud.auth import auth as crud_auth
-from app.crud.department import department as crud_department
-from app.crud.role import role as crud_role
-from app.core.security import create_access_token,revoke_all_tokens
+from app.crud.user import user as crud_user
+from app.core.security import (
+    create_token_pair,
+    check_token_generation,
+    revoke_all_tokens,
+    rotate_refresh_token
+)
 from app.core.config import settings
 from app.core.logger import get_logger
 from app.core.token_manager import token_manager
@@ -28,40 +32,30 @@ class AuthService:
         
         return user
     
-    async def create_access_token(self, user: User) -> dict:
-        """创建访问令牌"""
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = await create_access_token(
-            subject=str(user.Id),
-            expires_delta=access_token_expires
-        )
+    async def create_access_token(self, user: User, client: str = "") -> dict:
+        """创建访问令牌和刷新令牌（同时撤销该用户之前的所有会话）"""
+        access_token, refresh_token = await create_token_pair(str(user.Id), client=client)
         return {
             "access_token": access_token,
+            "refresh_token": refresh_token,
             "token_type": "bearer"
         }
     
-    async def login(self, db: Session, login_data: UserLogin) -> UserLoginResponse:
-        """用户登录"""
+    async def login(self, db: Session, login_data: UserLogin, client: str = "") -> UserLoginResponse:
+        """
+        用户登录
+        - 只验证一次密码（用户、部门、角色一次查询取回）
+        - 撤销旧会话与写入新令牌在一次Redis往返中完成
+        """
         # 验证用户
         user = await self.authenticate(db, login_data)
         
-        # 撤销之前的令牌
-        await revoke_all_tokens(user.Id)
-        
         # 创建访问令牌
-        token_data = await self.create_access_token(user)
-        
-        # 存储token到Redis
-        await token_manager.store_token(
-            str(user.Id),
-            token_data["access_token"]
-        )
+        token_data = await self.create_access_token(user, client)
 
-        # 获取用户部门
-        department = await crud_department.get_by_id(db, user.DepartmentId)
-        
-        # 获取用户角色
-        role = await crud_role.get_by_id(db, user.RoleId)
+        # 用户部门和角色已随用户一起加载
+        department = user.department
+        role = user.role
 
         # 创建用户信息对象
         user_info = UserInfo(
@@ -78,19 +72,46 @@ class AuthService:
         # 创建登录响应
         response = UserLoginResponse(
             userInfo=user_info,
-            token=token_data["access_token"]
+            token=token_data["access_token"],
+            refreshToken=token_data["refresh_token"]
         )
 
         logger.info(f"用户登录成功: {user.UserName}")
         return response
 
+    async def refresh(self, db: Session, refresh_token: str, client: str = "") -> RefreshTokenResponse:
+        """
+        刷新令牌
+        - 轮换刷新令牌并签发新的访问令牌，只访问一次会话存储
+        - 用户已被删除或禁用时撤销全部会话
+        """
+        user_id, access_token, new_refresh_token = await rotate_refresh_token(refresh_token, client)
+
+        user = await crud_user.get_by_id(db, id=uuid.UUID(user_id))
+        if not user or not await crud_auth.is_active(user):
+            await revoke_all_tokens(user_id)
+            logger.warning(f"刷新令牌失败: 用户不存在或已被禁用 - {user_id}")
+            raise AuthenticationError("用户不存在或已被禁用")
+
+        logger.info(f"用户刷新令牌成功: {user.UserName}")
+        return RefreshTokenResponse(token=access_token, refreshToken=new_refresh_token)
+
     async def logout(self, user_id: str) -> None:
         """用户登出"""
         await token_manager.revoke_token(user_id)
         logger.info(f"用户登出成功: {user_id}")
 
-    async def validate_token(self, user_id: str, token: str) -> bool:
-        """验证token是否有效"""
+    async def validate_token(
+        self, user_id: str, token: str, payload: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        验证token是否有效
+        - generation模式：比较令牌代数与最小有效代数，通常不需要网络IO
+        - session模式或令牌不含代数：与存储中的用户令牌比较
+        """
+        generation = (payload or {}).get("gen")
+        if settings.TOKEN_VALIDATION_MODE == "generation" and generation is not None:
+            return await check_token_generation(user_id, generation)
         return await token_manager.validate_token(user_id, token)
 
 auth_service = AuthService()
\ No newline at end of file
@@ -3,6 +3,8 @@ from uuid import UUID
 from sqlalchemy.orm import Session
 
 from app.crud.menu import get_menu_crud
+from app.core.pagination import Page
+from app.core.counters import counter_registry
 from app.schemas.menu import Menu, MenuCreate, MenuUpdate, MenuTree
 from app.core.logger import get_logger
 from app.exceptions.base import NotFoundError, ValidationError
@@ -49,6 +51,27 @@ class MenuService:
         menu_crud = get_menu_crud(db)
         return await menu_crud.get_multi(skip=skip, limit=limit, hidden=hidden, parent_id=parent_id)
 
+    async def get_menu_page(
+        self,
+        db: Session,
+        limit: int = 100,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        hidden: Optional[bool] = None,
+        parent_id: Optional[int] = None
+    ) -> Page[Menu]:
+        """分页获取菜单列表（支持游标）"""
+        menu_crud = get_menu_crud(db)
+        return await menu_crud.get_page(
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+            include_total=include_total,
+            hidden=hidden,
+            parent_id=parent_id
+        )
+
     async def get_menu_by_id(self, db: Session, menu_id: UUID) -> Menu:
         """根据ID获取菜单"""
         menu_crud = get_menu_crud(db)
@@ -125,10 +148,14 @@ class MenuService:
         menu_crud = get_menu_crud(db)
         return await menu_crud.get_menu_tree(show_hidden=show_hidden)
 
-    async def get_menu_count(self, db: Session, hidden: Optional[bool] = None) -> int:
-        """获取菜单总数"""
-        menu_crud = get_menu_crud(db)
-        return await menu_crud.count(hidden=hidden)
+    async def get_menu_count(
+        self,
+        db: Session,
+        hidden: Optional[bool] = None,
+        parent_id: Optional[int] = None
+    ) -> int:
+        """获取菜单总数（读取内存计数器）"""
+        return await counter_registry.count(db, "menu", Hidden=hidden, ParentId=parent_id)
 
     async def get_next_menu_id(self, db: Session) -> int:
         """获取下一个可用的MenuId"""
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from uuid import UUID
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 import json
 
@@ -8,6 +9,9 @@ from app.schemas.role import Role, RoleCreate, RoleUpdate
 from app.schemas.role_menu import RouteItem, RouteMeta
 from app.models.role_menu import RoleMenu
 from app.models.menu import Menu
+from app.core.database import db_all
+from app.core.pagination import Page
+from app.core.counters import counter_registry
 from app.core.logger import get_logger
 from app.exceptions.base import ValidationError, NotFoundError
 
@@ -36,6 +40,20 @@ class RoleService:
         """获取角色列表"""
         return await crud_role.get_multi(db, skip=skip, limit=limit, status=status_filter)
 
+    async def get_role_page(
+        self,
+        db: Session,
+        limit: int = 100,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        status_filter: Optional[str] = None
+    ) -> Page[Role]:
+        """分页获取角色列表（支持游标）"""
+        return await crud_role.get_page(
+            db, limit=limit, skip=skip, cursor=cursor, include_total=include_total, status=status_filter
+        )
+
     async def get_role_by_id(self, db: Session, role_id: UUID) -> Role:
         """根据ID获取角色"""
         role = await crud_role.get_by_id(db, role_id)
@@ -106,8 +124,8 @@ class RoleService:
         logger.info(f"删除角色成功: {role_id}")
 
     async def get_role_count(self, db: Session, status_filter: Optional[str] = None) -> int:
-        """获取角色总数"""
-        return await crud_role.count(db, status=status_filter)
+        """获取角色总数（读取内存计数器）"""
+        return await counter_registry.count(db, "role", Status=status_filter)
 
     async def change_role_status(self, db: Session, role_id: UUID, status: str) -> Role:
         """更改角色状态"""
@@ -131,10 +149,10 @@ class RoleService:
             raise NotFoundError("角色不存在")
         
         # 查询角色关联的菜单
-        role_menus = db.query(RoleMenu).filter(
+        role_menus = await db_all(db, select(RoleMenu).where(
             RoleMenu.RoleId == role_id,
             RoleMenu.IsEnabled == True
-        ).all()
+        ))
         
         if not role_menus:
             return []
@@ -143,10 +161,10 @@ class RoleService:
         menu_ids = [rm.MenuId for rm in role_menus]
         
         # 查询菜单详情
-        menus = db.query(Menu).filter(
+        menus = await db_all(db, select(Menu).where(
             Menu.MenuId.in_(menu_ids),
             Menu.Hidden == False  # 只获取非隐藏菜单
-        ).order_by(Menu.MenuOrder).all()
+        ).order_by(Menu.MenuOrder))
         
         # 构建路由树
         routes = self._build_route_tree(menus)
@@ -1,6 +1,8 @@
-from typing import Optional, List
-from uuid import UUID
+from typing import AsyncIterator, Optional, List
+from uuid import UUID, uuid4
 from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 import base64
 import os
@@ -10,26 +12,55 @@ from PIL import Image
 import io
 
 from app.models.user import User
-from app.schemas.user import UserInfo, UserRegister, UserCreate, UserUpdate, User as UserSchema
+from app.models.role import Role
+from app.models.department import Department
+from app.schemas.user import (
+    UserInfo, UserRegister, UserCreate, UserUpdate, User as UserSchema,
+    UserBulkUpdateItem, UserBulkResult, UserBulkRowResult
+)
 from app.crud.user import user as crud_user
-from app.crud.role import role as crud_role
-from app.crud.department import department as crud_department
 from app.services.role import role_service
+from app.core.principal import invalidate_principal
+from app.core.security import get_password_hashes
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal, db_commit, db_first, db_refresh, db_rollback, db_stream, use_read_only, use_replica
+from app.core.pagination import Page
+from app.core.counters import counter_registry
 from app.utils.file_handler import FileHandler
+from app.utils.export import ExportFormat
 from app.core.logger import get_logger
 from app.exceptions.base import ValidationError, NotFoundError
 
 logger = get_logger(__name__)
 
+DEFAULT_AVATAR_URL = 'http://127.0.0.1:8000/static/uploads/avatars/default.png'
+
+# 导出列：字段名、表头、查询表达式
+EXPORT_COLUMNS = [
+    ("Id", "用户ID", User.Id),
+    ("UserName", "用户名", User.UserName),
+    ("Email", "邮箱", User.Email),
+    ("DepartmentName", "部门", Department.DepartmentName),
+    ("RoleName", "角色", Role.RoleName),
+    ("Status", "状态", User.Status),
+    ("CreatedAt", "创建时间", User.CreatedAt),
+]
+
+def _bulk_result(ids: List[Optional[UUID]], errors: List[Optional[str]]) -> UserBulkResult:
+    """汇总批量操作的逐行结果"""
+    results = [
+        UserBulkRowResult(Index=i, Id=ids[i], Success=errors[i] is None, Message=errors[i])
+        for i in range(len(errors))
+    ]
+    failed = sum(1 for error in errors if error is not None)
+    return UserBulkResult(Succeeded=len(errors) - failed, Failed=failed, Results=results)
+
 class UserService:
     async def get_current_user_info(self, db: Session, user_id: UUID) -> UserInfo:
         """获取当前用户信息"""
-        user = await crud_user.get_by_id(db, user_id)
-        # 获取用户部门
-        department = await crud_department.get_by_id(db, user.DepartmentId)
-        
-        # 获取用户角色
-        role = await crud_role.get_by_id(db, user.RoleId)
+        # 部门、角色随用户一次查询加载
+        user = await crud_user.get_by_id(db, user_id, include_relations=True)
+        department, role = user.department, user.role
 
         # 创建用户信息对象
         user_info = UserInfo(
@@ -54,7 +85,7 @@ class UserService:
         """
         try:
             # 验证用户是否存在
-            user = db.query(User).filter(User.Id == user_id).first()
+            user = await db_first(db, select(User).where(User.Id == user_id))
             if not user:
                 raise ValidationError("用户不存在")
                 
@@ -85,8 +116,9 @@ class UserService:
                 
                 # 更新用户头像URL
                 user.AvatarUrl = avatar_url
-                db.commit()
-                db.refresh(user)
+                await db_commit(db)
+                await db_refresh(db, user)
+                await invalidate_principal(user_id)
                 
                 logger.info(f"用户 {user_id} 头像更新成功")
                 
@@ -132,9 +164,28 @@ class UserService:
             include_relations=include_relations
         )
     
-    async def get_user_count(self, db: Session) -> int:
-        """获取用户总数"""
-        return await crud_user.count(db)
+    async def get_user_page(
+        self,
+        db: Session,
+        limit: int = 100,
+        skip: int = 0,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        include_relations: bool = False
+    ) -> Page[User]:
+        """分页获取用户列表（支持游标）"""
+        return await crud_user.get_page(
+            db,
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+            include_total=include_total,
+            include_relations=include_relations
+        )
+    
+    async def get_user_count(self, db: Session, status: Optional[str] = None) -> int:
+        """获取用户总数（读取内存计数器）"""
+        return await counter_registry.count(db, "user", Status=status)
     
     async def create_user(self, db: Session, user_in: UserRegister) -> User:
         """创建用户（注册用）"""
@@ -280,4 +331,171 @@ class UserService:
             logger.error(f"更新头像失败: {str(e)}")
             raise ValidationError("头像上传失败，请稍后重试")
 
+    async def bulk_create_users(self, db: Session, users_in: List[UserCreate]) -> UserBulkResult:
+        """
+        批量创建用户
+        - 邮箱、角色、部门用集合查询一次校验，未通过的行返回错误，其余行继续创建
+        - 校验完成后释放连接，密码哈希在进程池中并行计算
+        - 通过校验的行在一个事务中以 executemany 写入
+        """
+        errors: List[Optional[str]] = [None] * len(users_in)
+        seen = set()
+        for i, user_in in enumerate(users_in):
+            email = user_in.Email.lower()
+            if email in seen:
+                errors[i] = "请求中邮箱重复"
+            seen.add(email)
+
+        existing_emails = await crud_user.get_ids_by_emails(db, (u.Email for u in users_in))
+        role_ids = await crud_user.find_existing(db, Role.Id, (u.RoleId for u in users_in if u.RoleId))
+        department_ids = await crud_user.find_existing(db, Department.Id, (u.DepartmentId for u in users_in))
+        for i, user_in in enumerate(users_in):
+            if errors[i]:
+                continue
+            if user_in.Email.lower() in existing_emails:
+                errors[i] = "邮箱已被注册"
+            elif user_in.RoleId is None:
+                errors[i] = "角色不能为空"
+            elif user_in.RoleId not in role_ids:
+                errors[i] = "指定的角色不存在"
+            elif user_in.DepartmentId not in department_ids:
+                errors[i] = "指定的部门不存在"
+
+        valid = [i for i, error in enumerate(errors) if error is None]
+        ids: List[Optional[UUID]] = [None] * len(users_in)
+        if valid:
+            await db_rollback(db)
+            hashes = await get_password_hashes([users_in[i].Password for i in valid])
+            now = datetime.now()
+            rows = []
+            for i, password_hash in zip(valid, hashes):
+                user_in = users_in[i]
+                ids[i] = uuid4()
+                rows.append({
+                    "Id": ids[i],
+                    "UserName": user_in.UserName,
+                    "Email": user_in.Email,
+                    "PasswordHash": password_hash,
+                    "DepartmentId": user_in.DepartmentId,
+                    "RoleId": user_in.RoleId,
+                    "Status": user_in.Status or "1",
+                    "AvatarUrl": user_in.AvatarUrl or DEFAULT_AVATAR_URL,
+                    "CreatedAt": now,
+                    "UpdatedAt": now
+                })
+            await crud_user.bulk_create(db, rows)
+
+        logger.info(f"批量创建用户: 成功 {len(valid)}，失败 {len(users_in) - len(valid)}")
+        return _bulk_result(ids, errors)
+
+    async def bulk_update_users(self, db: Session, users_in: List[UserBulkUpdateItem]) -> UserBulkResult:
+        """
+        批量更新用户
+        - 用户、邮箱占用、角色、部门用集合查询一次校验，未通过的行返回错误
+        - 显式传入null的字段对应非空列，该行返回错误，不影响其他行
+        - 通过校验的行在一个事务中按主键批量更新
+        """
+        errors: List[Optional[str]] = [None] * len(users_in)
+        seen_ids, seen_emails = set(), set()
+        for i, user_in in enumerate(users_in):
+            nulls = sorted(name for name in user_in.model_fields_set if getattr(user_in, name) is None)
+            if user_in.Id in seen_ids:
+                errors[i] = "请求中用户重复"
+            elif nulls:
+                errors[i] = f"{'、'.join(nulls)}不能为空"
+            elif user_in.Email and user_in.Email.lower() in seen_emails:
+                errors[i] = "请求中邮箱重复"
+            seen_ids.add(user_in.Id)
+            if user_in.Email:
+                seen_emails.add(user_in.Email.lower())
+
+        existing_ids = await crud_user.find_existing(db, User.Id, seen_ids)
+        email_owners = await crud_user.get_ids_by_emails(db, (u.Email for u in users_in if u.Email))
+        role_ids = await crud_user.find_existing(db, Role.Id, (u.RoleId for u in users_in if u.RoleId))
+        department_ids = await crud_user.find_existing(db, Department.Id, (u.DepartmentId for u in users_in if u.DepartmentId))
+
+        rows = []
+        for i, user_in in enumerate(users_in):
+            if errors[i]:
+                continue
+            owner = email_owners.get(user_in.Email.lower()) if user_in.Email else None
+            if user_in.Id not in existing_ids:
+                errors[i] = "用户不存在"
+            elif owner is not None and owner != user_in.Id:
+                errors[i] = "邮箱已被其他用户使用"
+            elif user_in.RoleId and user_in.RoleId not in role_ids:
+                errors[i] = "指定的角色不存在"
+            elif user_in.DepartmentId and user_in.DepartmentId not in department_ids:
+                errors[i] = "指定的部门不存在"
+            else:
+                rows.append({**user_in.model_dump(exclude_unset=True), "Id": user_in.Id})
+
+        if rows:
+            await crud_user.bulk_update(db, rows)
+
+        logger.info(f"批量更新用户: 成功 {len(rows)}，失败 {len(users_in) - len(rows)}")
+        return _bulk_result([u.Id for u in users_in], errors)
+
+    async def bulk_delete_users(self, db: Session, user_ids: List[UUID]) -> UserBulkResult:
+        """批量删除用户，不存在的用户返回错误，其余在一个事务中删除"""
+        existing_ids = await crud_user.find_existing(db, User.Id, user_ids)
+        deleted_set = set()
+        errors: List[Optional[str]] = []
+        deleted: List[UUID] = []
+        for user_id in user_ids:
+            if user_id in deleted_set:
+                errors.append("请求中用户重复")
+            elif user_id not in existing_ids:
+                errors.append("用户不存在")
+            else:
+                errors.append(None)
+                deleted.append(user_id)
+                deleted_set.add(user_id)
+
+        if deleted:
+            await crud_user.bulk_delete(db, deleted)
+
+        logger.info(f"批量删除用户: 成功 {len(deleted)}，失败 {len(user_ids) - len(deleted)}")
+        return _bulk_result(list(user_ids), errors)
+
+    async def export_users(self, export_format: ExportFormat, status: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        流式导出用户（含部门、角色名称）
+        - 只查询导出列，不构建ORM对象；通过服务端游标按批读取，逐批编码发送，内存占用与用户数无关
+        - 响应体在接口返回后才开始生成，请求级会话此时已关闭，因此使用独立的只读会话
+        - 开始发送后出错无法再返回错误响应，只记录日志并中断连接
+        """
+        query = (
+            select(*(column for _, _, column in EXPORT_COLUMNS))
+            .outerjoin(Department, User.DepartmentId == Department.Id)
+            .outerjoin(Role, User.RoleId == Role.Id)
+            .order_by(User.UserName, User.Id)
+        )
+        if status is not None:
+            query = query.where(User.Status == status)
+
+        encoder = export_format.encoder(
+            [key for key, _, _ in EXPORT_COLUMNS],
+            [title for _, title, _ in EXPORT_COLUMNS]
+        )
+        db = AsyncSessionLocal() if settings.DATABASE_MODE == "async" else SessionLocal()
+        use_replica(db)
+        use_read_only(db)
+        exported = 0
+        try:
+            yield encoder.header()
+            async for rows in db_stream(db, query, settings.USER_EXPORT_BATCH_SIZE):
+                exported += len(rows)
+                yield encoder.rows(rows)
+            yield encoder.footer()
+            logger.info(f"用户导出完成: {export_format.name} {exported} 行")
+        except SQLAlchemyError as e:
+            logger.error(f"用户导出失败，已导出 {exported} 行: {str(e)}")
+            raise
+        finally:
+            if isinstance(db, Session):
+                db.close()
+            else:
+                await db.close()
+
 user_service = UserService() 
\ No newline at end of file
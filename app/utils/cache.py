@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class TTLCache:
+    """
+    带过期时间的LRU缓存
+    - 超过容量时淘汰最久未使用的条目
+    - 每个条目可以单独指定过期时间，默认使用缓存的ttl
+    - 仅在单个事件循环内使用，不做线程同步
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取缓存值，不存在或已过期时返回None"""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存值"""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """删除缓存值"""
+        item = self._data.pop(key, None)
+        return item[0] if item else None
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取命中统计"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,193 @@
+import csv
+import io
+import json
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from app.exceptions.base import ValidationError
+
+def _text(value: Any) -> str:
+    """导出单元格文本，None导出为空"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+class RowEncoder:
+    """
+    导出编码器：表头、若干批数据行、结尾分别编码为字节块，由 StreamingResponse 逐块发送
+    - keys 为字段名（NDJSON的键），titles 为表头（CSV、XLSX的第一行）
+    """
+
+    def __init__(self, keys: Sequence[str], titles: Sequence[str]):
+        self.keys = list(keys)
+        self.titles = list(titles)
+
+    def header(self) -> bytes:
+        return b""
+
+    def rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        raise NotImplementedError
+
+    def footer(self) -> bytes:
+        return b""
+
+class CsvEncoder(RowEncoder):
+    """CSV，带UTF-8 BOM，Excel直接打开中文不乱码"""
+
+    def _encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([_text(value) for value in row] for row in rows)
+        return buffer.getvalue().encode("utf-8")
+
+    def header(self) -> bytes:
+        return "\ufeff".encode("utf-8") + self._encode([self.titles])
+
+    def rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return self._encode(rows)
+
+class NdjsonEncoder(RowEncoder):
+    """NDJSON，每行一个JSON对象"""
+
+    def rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        lines = [
+            json.dumps(dict(zip(self.keys, (None if value is None else _text(value) for value in row))), ensure_ascii=False)
+            for row in rows
+        ]
+        return ("\n".join(lines) + "\n").encode("utf-8") if lines else b""
+
+class _ZipSink:
+    """zipfile的只写输出：写入的数据暂存后由 drain 取走，不支持seek时zipfile使用数据描述符"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+class XlsxEncoder(RowEncoder):
+    """
+    XLSX，边生成边压缩输出
+    - 只包含一个工作表，单元格使用内联字符串，不需要共享字符串表
+    - zip以流模式写出，工作表XML写完后才写中央目录，内存中只保留当前批次
+    """
+
+    def __init__(self, keys: Sequence[str], titles: Sequence[str]):
+        super().__init__(keys, titles)
+        self._sink = _ZipSink()
+        self._zip = zipfile.ZipFile(self._sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+        self._sheet = None
+
+    @staticmethod
+    def _row_xml(values: Sequence[Any]) -> str:
+        cells = "".join(
+            f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_text(value))}</t></is></c>'
+            for value in values
+        )
+        return f"<row>{cells}</row>"
+
+    def header(self) -> bytes:
+        for name, content in _XLSX_PARTS.items():
+            self._zip.writestr(name, content)
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", mode="w")
+        self._sheet.write(
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'.encode("utf-8")
+        )
+        self._sheet.write(self._row_xml(self.titles).encode("utf-8"))
+        return self._sink.drain()
+
+    def rows(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        self._sheet.write("".join(self._row_xml(row) for row in rows).encode("utf-8"))
+        return self._sink.drain()
+
+    def footer(self) -> bytes:
+        self._sheet.write(b"</sheetData></worksheet>")
+        self._sheet.close()
+        self._zip.close()
+        return self._sink.drain()
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """导出格式"""
+    name: str
+    media_type: str
+    extension: str
+    encoder: Callable[[Sequence[str], Sequence[str]], RowEncoder]
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "csv": ExportFormat("csv", "text/csv; charset=utf-8", "csv", CsvEncoder),
+    "ndjson": ExportFormat("ndjson", "application/x-ndjson", "ndjson", NdjsonEncoder),
+    "xlsx": ExportFormat(
+        "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx", XlsxEncoder
+    ),
+}
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> ExportFormat:
+    """
+    选择导出格式
+    - 查询参数指定的格式优先，不支持的格式抛出 ValidationError
+    - 否则按 Accept 头中第一个支持的媒体类型选择，都不匹配时使用CSV
+    """
+    if requested:
+        export_format = EXPORT_FORMATS.get(requested.lower())
+        if export_format is None:
+            raise ValidationError(f"不支持的导出格式: {requested}，可选: {', '.join(EXPORT_FORMATS)}")
+        return export_format
+
+    for item in (accept or "").split(","):
+        media_type = item.split(";")[0].strip().lower()
+        for export_format in EXPORT_FORMATS.values():
+            if export_format.media_type.split(";")[0] == media_type:
+                return export_format
+    return EXPORT_FORMATS["csv"]
@@ -0,0 +1,135 @@
+"""
+API基准测试套件
+
+不依赖SQL Server和Redis，在本机或CI中对完整的FastAPI应用（中间件、认证、权限、CRUD）压测：
+- DATABASE_URL 未设置时使用临时SQLite文件；指定时应为空库，启动时通过 benchmarks.seed 写入基准数据
+- SESSION_STORE_BACKEND 默认为 memory
+- 请求通过 httpx 的 ASGITransport 直接调用应用，不经过网络
+
+每个场景并发执行 --requests 个请求，输出吞吐量与延迟分位数。
+DATABASE_MODE=sync 时会话在await期间占用连接，并发数应不超过连接池容量（POOL_SIZE + MAX_OVERFLOW），
+否则事件循环会阻塞在连接池等待上，直到 POOL_TIMEOUT 超时。
+
+运行：
+    python -m benchmarks.bench_api --users 5000 --concurrency 10 --requests 500
+    DATABASE_MODE=thread python -m benchmarks.bench_api --only users.list,roles.list
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+# 应用在导入时读取配置，必须先设置环境变量
+os.environ.setdefault("SESSION_STORE_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+if "DATABASE_URL" not in os.environ:
+    _db_dir = tempfile.mkdtemp(prefix="bench_api_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import create_login_token
+from app.main import app
+from benchmarks.seed import SeedResult, seed_database
+
+API = settings.API_V1_STR
+
+def build_scenarios(data: SeedResult, rng: random.Random) -> Dict[str, Callable[[], str]]:
+    """场景名称 -> 生成请求路径的函数"""
+    return {
+        "users.current": lambda: f"{API}/users/current",
+        "users.list": lambda: f"{API}/users/?skip={rng.randrange(0, max(len(data.user_ids) - 20, 1))}&limit=20",
+        "users.get": lambda: f"{API}/users/{rng.choice(data.user_ids)}",
+        "roles.list": lambda: f"{API}/roles/?limit=20",
+        "roles.get": lambda: f"{API}/roles/{rng.choice(data.role_ids)}",
+        "roles.menus": lambda: f"{API}/roles/{rng.choice(data.role_ids)}/menus",
+        "menus.list": lambda: f"{API}/menus/?limit=50",
+        "menus.tree": lambda: f"{API}/menus/tree",
+        "menus.count": lambda: f"{API}/menus/count/total",
+        "departments.tree": lambda: f"{API}/departments/tree",
+    }
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    path: Callable[[], str],
+    headers: Dict[str, str],
+    concurrency: int,
+    total: int
+) -> None:
+    """并发执行一个场景并输出结果"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path(), headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(
+        f"{name:<18} {total / elapsed:8.1f} req/s  p50={statistics.median(latencies):8.2f}ms "
+        f"p95={p95:8.2f}ms  max={latencies[-1]:8.2f}ms  错误={errors}"
+    )
+
+async def main(args: argparse.Namespace) -> None:
+    data = seed_database(
+        settings.DATABASE_URL,
+        users=args.users,
+        departments=args.departments,
+        roles=args.roles,
+        menus=args.menus
+    )
+    rng = random.Random(args.seed)
+    scenarios = build_scenarios(data, rng)
+    if args.only:
+        selected = args.only.split(",")
+        unknown = [name for name in selected if name not in scenarios]
+        if unknown:
+            sys.exit(f"未知场景: {', '.join(unknown)}，可选: {', '.join(scenarios)}")
+        scenarios = {name: scenarios[name] for name in selected}
+
+    await app.router.startup()
+    try:
+        token = await create_login_token(str(data.admin_id))
+        headers = {"Authorization": f"Bearer {token}"}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(
+                f"数据库: {settings.DATABASE_URL.split('://')[0]}  模式: {settings.DATABASE_MODE}  "
+                f"用户 {args.users}  并发 {args.concurrency}  每个场景 {args.requests} 个请求"
+            )
+            for name, path in scenarios.items():
+                # 预热：填充认证缓存、编译语句缓存
+                await client.get(path(), headers=headers)
+                await run_scenario(client, name, path, headers, args.concurrency, args.requests)
+    finally:
+        await app.router.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API基准测试套件")
+    parser.add_argument("--users", type=int, default=5000, help="用户数")
+    parser.add_argument("--departments", type=int, default=40, help="部门数")
+    parser.add_argument("--roles", type=int, default=20, help="角色数")
+    parser.add_argument("--menus", type=int, default=200, help="菜单数")
+    parser.add_argument("--concurrency", type=int, default=10, help="并发请求数")
+    parser.add_argument("--requests", type=int, default=500, help="每个场景的请求数")
+    parser.add_argument("--only", default="", help="只运行指定场景，逗号分隔")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,152 @@
+"""
+数据库会话模式并发基准测试
+
+对比三种数据库会话模式在注入查询延迟时的吞吐量：
+- sync：与 DATABASE_MODE=sync 相同，CRUD在事件循环上执行同步查询，等待数据库期间整个worker被阻塞
+- thread：与 DATABASE_MODE=thread 相同，同步查询在线程池中执行，线程数等于连接池容量
+- async：与 DATABASE_MODE=async 相同，查询通过异步驱动执行，等待期间事件循环继续处理其他请求
+
+每个模拟请求执行一次角色列表查询和一次角色计数（与 GET /roles 相同），
+同时运行一个只做 asyncio.sleep 的探测任务，统计事件循环的最大延迟。
+
+默认使用临时SQLite文件（sqlite / aiosqlite），每条语句在驱动线程中注入 --latency-ms 延迟，模拟慢查询。
+
+运行：
+    python -m benchmarks.bench_async_db --latency-ms 20 --concurrency 50 --requests 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings, to_async_database_url
+from app.core.database import Base, create_async_db_engine
+from app.core.db_executor import db_executor
+from app.crud.role import role as crud_role
+from app.models import Role
+
+def inject_latency(sync_engine, latency: float) -> None:
+    """在SQLite驱动执行每条语句时休眠，模拟数据库往返延迟"""
+    def delay(statement: str) -> None:
+        time.sleep(latency)
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, "run_async"):
+            # aiosqlite：回调在驱动线程中执行，不阻塞事件循环
+            dbapi_connection.run_async(lambda conn: conn.set_trace_callback(delay))
+        else:
+            dbapi_connection.set_trace_callback(delay)
+
+def seed(url: str, roles: int) -> None:
+    """创建表并写入角色数据"""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(
+            Role(Id=uuid.uuid4(), RoleName=f"bench-role-{i}", RoleCode=f"bench-{i}", Status="1")
+            for i in range(roles)
+        )
+        db.commit()
+    engine.dispose()
+
+async def run_requests(
+    name: str,
+    request: Callable[[], Awaitable[None]],
+    concurrency: int,
+    total: int
+) -> float:
+    """并发执行模拟请求，返回每秒请求数"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def probe() -> None:
+        nonlocal max_lag
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - start - 0.005)
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await request()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    p95 = sorted(latencies)[max(int(len(latencies) * 0.95) - 1, 0)]
+    rps = total / elapsed
+    print(
+        f"{name:<6} {rps:8.1f} req/s  p50={statistics.median(latencies):8.2f}ms "
+        f"p95={p95:8.2f}ms  事件循环最大延迟={max_lag * 1000:8.2f}ms"
+    )
+    return rps
+
+async def main(url: str, latency_ms: float, concurrency: int, total: int) -> None:
+    latency = latency_ms / 1000
+    pool_args = {"pool_size": settings.POOL_SIZE, "max_overflow": settings.MAX_OVERFLOW}
+
+    sync_engine = create_engine(url, **pool_args)
+    async_engine = create_async_db_engine(to_async_database_url(url), **pool_args)
+    if url.startswith("sqlite"):
+        inject_latency(sync_engine, latency)
+        inject_latency(async_engine.sync_engine, latency)
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False, expire_on_commit=False)
+    AsyncSession = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def sync_request() -> None:
+        with SyncSession() as db:
+            await crud_role.get_multi(db, limit=20)
+            await crud_role.count(db)
+
+    async def async_request() -> None:
+        async with AsyncSession() as db:
+            await crud_role.get_multi(db, limit=20)
+            await crud_role.count(db)
+
+    print(f"每条语句注入 {latency_ms}ms 延迟，并发 {concurrency}，共 {total} 个请求")
+    try:
+        db_executor.enabled = False
+        sync_rps = await run_requests("sync", sync_request, concurrency, total)
+        db_executor.enabled = True
+        thread_rps = await run_requests("thread", sync_request, concurrency, total)
+        db_executor.enabled = False
+        async_rps = await run_requests("async", async_request, concurrency, total)
+        print(f"吞吐量提升: thread {thread_rps / sync_rps:.1f}x, async {async_rps / sync_rps:.1f}x")
+        print(f"线程池排队: {db_executor.stats()}")
+    finally:
+        sync_engine.dispose()
+        await async_engine.dispose()
+        db_executor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="数据库会话模式并发基准测试")
+    parser.add_argument("--url", default=None, help="同步数据库URL，默认使用临时SQLite文件")
+    parser.add_argument("--latency-ms", type=float, default=20, help="每条语句注入的延迟（毫秒），仅SQLite生效")
+    parser.add_argument("--concurrency", type=int, default=50, help="并发请求数")
+    parser.add_argument("--requests", type=int, default=500, help="每种模式的请求总数")
+    parser.add_argument("--roles", type=int, default=200, help="预置的角色数")
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        db_dir = tempfile.mkdtemp(prefix="bench_async_db_")
+        url = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+        seed(url, args.roles)
+    asyncio.run(main(url, args.latency_ms, args.concurrency, args.requests))
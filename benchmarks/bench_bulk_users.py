@@ -0,0 +1,129 @@
+"""
+批量用户接口基准测试
+
+对比逐个创建（与 POST /users/ 相同的服务调用：邮箱查询、角色查询、哈希、提交、刷新）
+与批量接口（集合校验、并行哈希、executemany 单事务写入）的吞吐量，并测量批量更新与批量删除。
+- DATABASE_URL 未设置时使用临时SQLite文件；SQL Server下批量写入使用 fast_executemany
+- PASSWORD_BCRYPT_ROUNDS 默认降为4，使结果反映数据库写入路径；设为12可包含生产环境的哈希代价
+
+运行：
+    python -m benchmarks.bench_bulk_users --rows 10000 --single 200
+    PASSWORD_BCRYPT_ROUNDS=12 DATABASE_MODE=async python -m benchmarks.bench_bulk_users
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# 应用在导入时读取配置，必须先设置环境变量
+os.environ.setdefault("SESSION_STORE_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+if "DATABASE_URL" not in os.environ:
+    _db_dir = tempfile.mkdtemp(prefix="bench_bulk_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+import httpx
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.security import create_login_token
+from app.main import app
+from app.schemas.user import UserCreate
+from app.services.user import user_service
+from benchmarks.seed import SeedResult, seed_database
+
+API = settings.API_V1_STR
+
+def user_rows(data: SeedResult, prefix: str, count: int) -> List[Dict[str, Any]]:
+    """生成待创建的用户"""
+    return [
+        {
+            "UserName": f"{prefix}{i:05d}",
+            "Email": f"{prefix}{i:05d}@bulk.example.com",
+            "Password": "bulk-password",
+            "DepartmentId": str(data.department_ids[i % len(data.department_ids)]),
+            "RoleId": str(data.role_ids[1 + i % (len(data.role_ids) - 1)]),
+            "AvatarUrl": "",
+            "Status": "1"
+        }
+        for i in range(count)
+    ]
+
+async def create_one(row: Dict[str, Any]) -> None:
+    """逐个创建：每个用户一个会话，与单个创建接口的请求作用域一致"""
+    user_in = UserCreate(**row)
+    if settings.DATABASE_MODE == "async":
+        async with AsyncSessionLocal() as db:
+            await user_service.create_user_admin(db, user_in)
+    else:
+        with SessionLocal() as db:
+            await user_service.create_user_admin(db, user_in)
+
+def report(name: str, rows: int, elapsed: float, failed: int = 0) -> None:
+    print(f"{name:<16} {rows:6d} 行  {elapsed:8.2f}s  {rows / elapsed:9.1f} 行/s  失败={failed}")
+
+async def send(client: httpx.AsyncClient, method: str, path: str, headers: Dict[str, str], payload: Dict[str, Any]) -> Dict[str, Any]:
+    response = await client.request(method, path, headers=headers, json=payload, timeout=None)
+    if response.status_code != 200:
+        raise SystemExit(f"{method} {path} 失败: {response.status_code} {response.text[:500]}")
+    return response.json()["data"]
+
+async def main(args: argparse.Namespace) -> None:
+    data = seed_database(settings.DATABASE_URL, users=args.users, departments=args.departments, roles=args.roles, menus=20)
+    await app.router.startup()
+    try:
+        print(
+            f"数据库: {settings.DATABASE_URL.split('://')[0]}  模式: {settings.DATABASE_MODE}  "
+            f"bcrypt轮数: {settings.PASSWORD_BCRYPT_ROUNDS}  已有用户 {args.users}"
+        )
+
+        if args.single:
+            rows = user_rows(data, "single", args.single)
+            start = time.perf_counter()
+            for row in rows:
+                await create_one(row)
+            report("逐个创建", len(rows), time.perf_counter() - start)
+
+        token = await create_login_token(str(data.admin_id))
+        headers = {"Authorization": f"Bearer {token}"}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            rows = user_rows(data, "bulk", args.rows)
+            ids: List[str] = []
+            failed = 0
+            start = time.perf_counter()
+            for i in range(0, len(rows), args.batch):
+                result = await send(client, "POST", f"{API}/users/bulk", headers, {"Users": rows[i:i + args.batch]})
+                ids.extend(row["Id"] for row in result["Results"] if row["Success"])
+                failed += result["Failed"]
+            report("批量创建", len(rows), time.perf_counter() - start, failed)
+
+            updates = [{"Id": id, "Status": "0"} for id in ids]
+            failed = 0
+            start = time.perf_counter()
+            for i in range(0, len(updates), args.batch):
+                result = await send(client, "PUT", f"{API}/users/bulk", headers, {"Users": updates[i:i + args.batch]})
+                failed += result["Failed"]
+            report("批量更新", len(updates), time.perf_counter() - start, failed)
+
+            failed = 0
+            start = time.perf_counter()
+            for i in range(0, len(ids), args.batch):
+                result = await send(client, "POST", f"{API}/users/bulk/delete", headers, {"Ids": ids[i:i + args.batch]})
+                failed += result["Failed"]
+            report("批量删除", len(ids), time.perf_counter() - start, failed)
+    finally:
+        await app.router.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量用户接口基准测试")
+    parser.add_argument("--rows", type=int, default=10000, help="批量创建的用户数")
+    parser.add_argument("--batch", type=int, default=10000, help="每个请求的用户数，不超过 USER_BULK_MAX_ROWS")
+    parser.add_argument("--single", type=int, default=200, help="逐个创建的用户数（对照组），0表示跳过")
+    parser.add_argument("--users", type=int, default=1000, help="已有用户数")
+    parser.add_argument("--departments", type=int, default=40, help="部门数")
+    parser.add_argument("--roles", type=int, default=20, help="角色数")
+    asyncio.run(main(parser.parse_args()))
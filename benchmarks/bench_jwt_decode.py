@@ -0,0 +1,44 @@
+"""
+JWT解码微基准测试
+
+对比 python-jose 直接解码与 decode_access_token（带已验证令牌缓存）的单次耗时。
+不需要Redis或数据库。
+
+运行：
+    python -m benchmarks.bench_jwt_decode --iterations 20000
+"""
+import argparse
+import timeit
+
+from app.core.jwt_keys import key_ring
+from app.core.security import _encode_access_token, decode_access_token, jwt_cache
+
+def main(iterations: int, tokens: int) -> None:
+    token_list = [_encode_access_token(f"user-{i}")[0] for i in range(tokens)]
+
+    def raw_decode():
+        for token in token_list:
+            key_ring.decode(token)
+
+    def cached_decode():
+        for token in token_list:
+            decode_access_token(token)
+
+    rounds = max(iterations // tokens, 1)
+    raw = timeit.timeit(raw_decode, number=rounds) / (rounds * tokens)
+    # 预热后只统计命中缓存的情况
+    cached_decode()
+    cached = timeit.timeit(cached_decode, number=rounds) / (rounds * tokens)
+
+    print(f"令牌数: {tokens}, 每种方式解码次数: {rounds * tokens}")
+    print(f"python-jose 直接解码: {raw * 1e6:8.2f} µs/次")
+    print(f"缓存命中解码:        {cached * 1e6:8.2f} µs/次")
+    print(f"加速比: {raw / cached:.1f}x")
+    print(f"缓存统计: {jwt_cache.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JWT解码微基准测试")
+    parser.add_argument("--iterations", type=int, default=20000, help="每种方式的总解码次数")
+    parser.add_argument("--tokens", type=int, default=100, help="参与测试的不同令牌数")
+    args = parser.parse_args()
+    main(args.iterations, args.tokens)
@@ -0,0 +1,117 @@
+"""
+登录路径基准测试
+
+对比旧的登录流程与合并后的单次登录流程的单次登录耗时：
+- 旧流程：两次bcrypt验证，两次 SCAN token:* 撤销，setex + set 分开写入
+- 新流程：一次bcrypt验证，一个Lua脚本完成撤销与写入
+
+需要可用的Redis（使用 settings 中的 REDIS_* 配置，SESSION_STORE_BACKEND=redis）。
+预先写入 --sessions 个其他用户的会话，用于体现SCAN随全局会话数增长的开销。
+
+运行：
+    python -m benchmarks.bench_login --sessions 5000 --iterations 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Callable, Awaitable, List
+
+from app.core.jwt_keys import key_ring
+from app.core.redis import redis_client
+from app.core.session_store import session_store
+from app.core.hashing import hashing_executor
+from app.core.security import (
+    _encode_access_token,
+    create_access_token,
+    create_login_token,
+    get_password_hash,
+    verify_password,
+)
+
+BENCH_PASSWORD = "bench-password"
+# 旧实现的键布局：令牌字符串按会话和按用户各存一份
+LEGACY_TOKEN_PREFIX = "token:"
+LEGACY_USER_TOKEN_PREFIX = "user_token:"
+
+async def legacy_revoke_all_tokens(user_id: str) -> None:
+    """旧实现：扫描全部令牌并逐个解码"""
+    async for key in redis_client.scan_iter(f"{LEGACY_TOKEN_PREFIX}*"):
+        token = await redis_client.get(key)
+        if token:
+            payload = key_ring.decode(token)
+            if str(payload.get("sub")) == str(user_id):
+                await redis_client.delete(key)
+
+async def legacy_login(user_id: str, password_hash: str, skip_hash: bool) -> None:
+    """旧登录流程"""
+    if not skip_hash:
+        await verify_password(BENCH_PASSWORD, password_hash)
+    await legacy_revoke_all_tokens(user_id)
+    token, record = _encode_access_token(user_id)
+    await redis_client.setex(f"{LEGACY_TOKEN_PREFIX}{record.session_id}", record.ttl(), token)
+    await redis_client.set(f"{LEGACY_USER_TOKEN_PREFIX}{user_id}", token, ex=record.ttl())
+    # 端点中重复的认证与撤销
+    if not skip_hash:
+        await verify_password(BENCH_PASSWORD, password_hash)
+    await legacy_revoke_all_tokens(user_id)
+
+async def single_pass_login(user_id: str, password_hash: str, skip_hash: bool) -> None:
+    """合并后的登录流程"""
+    if not skip_hash:
+        await verify_password(BENCH_PASSWORD, password_hash)
+    await create_login_token(user_id)
+
+async def measure(
+    name: str,
+    fn: Callable[[str, str, bool], Awaitable[None]],
+    user_id: str,
+    password_hash: str,
+    iterations: int,
+    skip_hash: bool
+) -> List[float]:
+    """执行并记录每次登录耗时（毫秒）"""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn(user_id, password_hash, skip_hash)
+        timings.append((time.perf_counter() - start) * 1000)
+    p95 = sorted(timings)[max(int(len(timings) * 0.95) - 1, 0)]
+    print(
+        f"{name:<12} mean={statistics.mean(timings):8.2f}ms "
+        f"p50={statistics.median(timings):8.2f}ms p95={p95:8.2f}ms"
+    )
+    return timings
+
+async def main(sessions: int, iterations: int, skip_hash: bool) -> None:
+    user_id = str(uuid.uuid4())
+    password_hash = await get_password_hash(BENCH_PASSWORD)
+
+    print(f"写入 {sessions} 个其他用户的会话...")
+    background_users = [str(uuid.uuid4()) for _ in range(sessions)]
+    for other_user in background_users:
+        await create_access_token(other_user)
+        token, record = _encode_access_token(other_user)
+        await redis_client.setex(f"{LEGACY_TOKEN_PREFIX}{record.session_id}", record.ttl(), token)
+
+    try:
+        print(f"每种流程执行 {iterations} 次登录 (skip_hash={skip_hash})")
+        legacy = await measure("legacy", legacy_login, user_id, password_hash, iterations, skip_hash)
+        single = await measure("single-pass", single_pass_login, user_id, password_hash, iterations, skip_hash)
+        print(f"平均耗时降低: {statistics.mean(legacy) / statistics.mean(single):.1f}x")
+    finally:
+        for other_user in background_users + [user_id]:
+            await session_store.revoke_user_sessions(other_user)
+        async for key in redis_client.scan_iter(f"{LEGACY_TOKEN_PREFIX}*"):
+            await redis_client.delete(key)
+        await redis_client.delete(f"{LEGACY_USER_TOKEN_PREFIX}{user_id}")
+        hashing_executor.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="登录路径基准测试")
+    parser.add_argument("--sessions", type=int, default=2000, help="预置的其他用户会话数")
+    parser.add_argument("--iterations", type=int, default=30, help="每种流程的登录次数")
+    parser.add_argument("--skip-hash", action="store_true", help="跳过bcrypt，只测Redis部分")
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.iterations, args.skip_hash))
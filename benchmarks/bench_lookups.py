@@ -0,0 +1,160 @@
+"""
+热点查询微基准测试
+
+测量登录、认证、唯一性校验等单行查询每次调用的耗时，对比：
+- 每次构建：每次调用重新构造 select() 语句（改为预构建语句之前的写法）
+- 预构建：CRUD层模块加载时构建、调用时只传 bindparam 参数值的语句
+- DBAPI：用驱动游标直接执行同一条SQL并取一行，作为数据库往返的下限
+前两者与DBAPI的差值即每次查询在Python侧（语句构造、缓存键、ORM加载）的开销。
+- DATABASE_URL 未设置时使用临时SQLite文件，此时数据库往返极短，结果基本就是Python侧开销；
+  在SQL Server上运行可以对比Python开销与网络往返的比例
+- 每次查询后清空会话的标识映射，与每个请求使用新会话一致
+
+运行：
+    python -m benchmarks.bench_lookups --iterations 2000
+    DATABASE_MODE=async python -m benchmarks.bench_lookups
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+# 应用在导入时读取配置，必须先设置环境变量
+os.environ.setdefault("SESSION_STORE_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+if "DATABASE_URL" not in os.environ:
+    _db_dir = tempfile.mkdtemp(prefix="bench_lookups_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal, db_first, engine
+from app.crud.menu import MenuCRUD
+from app.crud.user import user as crud_user
+from app.models import Menu, User
+from benchmarks.seed import seed_database
+
+Lookup = Callable[[Any, Any], Awaitable[Any]]
+
+async def email_rebuilt(db, email: str) -> Any:
+    return await db_first(db, select(User).options(
+        joinedload(User.role), joinedload(User.department)
+    ).where(User.Email == email))
+
+async def email_prebuilt(db, email: str) -> Any:
+    return await crud_user.get_by_email(db, email, include_relations=True)
+
+async def id_rebuilt(db, user_id: Any) -> Any:
+    return await db_first(db, select(User).where(User.Id == user_id))
+
+async def id_prebuilt(db, user_id: Any) -> Any:
+    return await crud_user.get_by_id(db, user_id)
+
+async def menu_name_rebuilt(db, name: str) -> bool:
+    return await db_first(db, select(Menu.Id).where(Menu.Name == name).limit(1)) is not None
+
+async def menu_name_prebuilt(db, name: str) -> bool:
+    return await MenuCRUD(db).check_name_exists(name)
+
+def dbapi_parameters(statement, values: List[Any]) -> tuple:
+    """编译语句（参数名为value）并在计时前为每个值生成驱动参数，返回 (SQL, 参数列表)"""
+    dialect = engine.dialect
+    compiled = statement.compile(dialect=dialect)
+    processors = {
+        name: bind.type.dialect_impl(dialect).bind_processor(dialect)
+        for name, bind in ((name, compiled.binds[name]) for name in compiled.positiontup)
+    }
+    parameters = []
+    for value in values:
+        params = compiled.construct_params({"value": value})
+        parameters.append(tuple(
+            processors[name](params[name]) if processors[name] else params[name]
+            for name in compiled.positiontup
+        ))
+    return compiled.string, parameters
+
+def dbapi_lookup(sql: str, parameters: List[tuple]) -> float:
+    """用驱动游标直接执行，返回每次耗时（秒）"""
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        start = time.perf_counter()
+        for params in parameters:
+            cursor.execute(sql, params)
+            cursor.fetchone()
+        elapsed = time.perf_counter() - start
+        cursor.close()
+    finally:
+        connection.close()
+    return elapsed / len(parameters)
+
+async def time_lookup(lookup: Lookup, values: List[Any]) -> float:
+    """在一个会话中依次查询，返回每次耗时（秒）"""
+    factory = AsyncSessionLocal if settings.DATABASE_MODE == "async" else SessionLocal
+    db = factory()
+    try:
+        # 预热：填充编译缓存
+        for value in values[:10]:
+            await lookup(db, value)
+            db.expunge_all()
+        start = time.perf_counter()
+        for value in values:
+            await lookup(db, value)
+            db.expunge_all()
+        return (time.perf_counter() - start) / len(values)
+    finally:
+        if settings.DATABASE_MODE == "async":
+            await db.close()
+        else:
+            db.close()
+
+async def run(args: argparse.Namespace) -> None:
+    data = seed_database(settings.DATABASE_URL, users=args.users, menus=args.menus)
+    with SessionLocal() as db:
+        emails = list(db.scalars(select(User.Email).limit(args.users)))
+        names = list(db.scalars(select(Menu.Name)))
+    count = args.iterations
+    cases: Dict[str, tuple] = {
+        "get_by_email(含角色、部门)": (
+            email_rebuilt, email_prebuilt,
+            [emails[i % len(emails)] for i in range(count)],
+            select(User).options(joinedload(User.role), joinedload(User.department)).where(User.Email == bindparam("value"))
+        ),
+        "get_by_id": (
+            id_rebuilt, id_prebuilt,
+            [data.user_ids[i % len(data.user_ids)] for i in range(count)],
+            select(User).where(User.Id == bindparam("value"))
+        ),
+        "check_name_exists(菜单)": (
+            menu_name_rebuilt, menu_name_prebuilt,
+            [names[i % len(names)] for i in range(count)],
+            select(Menu.Id).where(Menu.Name == bindparam("value")).limit(1)
+        ),
+    }
+
+    print(f"数据库: {engine.dialect.name}, DATABASE_MODE={settings.DATABASE_MODE}, 每种方式查询次数: {count}")
+    print(f"{'查询':<28}{'每次构建':>12}{'预构建':>12}{'DBAPI':>12}{'Python开销降低':>16}")
+    for name, (rebuilt, prebuilt, values, statement) in cases.items():
+        rebuilt_s = await time_lookup(rebuilt, values)
+        prebuilt_s = await time_lookup(prebuilt, values)
+        raw_s = dbapi_lookup(*dbapi_parameters(statement, values))
+        overhead_before, overhead_after = rebuilt_s - raw_s, prebuilt_s - raw_s
+        saved = (1 - overhead_after / overhead_before) * 100 if overhead_before > 0 else 0.0
+        print(
+            f"{name:<28}{rebuilt_s * 1e6:>10.1f}µs{prebuilt_s * 1e6:>10.1f}µs{raw_s * 1e6:>10.1f}µs{saved:>15.1f}%"
+        )
+
+    if settings.DATABASE_MODE == "async":
+        from app.core.database import async_engine
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="热点查询微基准测试")
+    parser.add_argument("--iterations", type=int, default=2000, help="每种方式的查询次数")
+    parser.add_argument("--users", type=int, default=1000, help="写入的用户数")
+    parser.add_argument("--menus", type=int, default=100, help="写入的菜单数")
+    asyncio.run(run(parser.parse_args()))
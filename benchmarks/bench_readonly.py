@@ -0,0 +1,166 @@
+"""
+只读会话基准测试
+
+按FastAPI依赖的生命周期模拟GET请求（打开会话、执行查询、结束依赖），对比：
+- 改动前：连接池默认的 pool_reset_on_return="rollback"，请求结束时提交，归还连接时再回滚一次
+- 读写会话：get_db_session，请求结束时提交，连接池跳过已结束事务的重复回滚
+- 只读会话：get_readonly_db_session 的标记（use_read_only），请求结束时不提交，关闭会话时回滚
+统计每个请求的语句数和驱动层的事务结束（COMMIT/ROLLBACK）调用次数。
+- DATABASE_URL 未设置时使用临时SQLite文件。SQLite没有网络往返，--rtt-ms 在每条语句和每次事务结束时
+  休眠指定毫秒数，模拟到SQL Server的网络往返
+- 也可以在SQL Server上直接运行（--rtt-ms 0）观察真实耗时
+
+运行：
+    python -m benchmarks.bench_readonly --requests 2000 --rtt-ms 0.5
+    DATABASE_MODE=async python -m benchmarks.bench_readonly
+    DB_READONLY_ISOLATION_LEVEL=SNAPSHOT python -m benchmarks.bench_readonly  # SQL Server
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+# 应用在导入时读取配置，必须先设置环境变量
+os.environ.setdefault("SESSION_STORE_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+if "DATABASE_URL" not in os.environ:
+    _db_dir = tempfile.mkdtemp(prefix="bench_readonly_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import (
+    AsyncSessionLocal, SessionLocal, async_engine, create_async_db_engine, create_db_engine, engine,
+    get_db_session, use_read_only
+)
+from app.crud.user import user as crud_user
+from app.crud.role import role as crud_role
+from benchmarks.seed import seed_database
+
+class RoundTrips:
+    """统计语句数和驱动层提交、回滚次数（包括连接池归还连接时的回滚），并按 --rtt-ms 模拟网络往返"""
+
+    def __init__(self, rtt_ms: float):
+        self.rtt = rtt_ms / 1000
+        self.statements = 0
+        self.transaction_ends = 0
+
+    def _round_trip(self) -> None:
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements += 1
+        self._round_trip()
+
+    def listen(self, target) -> None:
+        event.listen(target, "before_cursor_execute", self.before_cursor_execute)
+        # 会话提交、回滚和连接池重置最终都调用方言的 do_commit/do_rollback
+        dialect = target.dialect
+        for name in ("do_commit", "do_rollback"):
+            setattr(dialect, name, self._counted(getattr(dialect, name)))
+
+    def _counted(self, method):
+        def wrapper(dbapi_connection) -> None:
+            self.transaction_ends += 1
+            self._round_trip()
+            method(dbapi_connection)
+        return wrapper
+
+    def reset(self) -> None:
+        self.statements = 0
+        self.transaction_ends = 0
+
+async def handle_request(read_only: bool, user_id: Any) -> None:
+    """一次GET请求：查询用户详情（含角色、部门）和用户的角色，两条单行查询"""
+    dependency = get_db_session()
+    if settings.DATABASE_MODE == "async":
+        db = await dependency.__anext__()
+    else:
+        db = next(dependency)
+    if read_only:
+        use_read_only(db)
+    user = await crud_user.get_by_id(db, user_id, include_relations=True)
+    await crud_role.get_by_id(db, user.RoleId)
+    # 依赖正常结束：读写会话在这里提交，只读会话直接关闭
+    if settings.DATABASE_MODE == "async":
+        try:
+            await dependency.__anext__()
+        except StopAsyncIteration:
+            pass
+    else:
+        next(dependency, None)
+
+async def run_case(read_only: bool, user_ids: List[Any], trips: RoundTrips, bind=None) -> Dict[str, float]:
+    """bind 不为空时会话工厂临时绑定到该引擎"""
+    factory = AsyncSessionLocal if settings.DATABASE_MODE == "async" else SessionLocal
+    default_bind = factory.kw["bind"]
+    if bind is not None:
+        factory.configure(bind=bind)
+    try:
+        return await _timed(read_only, user_ids, trips)
+    finally:
+        factory.configure(bind=default_bind)
+
+async def _timed(read_only: bool, user_ids: List[Any], trips: RoundTrips) -> Dict[str, float]:
+    for user_id in user_ids[:20]:
+        await handle_request(read_only, user_id)
+    trips.reset()
+    start = time.perf_counter()
+    for user_id in user_ids:
+        await handle_request(read_only, user_id)
+    elapsed = time.perf_counter() - start
+    count = len(user_ids)
+    return {
+        "avg_ms": elapsed / count * 1000,
+        "statements": trips.statements / count,
+        "transaction_ends": trips.transaction_ends / count,
+    }
+
+async def run(args: argparse.Namespace) -> None:
+    data = seed_database(settings.DATABASE_URL, users=args.users, menus=args.menus)
+    trips = RoundTrips(args.rtt_ms)
+    if settings.DATABASE_MODE == "async":
+        legacy = create_async_db_engine(settings.ASYNC_DATABASE_URL, pool_reset_on_return="rollback")
+        trips.listen(async_engine.sync_engine)
+        trips.listen(legacy.sync_engine)
+    else:
+        legacy = create_db_engine(settings.DATABASE_URL, pool_reset_on_return="rollback")
+        trips.listen(engine)
+        trips.listen(legacy)
+    user_ids = [data.user_ids[i % len(data.user_ids)] for i in range(args.requests)]
+
+    print(
+        f"数据库: {engine.dialect.name}, DATABASE_MODE={settings.DATABASE_MODE}, "
+        f"DB_READONLY_ISOLATION_LEVEL={settings.DB_READONLY_ISOLATION_LEVEL or '(默认)'}, "
+        f"模拟往返: {args.rtt_ms}ms, 请求数: {args.requests}"
+    )
+    results = {
+        "改动前（提交+归还回滚）": await run_case(False, user_ids, trips, bind=legacy),
+        "读写会话（提交）": await run_case(False, user_ids, trips),
+        "只读会话": await run_case(True, user_ids, trips),
+    }
+    print(f"{'会话':<20}{'平均耗时':>12}{'语句/请求':>12}{'事务结束往返/请求':>20}")
+    for name, result in results.items():
+        print(f"{name:<20}{result['avg_ms']:>10.3f}ms{result['statements']:>12.1f}{result['transaction_ends']:>20.1f}")
+    before = results["改动前（提交+归还回滚）"]["avg_ms"]
+    for name in ("读写会话（提交）", "只读会话"):
+        after = results[name]["avg_ms"]
+        print(f"{name}每个请求节省: {before - after:.3f}ms（{(1 - after / before) * 100:.1f}%）")
+
+    if async_engine is not None:
+        await legacy.dispose()
+        await async_engine.dispose()
+    else:
+        legacy.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="只读会话基准测试")
+    parser.add_argument("--requests", type=int, default=2000, help="每种会话的请求数")
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="模拟的数据库网络往返（毫秒），0表示不模拟")
+    parser.add_argument("--users", type=int, default=1000, help="写入的用户数")
+    parser.add_argument("--menus", type=int, default=100, help="写入的菜单数")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,163 @@
+"""
+基准测试数据
+
+在任意数据库（默认临时SQLite文件）中创建表并写入接近生产规模的数据：
+- 两级部门树
+- 角色（第一个为超级管理员）及角色菜单
+- 三级菜单树，叶子菜单带权限标识
+- 用户平均分布到各部门和角色，全部使用同一个密码哈希以缩短写入时间
+
+运行：
+    python -m benchmarks.seed --url sqlite:///./bench.db --users 5000
+"""
+import argparse
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.hashing import pwd_context
+from app.models import Department, Menu, Role, RoleMenu, User
+
+BENCH_PASSWORD = "bench-password"
+ADMIN_EMAIL = "admin@bench.example.com"
+
+@dataclass
+class SeedResult:
+    """写入的数据概要，供基准脚本选择请求参数"""
+    admin_id: uuid.UUID
+    user_ids: List[uuid.UUID] = field(default_factory=list)
+    role_ids: List[uuid.UUID] = field(default_factory=list)
+    department_ids: List[uuid.UUID] = field(default_factory=list)
+    menu_ids: List[int] = field(default_factory=list)
+
+def seed_database(
+    url: str,
+    users: int = 5000,
+    departments: int = 40,
+    roles: int = 20,
+    menus: int = 200,
+    seed: int = 42
+) -> SeedResult:
+    """创建表并写入基准数据，返回写入数据的ID"""
+    rng = random.Random(seed)
+    password_hash = pwd_context.hash(BENCH_PASSWORD)
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    try:
+        with sessionmaker(bind=engine)() as db:
+            # 部门：约1/5为一级部门，其余挂在一级部门下
+            top_count = max(departments // 5, 1)
+            department_rows = []
+            for i in range(departments):
+                parent = department_rows[i % top_count].Id if i >= top_count else None
+                department_rows.append(Department(
+                    Id=uuid.uuid4(),
+                    ParentId=parent,
+                    DepartmentName=f"部门{i:03d}",
+                    Status="1"
+                ))
+            db.add_all(department_rows[:top_count])
+            db.flush()
+            db.add_all(department_rows[top_count:])
+
+            # 角色：第一个角色为超级管理员
+            role_rows = [
+                Role(
+                    Id=uuid.uuid4(),
+                    RoleName=settings.SUPERUSER_ROLE_NAME if i == 0 else f"角色{i:03d}",
+                    RoleCode="admin" if i == 0 else f"role-{i:03d}",
+                    Description=f"基准测试角色{i}",
+                    Status="1"
+                )
+                for i in range(roles)
+            ]
+            db.add_all(role_rows)
+
+            # 菜单：目录 -> 页面 -> 按钮，按钮带权限标识
+            menu_rows = []
+            directories = max(menus // 20, 1)
+            pages = max(menus // 5, directories)
+            for i in range(menus):
+                menu_id = 1000 + i
+                if i < directories:
+                    parent_id, permission = None, None
+                elif i < pages:
+                    parent_id, permission = 1000 + i % directories, None
+                else:
+                    parent_id = 1000 + directories + i % (pages - directories or 1)
+                    permission = [f"perm:{menu_id}:view", f"perm:{menu_id}:edit"]
+                menu_rows.append(Menu(
+                    Id=uuid.uuid4(),
+                    MenuId=menu_id,
+                    ParentId=parent_id,
+                    Path=f"/m{menu_id}",
+                    Component=f"views/m{menu_id}/index",
+                    Name=f"Menu{menu_id}",
+                    Title=f"菜单{menu_id}",
+                    Permission=permission,
+                    MenuOrder=i
+                ))
+            db.add_all(menu_rows)
+            db.flush()
+
+            # 每个普通角色分配约四分之一的菜单
+            for role in role_rows[1:]:
+                for menu in rng.sample(menu_rows, max(len(menu_rows) // 4, 1)):
+                    db.add(RoleMenu(Id=uuid.uuid4(), RoleId=role.Id, MenuId=menu.MenuId, IsEnabled=True))
+
+            # 用户：第一个为超级管理员，其余随机分配部门和角色
+            admin = User(
+                Id=uuid.uuid4(),
+                UserName="admin",
+                Email=ADMIN_EMAIL,
+                PasswordHash=password_hash,
+                DepartmentId=department_rows[0].Id,
+                RoleId=role_rows[0].Id,
+                AvatarUrl="",
+                Status="1"
+            )
+            user_rows = [admin]
+            for i in range(1, users):
+                user_rows.append(User(
+                    Id=uuid.uuid4(),
+                    UserName=f"user{i:05d}",
+                    Email=f"user{i:05d}@bench.example.com",
+                    PasswordHash=password_hash,
+                    DepartmentId=rng.choice(department_rows).Id,
+                    RoleId=rng.choice(role_rows[1:] or role_rows).Id,
+                    AvatarUrl="",
+                    Status="1" if rng.random() < 0.9 else "0"
+                ))
+            db.add_all(user_rows)
+            db.commit()
+
+            return SeedResult(
+                admin_id=admin.Id,
+                user_ids=[user.Id for user in user_rows],
+                role_ids=[role.Id for role in role_rows],
+                department_ids=[department.Id for department in department_rows],
+                menu_ids=[menu.MenuId for menu in menu_rows]
+            )
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="写入基准测试数据")
+    parser.add_argument("--url", required=True, help="数据库URL，例如 sqlite:///./bench.db")
+    parser.add_argument("--users", type=int, default=5000, help="用户数")
+    parser.add_argument("--departments", type=int, default=40, help="部门数")
+    parser.add_argument("--roles", type=int, default=20, help="角色数")
+    parser.add_argument("--menus", type=int, default=200, help="菜单数")
+    args = parser.parse_args()
+
+    result = seed_database(args.url, args.users, args.departments, args.roles, args.menus)
+    print(
+        f"已写入 {len(result.user_ids)} 个用户, {len(result.department_ids)} 个部门, "
+        f"{len(result.role_ids)} 个角色, {len(result.menu_ids)} 个菜单"
+    )
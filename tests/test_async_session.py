@@ -0,0 +1,45 @@
+import asyncio
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from app.core.config import to_async_database_url
+from app.core.database import db_all, db_commit, db_execute, db_scalar
+
+metadata = MetaData()
+items = Table(
+    "items",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(50)),
+)
+
+def test_async_database_url():
+    """测试同步URL转换为异步驱动URL"""
+    assert to_async_database_url("mssql+pyodbc:///?odbc_connect=DRIVER={x}") == "mssql+aioodbc:///?odbc_connect=DRIVER={x}"
+    assert to_async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert to_async_database_url("sqlite+aiosqlite://") == "sqlite+aiosqlite://"
+
+async def exercise(db) -> None:
+    await db_execute(db, insert(items).values([{"name": "a"}, {"name": "b"}]))
+    await db_commit(db)
+    assert await db_scalar(db, select(func.count()).select_from(items)) == 2
+    assert await db_all(db, select(items.c.name).order_by(items.c.id)) == ["a", "b"]
+
+def test_session_helpers_with_sync_session():
+    """测试会话操作函数使用同步Session"""
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with Session(engine) as db:
+        asyncio.run(exercise(db))
+
+def test_session_helpers_with_async_session():
+    """测试会话操作函数使用AsyncSession（aiosqlite）"""
+    async def run():
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        async with AsyncSession(engine) as db:
+            await exercise(db)
+        await engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+import asyncio
+import uuid
+from typing import Optional
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.core.hashing import hashing_executor, pwd_context
+from app.models import Department, Role, User
+from app.schemas.user import UserBulkUpdateItem, UserCreate
+from app.services.user import user_service
+
+def test_bulk_create_update_delete():
+    """测试批量接口逐行返回校验结果，通过校验的行在一个事务中写入"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    department_id, role_id = uuid.uuid4(), uuid.uuid4()
+    with Session(engine, expire_on_commit=False) as db:
+        db.add_all([
+            Department(Id=department_id, DepartmentName="研发部", Status="1"),
+            Role(Id=role_id, RoleName="成员", RoleCode="member", Status="1")
+        ])
+        db.commit()
+
+        def row(name: str, role: Optional[uuid.UUID] = role_id) -> UserCreate:
+            return UserCreate(
+                UserName=name, Email=f"{name}@example.com", Password="secret123",
+                DepartmentId=department_id, RoleId=role, AvatarUrl=""
+            )
+
+        async def run():
+            created = await user_service.bulk_create_users(
+                db, [row("a"), row("A"), row("b", uuid.uuid4()), row("c"), row("d", None), row("e")]
+            )
+            assert (created.Succeeded, created.Failed) == (3, 3)
+            assert [r.Message for r in created.Results] == [
+                None, "请求中邮箱重复", "指定的角色不存在", None, "角色不能为空", None
+            ]
+            a_id, c_id, e_id = created.Results[0].Id, created.Results[3].Id, created.Results[5].Id
+            a = db.scalars(select(User).where(User.Id == a_id)).one()
+            assert pwd_context.verify("secret123", a.PasswordHash)
+
+            updated = await user_service.bulk_update_users(db, [
+                UserBulkUpdateItem(Id=a_id, Status="0"),
+                UserBulkUpdateItem(Id=c_id, Email="a@example.com"),
+                UserBulkUpdateItem(Id=uuid.uuid4(), Status="0"),
+                UserBulkUpdateItem(Id=e_id, UserName=None, Status=None)
+            ])
+            assert [r.Message for r in updated.Results] == [
+                None, "邮箱已被其他用户使用", "用户不存在", "Status、UserName不能为空"
+            ]
+            db.expire_all()
+            assert db.scalars(select(User.Status).where(User.Id == a_id)).one() == "0"
+
+            deleted = await user_service.bulk_delete_users(db, [a_id, a_id, uuid.uuid4()])
+            assert [r.Success for r in deleted.Results] == [True, False, False]
+            assert set(db.scalars(select(User.Id)).all()) == {c_id, e_id}
+
+        try:
+            asyncio.run(run())
+        finally:
+            hashing_executor.shutdown()
+    engine.dispose()
@@ -0,0 +1,32 @@
+import time
+from app.utils.cache import TTLCache
+
+def test_lru_eviction():
+    """测试超过容量时淘汰最久未使用的条目"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_ttl_expiry():
+    """测试条目过期"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_pop_and_stats():
+    """测试删除与命中统计"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.pop("a") == 1
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
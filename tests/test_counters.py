@@ -0,0 +1,49 @@
+import asyncio
+import uuid
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from app.core.counters import counter_registry
+from app.core.database import Base
+from app.models import Menu, Role
+
+def test_counters_follow_commits():
+    """测试新增、删除、状态变更提交后计数增量更新，回滚不影响计数"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(Role(Id=uuid.uuid4(), RoleName=f"role-{i}", RoleCode=f"code-{i}", Status="1") for i in range(3))
+        db.add(Menu(Id=uuid.uuid4(), MenuId=1000, Path="/a", Name="a"))
+        db.commit()
+
+        async def run():
+            assert await counter_registry.count(db, "role") == 3
+            assert await counter_registry.count(db, "menu", Hidden=False) == 1
+
+            role = Role(Id=uuid.uuid4(), RoleName="extra", RoleCode="extra", Status="1")
+            db.add(role)
+            db.commit()
+            assert counter_registry.counters["role"].count(Status="1") == 4
+
+            role = db.get(Role, role.Id)
+            role.Status = "0"
+            db.commit()
+            assert counter_registry.counters["role"].count(Status="1") == 3
+            assert counter_registry.counters["role"].count(Status="0") == 1
+
+            db.delete(role)
+            db.add(Role(Id=uuid.uuid4(), RoleName="discarded", RoleCode="discarded", Status="1"))
+            db.flush()
+            db.rollback()
+            assert counter_registry.counters["role"].count() == 4
+
+            db.delete(db.get(Role, role.Id))
+            db.commit()
+            assert counter_registry.counters["role"].count() == 3
+
+            # 对账结果与增量结果一致
+            assert await counter_registry.counters["role"].load(db) == 0
+
+        asyncio.run(run())
+    for counter in counter_registry.counters.values():
+        counter.loaded = False
+    engine.dispose()
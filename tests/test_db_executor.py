@@ -0,0 +1,53 @@
+import asyncio
+import contextvars
+import threading
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from app.core.db_executor import DatabaseExecutor
+from app.exceptions.base import ServiceUnavailableError
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+def test_run_in_worker_thread_with_context():
+    """测试同步调用在工作线程执行且能读取请求上下文"""
+    executor = DatabaseExecutor(max_workers=2, timeout=1, enabled=True)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+
+    async def run():
+        request_id.set("req-1")
+        with Session(engine) as db:
+            result = await executor.run(db, lambda: (threading.current_thread().name, request_id.get()))
+            assert executor.stats()["available"] == 2
+            return result
+
+    try:
+        thread_name, value = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert thread_name.startswith("db")
+    assert value == "req-1"
+
+def test_permit_held_until_transaction_ends():
+    """测试会话的许可在事务结束后释放，排队超时返回503"""
+    executor = DatabaseExecutor(max_workers=1, timeout=0.05, enabled=True)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+
+    async def run():
+        with Session(engine) as first, Session(engine) as second:
+            await executor.run(first, first.execute, text("select 1"))
+            assert executor.stats()["available"] == 0
+
+            with pytest.raises(ServiceUnavailableError):
+                await executor.run(second, second.execute, text("select 1"))
+
+            await executor.run(first, first.commit)
+            await asyncio.sleep(0)
+            assert executor.stats()["available"] == 1
+            await executor.run(second, second.execute, text("select 1"))
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert executor.stats()["rejected"] == 1
@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime
+from xml.dom import minidom
+import pytest
+from app.exceptions.base import ValidationError
+from app.utils.export import EXPORT_FORMATS, negotiate_format
+
+KEYS = ["UserName", "CreatedAt"]
+TITLES = ["用户名", "创建时间"]
+BATCHES = [[("张三", datetime(2024, 1, 2, 3, 4, 5))], [("a<b&c", None), ("d", None)]]
+
+def encode(name: str) -> bytes:
+    encoder = EXPORT_FORMATS[name].encoder(KEYS, TITLES)
+    return encoder.header() + b"".join(encoder.rows(batch) for batch in BATCHES) + encoder.footer()
+
+def test_negotiate_format():
+    """测试查询参数优先，其次Accept头，默认CSV"""
+    assert negotiate_format("XLSX", "text/csv").name == "xlsx"
+    assert negotiate_format(None, "application/json, application/x-ndjson;q=0.9").name == "ndjson"
+    assert negotiate_format(None, None).name == "csv"
+    with pytest.raises(ValidationError):
+        negotiate_format("pdf", None)
+
+def test_encoders():
+    """测试逐批编码的CSV、NDJSON、XLSX内容完整"""
+    rows = list(csv.reader(io.StringIO(encode("csv").decode("utf-8-sig"))))
+    assert rows == [TITLES, ["张三", "2024-01-02 03:04:05"], ["a<b&c", ""], ["d", ""]]
+
+    lines = [json.loads(line) for line in encode("ndjson").decode().splitlines()]
+    assert lines[0] == {"UserName": "张三", "CreatedAt": "2024-01-02 03:04:05"}
+    assert lines[1] == {"UserName": "a<b&c", "CreatedAt": None}
+
+    with zipfile.ZipFile(io.BytesIO(encode("xlsx"))) as workbook:
+        assert workbook.testzip() is None
+        sheet = minidom.parseString(workbook.read("xl/worksheets/sheet1.xml"))
+    cells = [[t.firstChild.data if t.firstChild else "" for t in row.getElementsByTagName("t")] for row in sheet.getElementsByTagName("row")]
+    assert cells == [TITLES, ["张三", "2024-01-02 03:04:05"], ["a<b&c", ""], ["d", ""]]
@@ -0,0 +1,40 @@
+import asyncio
+from app.core.hashing import HashingExecutor
+from app.exceptions.base import ServiceUnavailableError
+
+def test_hash_and_verify():
+    """测试进程池中的哈希与验证"""
+    executor = HashingExecutor(max_workers=2, max_queue=10)
+
+    async def run():
+        hashed = await executor.hash("secret123")
+        assert await executor.verify("secret123", hashed)
+        assert not await executor.verify("wrong", hashed)
+
+    try:
+        asyncio.run(run())
+        stats = executor.stats()
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["running"] == 0
+    finally:
+        executor.shutdown()
+
+def test_queue_limit_rejects():
+    """测试排队超过上限时直接拒绝"""
+    executor = HashingExecutor(max_workers=1, max_queue=1)
+
+    async def run():
+        results = await asyncio.gather(
+            *[executor.hash(f"secret{i}") for i in range(4)],
+            return_exceptions=True
+        )
+        return results
+
+    try:
+        results = asyncio.run(run())
+        rejected = [r for r in results if isinstance(r, ServiceUnavailableError)]
+        assert rejected
+        assert executor.stats()["rejected"] == len(rejected)
+    finally:
+        executor.shutdown()
@@ -0,0 +1,23 @@
+import time
+from app.core import security
+
+def test_jwt_cache_index_drops_expired_digests(monkeypatch):
+    """测试令牌声明缓存索引只保留未过期的摘要，撤销时清理用户全部缓存的令牌"""
+    monkeypatch.setattr(security, "jwt_cache", security.TTLCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(security, "_jwt_cache_index", security.TTLCache(maxsize=100, ttl=60))
+    expires = {"short": 0.05, "long": 60}
+    monkeypatch.setattr(
+        security.key_ring, "decode",
+        lambda token: {"sub": "u1", "exp": time.time() + expires[token.split(":")[0]]}
+    )
+
+    for i in range(10):
+        security.decode_access_token(f"short:{i}")
+    assert len(security._jwt_cache_index.get("u1")) == 10
+    time.sleep(0.1)
+    security.decode_access_token("long:1")
+    assert list(security._jwt_cache_index.get("u1")) == [security._token_digest("long:1")]
+
+    security._evict_user_tokens("u1")
+    assert security.jwt_cache.get(security._token_digest("long:1")) is None
+    assert security._jwt_cache_index.get("u1") is None
@@ -0,0 +1,52 @@
+import os
+import pytest
+from jose import JWTError, jwt
+from app.core.jwt_keys import KeyRing, generate_private_key_pem
+
+def test_symmetric_key_ring_has_no_jwks(tmp_path):
+    """测试HS256使用SECRET_KEY且不发布公钥"""
+    ring = KeyRing("HS256", "secret", tmp_path)
+    token = ring.encode({"sub": "u1"})
+    assert ring.decode(token)["sub"] == "u1"
+    assert ring.jwks() == {"keys": []}
+    assert not list(tmp_path.iterdir())
+
+def test_key_rotation(tmp_path):
+    """测试密钥轮换后旧令牌仍可验证，新令牌使用新kid"""
+    (tmp_path / "k1.pem").write_text(generate_private_key_pem("ES256"))
+    old_ring = KeyRing("ES256", "secret", tmp_path, active_kid="k1")
+    old_token = old_ring.encode({"sub": "u1"})
+    assert jwt.get_unverified_header(old_token)["kid"] == "k1"
+
+    (tmp_path / "k2.pem").write_text(generate_private_key_pem("ES256"))
+    ring = KeyRing("ES256", "secret", tmp_path, active_kid="k2")
+    new_token = ring.encode({"sub": "u2"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "k2"
+    assert ring.decode(old_token)["sub"] == "u1"
+    assert ring.decode(new_token)["sub"] == "u2"
+    assert sorted(key["kid"] for key in ring.jwks()["keys"]) == ["k1", "k2"]
+
+    with pytest.raises(JWTError):
+        old_ring.decode(new_token)
+
+def test_generates_default_key(tmp_path):
+    """测试密钥目录为空时生成默认密钥"""
+    ring = KeyRing("RS256", "secret", tmp_path / "keys")
+    token = ring.encode({"sub": "u1"})
+    jwk_data = ring.jwks()["keys"][0]
+    assert jwk_data["kid"] == "default"
+    assert jwt.decode(token, jwk_data, algorithms=["RS256"])["sub"] == "u1"
+
+def test_reloads_new_key_files(tmp_path):
+    """测试密钥目录变更后无需重启即可验证和签发新密钥的令牌"""
+    (tmp_path / "k1.pem").write_text(generate_private_key_pem("ES256"))
+    ring = KeyRing("ES256", "secret", tmp_path, reload_interval=60)
+    ring._last_check -= 1  # 距上次检查已超过1秒，未到常规检查间隔
+
+    (tmp_path / "k2.pem").write_text(generate_private_key_pem("ES256"))
+    stat = (tmp_path / "k1.pem").stat()
+    os.utime(tmp_path / "k2.pem", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    other_token = KeyRing("ES256", "secret", tmp_path).encode({"sub": "u1"})
+    # 未知kid立即检查密钥目录
+    assert ring.decode(other_token)["sub"] == "u1"
+    assert jwt.get_unverified_header(ring.encode({"sub": "u2"}))["kid"] == "k2"
@@ -0,0 +1,40 @@
+import uuid
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import mssql, sqlite
+from sqlalchemy.orm import Session
+from app.core.config import Settings
+from app.core.database import Base
+from app.models import GUID, Department, Role, RoleMenu, User
+
+def test_guid_dialect_types():
+    """测试GUID在SQL Server与SQLite中的列类型"""
+    assert GUID().compile(dialect=mssql.dialect()) == "UNIQUEIDENTIFIER"
+    assert GUID().compile(dialect=sqlite.dialect()) == "CHAR(36)"
+
+def test_database_url_override():
+    """测试DATABASE_URL可以直接指定，未指定时构建SQL Server连接"""
+    assert Settings(DATABASE_URL="sqlite:///./bench.db").DATABASE_URL == "sqlite:///./bench.db"
+    assert Settings(DATABASE_URL=None).DATABASE_URL.startswith("mssql+pyodbc://")
+
+def test_models_on_sqlite():
+    """测试全部模型可以在SQLite中建表，GUID按UUID读写"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    role_id = uuid.uuid4()
+    with Session(engine) as db:
+        department = Department(Id=uuid.uuid4(), DepartmentName="研发部", Status="1")
+        db.add_all([department, Role(Id=role_id, RoleName="管理员", RoleCode="admin", Status="1")])
+        db.flush()
+        db.add(User(
+            Id=uuid.uuid4(), UserName="u", Email="u@example.com", PasswordHash="x",
+            DepartmentId=department.Id, RoleId=role_id, AvatarUrl="", Status="1"
+        ))
+        db.add(RoleMenu(RoleId=str(role_id), MenuId=1000))
+        db.commit()
+
+    with Session(engine) as db:
+        user = db.scalars(select(User).where(User.RoleId == str(role_id))).one()
+        assert user.RoleId == role_id
+        assert user.role.RoleName == "管理员"
+        assert db.scalars(select(RoleMenu.RoleId)).one() == role_id
+    engine.dispose()
@@ -0,0 +1,102 @@
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.core.pagination import decode_cursor, encode_cursor, paginate
+from app.crud.menu import MenuCRUD
+from app.crud.role import role as crud_role
+from app.exceptions.base import ValidationError
+from app.models import Menu, Role
+
+def test_cursor_round_trip():
+    """测试游标编码与解码"""
+    role_id = uuid.uuid4()
+    cursor = encode_cursor(["角色", role_id])
+    assert decode_cursor(cursor, 2) == ["角色", str(role_id)]
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor, 3)
+    with pytest.raises(ValidationError):
+        decode_cursor("not-a-cursor", 2)
+
+def test_keyset_pages_match_offset_pages():
+    """测试游标逐页读取与偏移分页结果一致，且不重复、不遗漏"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(
+            Role(Id=uuid.uuid4(), RoleName=f"role-{i % 7:02d}-{i:02d}", RoleCode=f"code-{i}", Status=str(i % 2))
+            for i in range(23)
+        )
+        db.commit()
+
+        async def walk():
+            expected = await paginate(db, select(Role), crud_role.sort_keys, limit=100)
+            seen, cursor = [], None
+            while True:
+                page = await crud_role.get_page(db, limit=5, cursor=cursor)
+                seen.extend(role.Id for role in page.items)
+                if not page.has_next:
+                    break
+                cursor = page.next_cursor
+            assert seen == [role.Id for role in expected.items]
+
+            filtered = await crud_role.get_page(db, limit=5, include_total=True, status="1")
+            assert filtered.total == 11
+            assert all(role.Status == "1" for role in filtered.items)
+
+        asyncio.run(walk())
+    engine.dispose()
+
+def test_offset_page_total_in_one_statement():
+    """测试偏移分页通过 COUNT(*) OVER() 在一条语句中返回总数"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    with Session(engine) as db:
+        db.add_all(Role(Id=uuid.uuid4(), RoleName=f"role-{i:02d}", RoleCode=f"code-{i}", Status="1") for i in range(12))
+        db.commit()
+
+        async def run():
+            statements.clear()
+            page = await crud_role.get_page(db, limit=5, skip=5, include_total=True)
+            assert (page.total, len(page.items), page.has_next) == (12, 5, True)
+            assert len(statements) == 1 and "OVER" in statements[0]
+
+            beyond = await crud_role.get_page(db, limit=5, skip=50, include_total=True)
+            assert (beyond.total, beyond.items, beyond.has_next) == (12, [], False)
+
+        asyncio.run(run())
+    engine.dispose()
+
+def test_menu_pages_match_unpaged_order():
+    """测试菜单键集分页与不分页列表顺序一致，MenuOrder为空与0并列"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    orders = [None, 0, 1, None, 0, 2, 1]
+    with Session(engine) as db:
+        db.add_all(
+            Menu(Id=uuid.uuid4(), MenuId=1006 - i, Path=f"/m{i}", Name=f"m{i}", MenuOrder=order)
+            for i, order in enumerate(orders)
+        )
+        db.flush()
+        # ORM插入时空值会取列默认值0，已有数据中的空值用UPDATE构造
+        db.execute(update(Menu).where(Menu.MenuId.in_([1006, 1003])).values(MenuOrder=None))
+        db.commit()
+        crud_menu = MenuCRUD(db)
+
+        async def walk():
+            seen, cursor = [], None
+            while True:
+                page = await crud_menu.get_page(limit=2, cursor=cursor)
+                seen.extend(menu.MenuId for menu in page.items)
+                if not page.has_next:
+                    return seen
+                cursor = page.next_cursor
+
+        expected = [menu.MenuId for menu in asyncio.run(crud_menu.get_all_ordered())]
+        assert expected == [1002, 1003, 1005, 1006, 1000, 1004, 1001]
+        assert asyncio.run(walk()) == expected
+        assert [menu.MenuId for menu in asyncio.run(crud_menu.get_multi(limit=100))] == expected
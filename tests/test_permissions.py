@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import uuid
+from sqlalchemy.orm import Session
+from app.core.database import Base, SessionLocal, create_db_engine
+from app.core.db_executor import db_executor
+from app.core.permissions import PermissionRegistry
+from app.models import Role, RoleMenu
+
+ADMIN = uuid.uuid4()
+EDITOR = uuid.uuid4()
+DISABLED = uuid.uuid4()
+
+def make_registry() -> PermissionRegistry:
+    registry = PermissionRegistry("超级管理员")
+    registry.load(
+        menus=[(1000, ["user:list", "user:add"]), (1001, '["role:list"]'), (1002, None)],
+        roles=[(ADMIN, "超级管理员", "1"), (EDITOR, "编辑", "1"), (DISABLED, "访客", "0")],
+        role_menus=[(EDITOR, 1000), (DISABLED, 1001)]
+    )
+    return registry
+
+def test_compiled_permissions():
+    """测试角色权限编译与按位检查"""
+    registry = make_registry()
+    assert registry.has_permission(EDITOR, "user:add")
+    assert registry.has_permission(str(EDITOR).upper(), "user:list")
+    assert not registry.has_permission(EDITOR, "role:list")
+    assert not registry.has_permission(EDITOR, "unknown:perm")
+    assert not registry.has_permission(DISABLED, "role:list")
+    assert registry.has_permission(ADMIN, "anything:at-all")
+    assert registry.is_superuser(ADMIN)
+    assert not registry.is_superuser(EDITOR)
+    assert registry.get_permissions(EDITOR) == ["user:add", "user:list"]
+
+def test_incremental_rebuild():
+    """测试菜单和角色变更后增量更新"""
+    registry = make_registry()
+    registry.set_menu(1000, ["user:list", "user:delete"])
+    assert registry.has_permission(EDITOR, "user:delete")
+    assert not registry.has_permission(EDITOR, "user:add")
+
+    registry.set_role(EDITOR, "编辑", "1", [1000, 1001])
+    assert registry.has_permission(EDITOR, "role:list")
+
+    registry.set_role(DISABLED, "访客", "1", [1001])
+    assert registry.has_permission(DISABLED, "role:list")
+
+    registry.set_menu(1000, None)
+    assert not registry.has_permission(EDITOR, "user:list")
+
+    registry.set_role(EDITOR, "编辑", "0", [1000, 1001])
+    assert not registry.has_permission(EDITOR, "role:list")
+    registry.set_role(ADMIN, "管理员", "1", [])
+    assert not registry.is_superuser(ADMIN)
+
+def test_apply_runs_off_event_loop(tmp_path, monkeypatch):
+    """测试权限变更消息在数据库执行器的线程中重新编译，不阻塞事件循环"""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'perm.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Role(Id=EDITOR, RoleName="编辑", RoleCode="editor", Status="1"))
+        db.add(RoleMenu(Id=uuid.uuid4(), RoleId=EDITOR, MenuId=1000, IsEnabled=True))
+        db.commit()
+    saved = dict(SessionLocal.kw)
+    SessionLocal.configure(bind=engine, replica_bind=None)
+    monkeypatch.setattr(db_executor, "enabled", True)
+    registry = make_registry()
+    threads = []
+    set_role = registry.set_role
+    monkeypatch.setattr(registry, "set_role", lambda *args: (threads.append(threading.get_ident()), set_role(*args)))
+
+    async def run():
+        await registry.apply(f"role:{EDITOR}")
+        return threading.get_ident()
+
+    try:
+        loop_thread = asyncio.run(run())
+        assert threads and threads[0] != loop_thread
+        assert registry.has_permission(EDITOR, "user:add")
+    finally:
+        SessionLocal.configure(**saved)
+        db_executor.shutdown()
+        engine.dispose()
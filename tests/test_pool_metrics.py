@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy import create_engine, exc, text
+from app.core.pool_metrics import MonitoredQueuePool, monitor_engine, pool_monitors
+
+def test_pool_monitor_records_checkouts_and_timeouts(tmp_path):
+    """测试签出并发、连接耗时、获取连接超时的统计与连接池大小建议"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=MonitoredQueuePool,
+        pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    monitor = monitor_engine("test", engine)
+    try:
+        first, second = engine.connect(), engine.connect()
+        first.execute(text("SELECT 1"))
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        second.close()
+        first.close()
+
+        stats = monitor.stats()
+        assert (stats["checkouts"], stats["peak_checked_out"], stats["peak_overflow"]) == (2, 2, 1)
+        assert (stats["connects"], stats["timeouts"], stats["checked_out"]) == (2, 1, 0)
+
+        advice = monitor.advise(workers=4)
+        # 出现超时，按当前容量的1.5倍上调
+        assert advice["recommended"]["pool_size"] + advice["recommended"]["max_overflow"] == 3
+        assert advice["total_connections"] == 12
+
+        # dispose 重建连接池后继续统计
+        engine.dispose()
+        engine.connect().close()
+        assert monitor.stats()["wait"]["count"] == 3
+    finally:
+        pool_monitors.pop("test", None)
+        engine.dispose()
@@ -0,0 +1,24 @@
+from sqlalchemy import create_engine, text
+from app.core.query_stats import current_query_stats, statement_shape, track_queries
+
+def test_statement_shape():
+    """测试空白和IN参数列表归并"""
+    assert statement_shape("SELECT a\n  FROM t WHERE id IN (?, ?, ?)") == "SELECT a FROM t WHERE id IN (?)"
+    assert statement_shape("SELECT a FROM t WHERE id IN (:id_1_1, :id_1_2)") == "SELECT a FROM t WHERE id IN (?)"
+
+def test_track_queries_flags_repeated_statements():
+    """测试请求内语句计数、耗时和重复语句（N+1）检测"""
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert current_query_stats() is None
+        with track_queries() as stats:
+            conn.execute(text("SELECT 2"))
+            for i in range(5):
+                conn.execute(text("SELECT :i"), {"i": i})
+        conn.execute(text("SELECT 3"))
+    engine.dispose()
+
+    assert stats.count == 6 and stats.total_ms > 0
+    assert stats.repeated(5) == [("SELECT ?", 5)]
+    assert stats.header().startswith("count=6;") and stats.header().endswith("repeated=1")
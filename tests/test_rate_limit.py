@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from starlette.requests import Request
+from app.core import deps
+from app.core.rate_limit import LoginRateLimiter
+from app.exceptions.base import TooManyRequestsError
+
+def test_only_failed_logins_count():
+    """测试检查时原子地占用额度，认证成功后归还，失败的登录持续占用额度"""
+    async def run():
+        limiter = LoginRateLimiter(window_seconds=60, per_email=2, per_ip=3)
+        for _ in range(5):
+            reservation = await limiter.check("ok@example.com", "10.0.0.1")
+            await limiter.release("ok@example.com", "10.0.0.1", reservation)
+        for _ in range(2):
+            await limiter.check("bad@example.com", "10.0.0.1")
+        with pytest.raises(TooManyRequestsError):
+            await limiter.check("bad@example.com", "10.0.0.1")
+        await limiter.check("other@example.com", "10.0.0.1")
+        with pytest.raises(TooManyRequestsError):
+            await limiter.check("ok@example.com", "10.0.0.1")
+        await limiter.check("ok@example.com", "10.0.0.2")
+        assert limiter.stats()["released"] == 5
+
+    asyncio.run(run())
+
+def test_concurrent_attempts_reserve_slots():
+    """测试并发的登录尝试在验证密码之前各自占用额度，超出上限的请求被拒绝"""
+    async def run():
+        limiter = LoginRateLimiter(window_seconds=60, per_email=3, per_ip=100)
+        results = await asyncio.gather(
+            *(limiter.check("burst@example.com", "10.0.0.1") for _ in range(10)),
+            return_exceptions=True
+        )
+        assert sum(isinstance(result, TooManyRequestsError) for result in results) == 7
+
+    asyncio.run(run())
+
+def test_client_ip_from_trusted_proxy(monkeypatch):
+    """测试只信任反向代理转发的 X-Forwarded-For"""
+    def request(client: str, forwarded: str) -> Request:
+        return Request({
+            "type": "http", "client": (client, 1234),
+            "headers": [(b"x-forwarded-for", forwarded.encode())]
+        })
+
+    async def run():
+        assert await deps.get_client_ip(request("203.0.113.9", "1.2.3.4")) == "203.0.113.9"
+        monkeypatch.setattr(deps, "_TRUSTED_PROXIES", [deps.ip_network("10.0.0.0/8")])
+        assert await deps.get_client_ip(request("10.0.0.5", "1.2.3.4, 198.51.100.7, 10.0.0.6")) == "198.51.100.7"
+        assert await deps.get_client_ip(request("10.0.0.5", "")) == "10.0.0.5"
+
+    asyncio.run(run())
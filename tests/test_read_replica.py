@@ -0,0 +1,37 @@
+import uuid
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base, FORCE_PRIMARY_OPTION, PRIMARY_PINNED_KEY, RoutingSession, use_replica
+from app.models import Role
+
+def make_engine(role_name: str):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with RoutingSession(bind=engine) as db:
+        db.add(Role(Id=uuid.uuid4(), RoleName=role_name, RoleCode=role_name, Status="1"))
+        db.commit()
+    return engine
+
+def role_names(db, **options):
+    return db.scalars(select(Role.RoleName).order_by(Role.RoleName).execution_options(**options)).all()
+
+def test_routing_session():
+    """测试只读会话读取副本，写入后固定到主库"""
+    primary = make_engine("primary")
+    replica = make_engine("replica")
+
+    with RoutingSession(bind=primary, replica_bind=replica) as db:
+        # 未标记的会话使用主库
+        assert role_names(db) == ["primary"]
+
+    with RoutingSession(bind=primary, replica_bind=replica) as db:
+        use_replica(db)
+        assert role_names(db) == ["replica"]
+        assert role_names(db, **{FORCE_PRIMARY_OPTION: True}) == ["primary"]
+        assert not db.info.get(PRIMARY_PINNED_KEY)
+
+        db.add(Role(Id=uuid.uuid4(), RoleName="written", RoleCode="written", Status="1"))
+        db.flush()
+        assert db.info[PRIMARY_PINNED_KEY]
+        assert role_names(db) == ["primary", "written"]
+        db.commit()
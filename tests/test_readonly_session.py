@@ -0,0 +1,82 @@
+import sqlite3
+import uuid
+import pytest
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+from app.core.database import Base, RoutingSession, create_db_engine, use_read_only
+from app.models import Department
+
+def test_read_only_session(tmp_path, monkeypatch):
+    """测试只读会话可配置隔离级别（包括AUTOCOMMIT）、拒绝写入，连接归还后恢复默认隔离级别"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'ro.db'}", poolclass=QueuePool, pool_size=1)
+    Base.metadata.create_all(engine)
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(conn))
+
+    monkeypatch.setattr(settings, "DB_READONLY_ISOLATION_LEVEL", "AUTOCOMMIT")
+    db = RoutingSession(bind=engine)
+    use_read_only(db)
+    assert db.scalars(select(Department)).all() == []
+    assert db.connection().connection.dbapi_connection.in_transaction is False
+    db.close()
+
+    monkeypatch.setattr(settings, "DB_READONLY_ISOLATION_LEVEL", "READ UNCOMMITTED")
+    db = RoutingSession(bind=engine)
+    use_read_only(db)
+    assert db.connection().get_isolation_level() == "READ UNCOMMITTED"
+    with pytest.raises(InvalidRequestError):
+        db.execute(update(Department).values(Status="0"))
+    db.add(Department(Id=uuid.uuid4(), DepartmentName="研发部", Status="1"))
+    with pytest.raises(InvalidRequestError):
+        db.flush()
+    db.close()
+    assert commits == []
+
+    with engine.connect() as conn:
+        assert conn.get_isolation_level() == "SERIALIZABLE"
+    engine.dispose()
+
+class _CountingConnection(sqlite3.Connection):
+    """记录驱动层提交和回滚次数"""
+    calls = []
+
+    def commit(self):
+        self.calls.append("commit")
+        super().commit()
+
+    def rollback(self):
+        self.calls.append("rollback")
+        super().rollback()
+
+def test_pool_skips_redundant_reset_rollback(tmp_path):
+    """测试事务已结束时归还连接不再回滚，未结束的事务仍然回滚"""
+    engine = create_db_engine(
+        f"sqlite:///{tmp_path / 'reset.db'}",
+        connect_args={"check_same_thread": False, "factory": _CountingConnection}
+    )
+    Base.metadata.create_all(engine)
+    calls = _CountingConnection.calls
+    try:
+        calls.clear()
+        with RoutingSession(bind=engine) as db:
+            db.add(Department(Id=uuid.uuid4(), DepartmentName="研发部", Status="1"))
+            db.commit()
+        assert calls == ["commit"]
+
+        calls.clear()
+        db = RoutingSession(bind=engine)
+        use_read_only(db)
+        db.scalars(select(Department)).all()
+        db.close()
+        assert calls == ["rollback"]
+
+        # 直接使用驱动连接时没有事务事件，归还时照常回滚
+        calls.clear()
+        raw = engine.raw_connection()
+        raw.cursor().execute("SELECT 1")
+        raw.close()
+        assert calls == ["rollback"]
+    finally:
+        engine.dispose()
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from app.core.session_store import MemorySessionStore, RefreshGrant, SessionRecord
+
+def make_record(session_id: str, user_id: str = "u1", lifetime: int = 60, generation: int = 0) -> SessionRecord:
+    now = int(time.time())
+    return SessionRecord(
+        session_id=session_id,
+        user_id=user_id,
+        issued_at=now,
+        expires_at=now + lifetime,
+        client="127.0.0.1",
+        generation=generation
+    )
+
+def test_login_session_revokes_previous_sessions():
+    """测试登录时撤销用户旧会话"""
+    async def run():
+        store = MemorySessionStore()
+        await store.create_session(make_record("s1"))
+        await store.create_session(make_record("s2", user_id="u2"))
+        revoked = await store.create_login_session(make_record("s3", generation=100), 60)
+        assert revoked == 1
+        assert await store.get_session("s1") is None
+        assert (await store.get_session("s2")).user_id == "u2"
+        record = await store.get_session("s3")
+        assert record.user_id == "u1"
+        assert record.client == "127.0.0.1"
+        assert record.generation == 100
+
+    asyncio.run(run())
+
+def test_revoke_user_sessions():
+    """测试撤销用户全部会话"""
+    async def run():
+        store = MemorySessionStore()
+        await store.create_login_session(make_record("s1"), 60)
+        await store.create_session(make_record("s2"))
+        assert await store.revoke_user_sessions("u1") == 2
+        assert await store.get_session("s1") is None
+        assert await store.get_session("s2") is None
+
+    asyncio.run(run())
+
+def test_session_expiry():
+    """测试会话过期"""
+    async def run():
+        store = MemorySessionStore()
+        now = int(time.time())
+        await store.create_session(SessionRecord("s1", "u1", now - 10, now - 1))
+        await asyncio.sleep(1.1)
+        assert await store.get_session("s1") is None
+
+    asyncio.run(run())
+
+def test_publish_subscribe():
+    """测试进程内发布订阅"""
+    async def run():
+        store = MemorySessionStore()
+        subscription = store.subscribe("channel")
+        receive = asyncio.ensure_future(subscription.__anext__())
+        await asyncio.sleep(0)
+        await store.publish("channel", "hello")
+        assert await asyncio.wait_for(receive, 1) == "hello"
+        await subscription.aclose()
+
+    asyncio.run(run())
+
+def test_sliding_window_limits():
+    """测试滑动窗口限流：任一窗口超限时拒绝且不记录，撤销的记录不再占用额度"""
+    async def run():
+        store = MemorySessionStore()
+        for _ in range(2):
+            assert await store.hit_sliding_window(["email", "ip"], [2, 3], 60000) == (0, -1)
+        retry_after, blocked = await store.hit_sliding_window(["email", "ip"], [2, 3], 60000)
+        assert blocked == 0
+        assert 0 < retry_after <= 60000
+        assert await store.hit_sliding_window(["other", "ip"], [2, 3], 60000) == (0, -1)
+        assert (await store.hit_sliding_window(["another", "ip"], [2, 3], 60000))[1] == 1
+        # 撤销记录后归还额度
+        assert await store.hit_sliding_window(["fresh", "ip2"], [1, 5], 60000, member="m") == (0, -1)
+        assert (await store.hit_sliding_window(["fresh"], [1], 60000))[1] == 0
+        await store.release_sliding_window(["fresh", "ip2"], "m")
+        assert "ip2" not in store._windows
+        assert await store.hit_sliding_window(["fresh"], [1], 60000) == (0, -1)
+
+        # 不再访问的键在下一次整体清理时删除
+        store = MemorySessionStore()
+        for i in range(100):
+            await store.hit_sliding_window([f"once:{i}"], [5], 10)
+        await asyncio.sleep(0.05)
+        await store.hit_sliding_window(["last"], [5], 10)
+        assert set(store._windows) == {"last"}
+
+    asyncio.run(run())
+
+def test_token_generation_only_increases():
+    """测试最小有效代数只增不减，撤销全部会话时同时提升"""
+    async def run():
+        store = MemorySessionStore()
+        assert await store.get_token_generation("u1") == 0
+        await store.create_login_session(make_record("s1", generation=100), 60)
+        assert await store.get_token_generation("u1") == 100
+        assert await store.raise_token_generation("u1", 50, 60) == 100
+        await store.revoke_user_sessions("u1", generation=200, generation_expire=60)
+        assert await store.get_token_generation("u1") == 200
+
+    asyncio.run(run())
+
+def test_refresh_token_rotation_and_reuse():
+    """测试刷新令牌轮换、重用检测与登出后失效"""
+    async def run():
+        store = MemorySessionStore()
+        await store.create_login_session(make_record("s1", generation=100), 60, RefreshGrant("r1", "f1", 60))
+        assert await store.rotate_refresh_token("r1", "r2", make_record("s2", user_id="", generation=101), 60, 60) == (1, "u1")
+        assert await store.get_session("s1") is None
+        assert (await store.get_session("s2")).user_id == "u1"
+        assert await store.rotate_refresh_token("r1", "r3", make_record("s3", user_id="", generation=102), 60, 60) == (-1, "u1")
+        assert await store.rotate_refresh_token("r2", "r4", make_record("s4", user_id="", generation=103), 60, 60) == (0, None)
+
+        await store.create_login_session(make_record("s5", generation=200), 60, RefreshGrant("r5", "f2", 60))
+        await store.revoke_user_sessions("u1", generation=300, generation_expire=60)
+        assert await store.rotate_refresh_token("r5", "r6", make_record("s6", user_id="", generation=301), 60, 60) == (0, None)
+
+    asyncio.run(run())
@@ -0,0 +1,161 @@
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app.core.cache_bus import cache_bus
+from app.core.config import settings
+from app.core.database import (
+    AsyncSessionLocal, Base, SessionLocal, create_async_db_engine, create_db_engine
+)
+from app.core import deps
+from app.core.deps import get_current_user
+from app.core.hashing import hashing_executor
+from app.core.permissions import PermissionRegistry
+from app.core.principal import PRINCIPAL_TOPIC, PRINCIPALS_TOPIC, UserPrincipal
+from app.main import app
+from app.models import Department, Role, User
+
+USERS_URL = f"{settings.API_V1_STR}/users"
+USER_PERMISSIONS = ["user:add", "user:edit", "user:delete", "user:export"]
+
+def make_engine(path):
+    """按 DATABASE_MODE 创建与会话工厂匹配的SQLite引擎，并用同步连接建表"""
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    if settings.DATABASE_MODE == "async":
+        return sync_engine, create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+    return sync_engine, create_db_engine(f"sqlite:///{path}")
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """
+    应用的会话依赖（get_db_session）绑定到临时SQLite主库和空的只读副本
+    - 认证依赖替换为固定用户，接口其余依赖保持不变
+    - 权限注册表替换为只给该用户角色授予用户管理权限的注册表
+    - 写接口误读副本时唯一性校验会漏掉主库中的数据
+    """
+    primary_sync, primary = make_engine(tmp_path / "primary.db")
+    replica_sync, replica = make_engine(tmp_path / "replica.db")
+    department_id, role_id, admin_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    with Session(primary_sync) as db:
+        db.add_all([
+            Department(Id=department_id, DepartmentName="研发部", Status="1"),
+            Role(Id=role_id, RoleName="成员", RoleCode="member", Status="1"),
+            User(
+                Id=admin_id, UserName="admin", PasswordHash="x", Email="admin@example.com",
+                DepartmentId=department_id, RoleId=role_id, AvatarUrl="", Status="1"
+            )
+        ])
+        db.commit()
+
+    registry = PermissionRegistry(settings.SUPERUSER_ROLE_NAME)
+    registry.load(menus=[(1000, USER_PERMISSIONS)], roles=[(role_id, "成员", "1")], role_menus=[(role_id, 1000)])
+    monkeypatch.setattr(deps, "permission_registry", registry)
+
+    factory = AsyncSessionLocal if settings.DATABASE_MODE == "async" else SessionLocal
+    saved = dict(factory.kw)
+    replica_bind = replica.sync_engine if settings.DATABASE_MODE == "async" else replica
+    factory.configure(bind=primary, replica_bind=replica_bind)
+    app.dependency_overrides[get_current_user] = lambda: UserPrincipal(
+        Id=admin_id, UserName="admin", Email="admin@example.com", Status="1",
+        RoleId=role_id, DepartmentId=department_id
+    )
+    try:
+        # 不进入上下文，不执行启动事件（缓存总线订阅、权限注册表编译）
+        yield TestClient(app), primary_sync, {"DepartmentId": str(department_id), "RoleId": str(role_id)}
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+        factory.configure(**saved)
+        hashing_executor.shutdown()
+        for engine in (primary_sync, replica_sync, primary, replica):
+            getattr(engine, "sync_engine", engine).dispose()
+
+def test_user_write_routes(api):
+    """测试用户写接口经应用的会话依赖提交到主库，写入前的校验读取主库"""
+    client, primary, refs = api
+    with Session(primary) as db:
+        admin_id = db.scalars(select(User.Id).where(User.Email == "admin@example.com")).one()
+
+    # 邮箱唯一性校验必须读取主库（副本中没有任何用户）
+    response = client.post(f"{USERS_URL}/", json={
+        "UserName": "admin2", "Email": "admin@example.com", "Password": "secret123", "AvatarUrl": "", **refs
+    })
+    assert response.status_code == 422, response.text
+
+    response = client.put(f"{USERS_URL}/{admin_id}/status", params={"status": "0"})
+    assert response.status_code == 200, response.text
+    with Session(primary) as db:
+        assert db.scalars(select(User.Status).where(User.Id == admin_id)).one() == "0"
+
+    response = client.delete(f"{USERS_URL}/{admin_id}")
+    assert response.status_code == 200, response.text
+    with Session(primary) as db:
+        assert db.scalars(select(User.Id)).all() == []
+
+def test_bulk_user_routes(api, monkeypatch):
+    """测试批量创建、更新、删除接口逐行返回结果，每个请求中的无效行不影响其他行，失效消息每批只广播一次"""
+    client, primary, refs = api
+    published = []
+    publish = cache_bus.publish
+
+    async def record(topic, key, local=True):
+        published.append(topic)
+        await publish(topic, key, local)
+
+    monkeypatch.setattr(cache_bus, "publish", record)
+    row = {"Password": "secret123", "AvatarUrl": "", **refs}
+
+    response = client.post(f"{USERS_URL}/bulk", json={"Users": [
+        {**row, "UserName": "alice", "Email": "alice@example.com"},
+        {**row, "UserName": "dup", "Email": "admin@example.com"}
+    ]})
+    assert response.status_code == 200, response.text
+    results = response.json()["data"]["Results"]
+    assert [r["Message"] for r in results] == [None, "邮箱已被注册"]
+    alice_id = results[0]["Id"]
+
+    response = client.put(f"{USERS_URL}/bulk", json={"Users": [
+        {"Id": alice_id, "Status": "0"},
+        {"Id": str(uuid.uuid4()), "Status": "0"}
+    ]})
+    assert response.status_code == 200, response.text
+    assert [r["Message"] for r in response.json()["data"]["Results"]] == [None, "用户不存在"]
+    with Session(primary) as db:
+        assert db.scalars(select(User.Status).where(User.Email == "alice@example.com")).one() == "0"
+
+    assert published.count(PRINCIPALS_TOPIC) == 1 and PRINCIPAL_TOPIC not in published
+
+    response = client.post(f"{USERS_URL}/bulk/delete", json={"Ids": [alice_id, str(uuid.uuid4())]})
+    assert response.status_code == 200, response.text
+    assert [r["Success"] for r in response.json()["data"]["Results"]] == [True, False]
+    with Session(primary) as db:
+        assert db.scalars(select(User.Email)).all() == ["admin@example.com"]
+    assert published.count(PRINCIPALS_TOPIC) == 2
+
+def test_user_routes_require_permission(api):
+    """测试没有用户管理权限的用户调用写接口、批量接口和导出接口返回403，且不写入数据"""
+    client, primary, refs = api
+    app.dependency_overrides[get_current_user] = lambda: UserPrincipal(
+        Id=uuid.uuid4(), UserName="guest", Email="guest@example.com", Status="1",
+        RoleId=uuid.uuid4(), DepartmentId=uuid.UUID(refs["DepartmentId"])
+    )
+    with Session(primary) as db:
+        admin_id = str(db.scalars(select(User.Id)).one())
+
+    requests = [
+        ("post", f"{USERS_URL}/bulk", {"Users": [
+            {"Password": "secret123", "AvatarUrl": "", **refs, "UserName": "bob", "Email": "bob@example.com"}
+        ]}),
+        ("put", f"{USERS_URL}/bulk", {"Users": [{"Id": admin_id, "Status": "0"}]}),
+        ("post", f"{USERS_URL}/bulk/delete", {"Ids": [admin_id]}),
+        ("get", f"{USERS_URL}/export", None),
+        ("put", f"{USERS_URL}/{admin_id}/status?status=0", None),
+        ("delete", f"{USERS_URL}/{admin_id}", None)
+    ]
+    for method, url, body in requests:
+        response = client.request(method, url, json=body)
+        assert response.status_code == 403, response.text
+
+    with Session(primary) as db:
+        assert db.scalars(select(User.Status)).all() == ["1"]